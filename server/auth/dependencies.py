@@ -1,6 +1,8 @@
 from fastapi import Depends, Security
 from fastapi.security import APIKeyHeader
-from configparser import ConfigParser
+
+from resources.config import get_config
+from resources.singletons import api_key_rate_limit
 
 from .exceptions import AuthenticationError
 
@@ -12,9 +14,7 @@ _valid_api_key: str = None
 def init_api_key():
     """Load API key from config"""
     global _valid_api_key
-    config = ConfigParser()
-    config.read("config.ini")
-    _valid_api_key = config.get("SERVER", "api_key")
+    _valid_api_key = get_config().get("SERVER", "api_key")
 
 
 async def verify_token(
@@ -23,6 +23,7 @@ async def verify_token(
     """
     Verify API key from X-API-Key header.
     This is the main auth dependency to use in routes.
+    Valid keys are also counted against the per-key rate limit ([RATE_LIMIT] per_api_key).
     """
     if _valid_api_key is None:
         init_api_key()
@@ -33,4 +34,5 @@ async def verify_token(
     if api_key != _valid_api_key:
         raise AuthenticationError("Invalid API key")
 
+    api_key_rate_limit.hit(api_key)
     return api_key
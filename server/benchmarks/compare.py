@@ -0,0 +1,82 @@
+"""
+Compare two benchmarks.run result files, e.g. from two commits.
+
+    python -m benchmarks.compare bench-a.json bench-b.json [--threshold 10]
+
+Prints, per scenario, the baseline and candidate p50/p95 latency,
+throughput and upstream calls per request with relative change. With
+--threshold, exits non-zero when any scenario's p95 got slower or its
+throughput dropped by more than that many percent.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Optional, Tuple
+
+METRICS = (
+    # (result key, label, True when higher is better)
+    ("p50_ms", "p50 ms", False),
+    ("p95_ms", "p95 ms", False),
+    ("throughput_rps", "req/s", True),
+    ("upstream_calls_per_request", "upstream/req", False),
+)
+
+
+def load(path: str) -> Tuple[dict, Dict[Tuple[str, str], dict]]:
+    with open(path) as f:
+        report = json.load(f)
+    return report["meta"], {(r["kind"], r["name"]): r for r in report["results"]}
+
+
+def change(baseline: Optional[float], candidate: Optional[float]) -> Optional[float]:
+    """Relative change in percent, None when it cannot be computed"""
+    if baseline is None or candidate is None or baseline == 0:
+        return None
+    return (candidate - baseline) / baseline * 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, help="Fail on p95/throughput regressions above this percent")
+    args = parser.parse_args()
+
+    baseline_meta, baseline = load(args.baseline)
+    candidate_meta, candidate = load(args.candidate)
+    print(f"baseline  {baseline_meta.get('commit', '?')[:12]}{' (dirty)' if baseline_meta.get('dirty') else ''}")
+    print(f"candidate {candidate_meta.get('commit', '?')[:12]}{' (dirty)' if candidate_meta.get('dirty') else ''}")
+    if baseline_meta.get("args") != candidate_meta.get("args"):
+        print("warning: runs used different arguments; numbers may not be comparable")
+
+    header = f"{'kind':<10} {'scenario':<32}" + "".join(f" {label:>26}" for _, label, _ in METRICS)
+    print(header)
+    print("-" * len(header))
+
+    regressions = []
+    for key in sorted(set(baseline) | set(candidate)):
+        kind, name = key
+        if key not in baseline or key not in candidate:
+            print(f"{kind:<10} {name:<32} only in {'candidate' if key in candidate else 'baseline'}")
+            continue
+        cells = []
+        for metric, _, higher_is_better in METRICS:
+            before, after = baseline[key].get(metric), candidate[key].get(metric)
+            delta = change(before, after)
+            delta_text = f"{delta:+.1f}%" if delta is not None else "n/a"
+            cells.append(f" {before or 0:>9.2f} -> {after or 0:>9.2f} {delta_text:>7}")
+            if args.threshold is not None and delta is not None and metric in ("p95_ms", "throughput_rps"):
+                worse = -delta if higher_is_better else delta
+                if worse > args.threshold:
+                    regressions.append(f"{kind} {name}: {metric} {delta_text}")
+        print(f"{kind:<10} {name:<32}" + "".join(cells))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,833 @@
+"""
+Local stand-ins for Supabase (PostgREST), Polymarket's Gamma API and ESPN's site API.
+
+All run in one aiohttp app on their own port, serve the seeded fixtures
+from benchmarks.fixtures and add a configurable latency to every call so
+upstream round trips cost roughly what they do in production:
+
+    /rest/v1/<table>     PostgREST subset used by the repositories (GET) and the ingestion (POST upserts,
+                         PATCH updates)
+    /markets             Gamma market listing (tag_id, limit, offset)
+    /markets/<id>        Gamma single market
+    /apis/site/v2/sports/<sport>/<league>/...
+                         ESPN teams, rosters, scoreboard and game summaries
+    /__bench/stats       GET upstream call counts per target, POST resets them
+    /__bench/espn        POST ?today=YYYY-MM-DD moves the ESPN stand-in's clock;
+                         ?fail=N&status=429&retry_after=S answers its next N calls with that status
+    /__bench/prices      POST {market_id: price} moves Gamma outcome prices (a fake price feed);
+                         a list of prices sets every outcome's price
+    /__bench/gamma       POST {"error_rate", "slow_rate", "slow_ms"} degrades the Gamma stand-in
+    /__bench/truncate    POST ?table=<name> drops every row of a PostgREST table
+
+The PostgREST subset covers what SupabaseRepository and ReplicaSync send:
+select lists with many-to-one embeds (`players!inner(team_id, teams!inner(league_id))`),
+eq/neq/gt/gte/lt/lte/in filters on columns and embedded columns, order,
+limit/offset and the Range header; plus bulk upserts with on_conflict and
+filtered updates.
+
+The ESPN stand-in plays a seeded schedule for the fixture teams: games
+before its `today` are final, with box scores for the fixture rosters.
+
+Run standalone with `python -m benchmarks.fakes --port 54329 --latency-ms 20`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from collections import Counter, OrderedDict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+from benchmarks.fixtures import Fixtures, build_fixtures
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID, LEAGUE_TO_SPORT, NBA_TEAM_IDS, NFL_TEAM_IDS
+
+# (table, embedded table) -> foreign key column on table
+RELATIONS = {
+    ("players", "teams"): "team_id",
+    ("player_vs_team_stats", "players"): "player_id",
+    ("team_location_splits", "teams"): "team_id",
+    ("team_recent_form", "teams"): "team_id",
+    ("teams", "venues"): "venue_id",
+    ("team_game_results", "teams"): "team_id",
+}
+
+FILTER_OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "in"}
+RESERVED_PARAMS = {"select", "order", "limit", "offset"}
+# Paged reads repeat the same query per page; results are memoized without offset/limit
+RESULT_CACHE_SIZE = 64
+
+
+class SelectNode:
+    """A parsed select list: plain columns plus embedded tables"""
+
+    def __init__(self, table: str, inner: bool = False):
+        self.table = table
+        self.inner = inner
+        self.columns: List[str] = []
+        self.embeds: Dict[str, "SelectNode"] = {}
+
+
+def _split_top_level(value: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in value:
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def parse_select(table: str, value: str, inner: bool = False) -> SelectNode:
+    node = SelectNode(table, inner)
+    for part in _split_top_level(value or "*"):
+        match = re.fullmatch(r"(\w+)(!inner)?\((.*)\)", part, flags=re.S)
+        if match:
+            name = match.group(1)
+            node.embeds[name] = parse_select(name, match.group(3), inner=bool(match.group(2)))
+        else:
+            node.columns.append(part)
+    return node
+
+
+def _coerce(sample, raw: str):
+    """Convert a query-string value to the type of the column it is compared with"""
+    if raw == "null":
+        return None
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, int):
+        return int(raw)
+    if isinstance(sample, float):
+        return float(raw)
+    return raw
+
+
+def _matches(value, operator: str, raw: str) -> bool:
+    if operator == "in":
+        options = [item.strip().strip('"') for item in raw.strip("()").split(",") if item.strip()]
+        return value in {_coerce(value, option) for option in options}
+    target = _coerce(value, raw)
+    if operator == "eq":
+        return value == target
+    if operator == "neq":
+        return value != target
+    if value is None or target is None:
+        return False
+    if operator == "gt":
+        return value > target
+    if operator == "gte":
+        return value >= target
+    if operator == "lt":
+        return value < target
+    return value <= target
+
+
+class FakePostgREST:
+    """In-memory PostgREST over the fixture tables, with foreign-key indexes for fast filtering"""
+
+    def __init__(self, tables: Dict[str, List[dict]]):
+        self.tables = tables
+        self.by_id = {name: {row["id"]: row for row in rows} for name, rows in tables.items()}
+        self.indexes: Dict[Tuple[str, str], Dict[object, List[dict]]] = {}
+        for name in tables:
+            self._index(name)
+        self._results: "OrderedDict[tuple, List[dict]]" = OrderedDict()
+        self._unique: Dict[Tuple[str, Tuple[str, ...]], Dict[tuple, dict]] = {}
+        self._stale: set = set()
+
+    def _index(self, table: str) -> None:
+        rows = self.tables[table]
+        for key in [key for key in self.indexes if key[0] == table]:
+            del self.indexes[key]
+        for column in {c for row in rows[:1] for c in row if c.endswith("_id")}:
+            index: Dict[object, List[dict]] = {}
+            for row in rows:
+                index.setdefault(row.get(column), []).append(row)
+            self.indexes[(table, column)] = index
+
+    def upsert(self, table: str, rows: List[dict], on_conflict: str) -> List[dict]:
+        """
+        Answer one POST /rest/v1/<table>?on_conflict=... (merge duplicates).
+
+        Rows matching an existing row on the conflict columns update it, the
+        rest are inserted with the next id. Unknown tables are created.
+
+        Returns:
+            The written rows
+        """
+        existing = self.tables.setdefault(table, [])
+        by_id = self.by_id.setdefault(table, {})
+        columns = tuple(column.strip() for column in on_conflict.split(",") if column.strip()) or ("id",)
+        unique = self._unique.get((table, columns))
+        if unique is None:
+            unique = {}
+            for row in existing:
+                key = tuple(row.get(column) for column in columns)
+                if None not in key:
+                    unique[key] = row
+            self._unique[(table, columns)] = unique
+
+        written = []
+        next_id = max(by_id, default=0) + 1
+        for row in rows:
+            key = tuple(row.get(column) for column in columns)
+            target = unique.get(key)
+            if target is None:
+                target = {**row, "id": row.get("id") or next_id}
+                next_id = max(next_id, target["id"]) + 1
+                existing.append(target)
+                by_id[target["id"]] = target
+                unique[key] = target
+            else:
+                target.update(row)
+            written.append(dict(target))
+
+        # Other unique lookups of this table may now be wrong; indexes are rebuilt on the next read
+        for key in [key for key in self._unique if key[0] == table and key[1] != columns]:
+            del self._unique[key]
+        self._stale.add(table)
+        self._results.clear()
+        return written
+
+    def update(self, table: str, params: List[Tuple[str, str]], values: dict) -> List[dict]:
+        """
+        Answer one PATCH /rest/v1/<table>?<filters>: set `values` on every matching row.
+
+        Raises:
+            KeyError: If the table does not exist
+        """
+        if table not in self.tables:
+            raise KeyError(table)
+        filters = self._parse_filters(params).get((), [])
+        rows = self._filter(filters, self.tables[table])
+        for row in rows:
+            row.update(values)
+        for key in [key for key in self._unique if key[0] == table]:
+            del self._unique[key]
+        self._stale.add(table)
+        self._results.clear()
+        return [dict(row) for row in rows]
+
+    def truncate(self, table: str) -> int:
+        """
+        Drop every row of a table.
+
+        Returns:
+            Number of rows removed
+        """
+        removed = len(self.tables.get(table, []))
+        self.tables[table], self.by_id[table] = [], {}
+        for key in [key for key in self._unique if key[0] == table]:
+            del self._unique[key]
+        self._stale.add(table)
+        self._results.clear()
+        return removed
+
+    def query(self, table: str, params: List[Tuple[str, str]], range_header: Optional[str] = None) -> List[dict]:
+        """
+        Answer one GET /rest/v1/<table>.
+
+        Raises:
+            KeyError: If the table or an embedded relation does not exist
+        """
+        if table not in self.tables:
+            raise KeyError(table)
+        while self._stale:
+            self._index(self._stale.pop())
+
+        values = dict(params)
+        key = (table, tuple(sorted((k, v) for k, v in params if k not in ("limit", "offset"))))
+        rows = self._results.get(key)
+        if rows is None:
+            rows = self._run(table, params, values)
+            self._results[key] = rows
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+
+        offset = int(values.get("offset", 0))
+        limit = int(values["limit"]) if "limit" in values else None
+        if range_header and "offset" not in values:
+            start, _, end = range_header.partition("-")
+            offset, limit = int(start), int(end) - int(start) + 1
+        return rows[offset:offset + limit] if limit is not None else rows[offset:]
+
+    def _run(self, table: str, params: List[Tuple[str, str]], values: Dict[str, str]) -> List[dict]:
+        select = parse_select(table, values.get("select", "*"))
+        filters = self._parse_filters(params)
+        rows = [
+            shaped for shaped in (self._shape(row, select, filters, ()) for row in self._select_rows(table, select, filters, ()))
+            if shaped is not None
+        ]
+        for column, descending in reversed(self._order(values.get("order"))):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=descending)
+        return rows
+
+    @staticmethod
+    def _parse_filters(params: List[Tuple[str, str]]) -> Dict[Tuple[str, ...], List[Tuple[str, str, str]]]:
+        """Filters by embed path: () for the table's own columns"""
+        filters: Dict[Tuple[str, ...], List[Tuple[str, str, str]]] = {}
+        for key, value in params:
+            if key in RESERVED_PARAMS or "." not in value:
+                continue
+            operator, raw = value.split(".", 1)
+            if operator not in FILTER_OPERATORS:
+                continue
+            *path, column = key.split(".")
+            filters.setdefault(tuple(path), []).append((column, operator, raw))
+        return filters
+
+    def _select_rows(self, table: str, node: SelectNode, filters: dict, path: Tuple[str, ...]) -> List[dict]:
+        """Rows of `table` passing its own filters, narrowed first by filters on embedded tables"""
+        rows: Optional[List[dict]] = None
+        for name, child in node.embeds.items():
+            child_path = path + (name,)
+            if not any(p[:len(child_path)] == child_path for p in filters):
+                continue
+            foreign_key = self._relation(table, name)
+            ids = {row["id"] for row in self._select_rows(name, child, filters, child_path)}
+            if rows is None:
+                index = self.indexes.get((table, foreign_key), {})
+                rows = [row for i in ids for row in index.get(i, [])]
+            else:
+                rows = [row for row in rows if row.get(foreign_key) in ids]
+
+        own = filters.get(path, [])
+        if rows is None:
+            rows = self._candidates(table, own)
+        return self._filter(own, rows)
+
+    def _candidates(self, table: str, filters: List[Tuple[str, str, str]]) -> Iterable[dict]:
+        """Narrow the scan with a foreign-key index when an eq/in filter allows it"""
+        for column, operator, raw in filters:
+            index = self.indexes.get((table, column))
+            if index is None or operator not in ("eq", "in"):
+                continue
+            sample = next(iter(index), None)
+            options = raw.strip("()").split(",") if operator == "in" else [raw]
+            return [row for option in options for row in index.get(_coerce(sample, option.strip()), [])]
+        return self.tables[table]
+
+    @staticmethod
+    def _relation(table: str, name: str) -> str:
+        foreign_key = RELATIONS.get((table, name))
+        if foreign_key is None:
+            raise KeyError(f"{table} has no relation to {name}")
+        return foreign_key
+
+    @staticmethod
+    def _filter(filters: List[Tuple[str, str, str]], rows: Iterable[dict]) -> List[dict]:
+        return [
+            row for row in rows
+            if all(_matches(row.get(column), operator, raw) for column, operator, raw in filters)
+        ]
+
+    def _shape(self, row: dict, node: SelectNode, filters: dict, path: Tuple[str, ...]) -> Optional[dict]:
+        """Project a row onto its select node; None drops it (failed !inner embed)"""
+        shaped = dict(row) if "*" in node.columns else {c: row.get(c) for c in node.columns}
+        for name, child in node.embeds.items():
+            foreign_key = self._relation(node.table, name)
+            related = self.by_id[name].get(row.get(foreign_key))
+            child_path = path + (name,)
+            if related is not None and not self._filter(filters.get(child_path, []), [related]):
+                related = None
+            embedded = self._shape(related, child, filters, child_path) if related is not None else None
+            if embedded is None and (child.inner or child_path in filters):
+                return None
+            shaped[name] = embedded
+        return shaped
+
+    @staticmethod
+    def _order(value: Optional[str]) -> List[Tuple[str, bool]]:
+        order = []
+        for part in _split_top_level(value or ""):
+            column, _, direction = part.partition(".")
+            order.append((column, direction.startswith("desc")))
+        return order
+
+ESPN_TEAM_IDS = {"nba": NBA_TEAM_IDS, "nfl": NFL_TEAM_IDS}
+# Days with games: NBA regular season Oct 21 - Apr 13; NFL Thursdays, Sundays and Mondays Sep 4 - Jan 5
+ESPN_SEASON_DAYS = {"nba": ((10, 21), (4, 13)), "nfl": ((9, 4), (1, 5))}
+ESPN_LEAGUE_DIGIT = {"nfl": "3", "nba": "4"}
+ESPN_ATHLETE_OFFSET = 100000
+
+NBA_BOX_KEYS = [
+    "minutes", "points", "fieldGoalsMade-fieldGoalsAttempted",
+    "threePointFieldGoalsMade-threePointFieldGoalsAttempted", "freeThrowsMade-freeThrowsAttempted",
+    "rebounds", "assists", "turnovers", "steals", "blocks", "offensiveRebounds", "defensiveRebounds",
+    "fouls", "plusMinus",
+]
+NFL_BOX_KEYS = {
+    "passing": ["completions/passingAttempts", "passingYards", "yardsPerPassAttempt", "passingTouchdowns",
+                "interceptions", "sacks-sackYardsLost", "adjQBR", "QBRating"],
+    "rushing": ["rushingAttempts", "rushingYards", "yardsPerRushAttempt", "rushingTouchdowns", "longRushing"],
+    "receiving": ["receptions", "receivingYards", "yardsPerReception", "receivingTouchdowns", "longReception",
+                  "receivingTargets"],
+}
+
+
+class FakeEspn:
+    """
+    ESPN site API stand-in playing a seeded schedule between the fixture teams.
+
+    Event ids encode league, day and slot (`4` + YYYYMMDD + two digits), so a
+    summary is regenerated from its id alone; games before `today` are final.
+    """
+
+    def __init__(self, fixtures: Fixtures, seed: int = 1, today: date = date(2026, 1, 15)):
+        self.seed = seed
+        self.today = today
+        self.teams: Dict[str, List[dict]] = {}
+        self.rosters: Dict[Tuple[str, str], List[dict]] = {}
+        players_by_team: Dict[int, List[dict]] = {}
+        for player in fixtures.tables["players"]:
+            players_by_team.setdefault(player["team_id"], []).append(player)
+        for league, league_id in LEAGUE_NAME_TO_LEAGUE_ID.items():
+            slugs = {slug.capitalize(): espn_id for slug, espn_id in ESPN_TEAM_IDS[league].items()}
+            teams = [
+                {
+                    "id": str(slugs[team["team_name"]]),
+                    "name": team["team_name"],
+                    "displayName": team["team_name"],
+                    "abbreviation": team["abbreviation"],
+                    "logos": [{"href": f"https://a.espncdn.com/i/teamlogos/{league}/500/{team['abbreviation']}.png"}],
+                }
+                for team in fixtures.tables["teams"] if team["league_id"] == league_id
+            ]
+            self.teams[league] = teams
+            for team, fixture_team in zip(teams, [t for t in fixtures.tables["teams"] if t["league_id"] == league_id]):
+                self.rosters[(league, team["id"])] = [
+                    {
+                        "id": str(ESPN_ATHLETE_OFFSET + player["id"]),
+                        "firstName": player["first_name"],
+                        "lastName": player["last_name"],
+                        "displayName": f"{player['first_name']} {player['last_name']}",
+                        "headshot": {"href": f"https://a.espncdn.com/i/headshots/{league}/players/full/{player['id']}.png"},
+                        "position": {"abbreviation": player["position"]},
+                        "status": {"name": player["status"]},
+                    }
+                    for player in players_by_team.get(fixture_team["id"], [])
+                ]
+        self._schedules: Dict[Tuple[str, date], List[Tuple[str, str]]] = {}
+        self._summaries: Dict[str, dict] = {}
+
+    def _plays_on(self, league: str, day: date) -> bool:
+        (start_month, start_day), (end_month, end_day) = ESPN_SEASON_DAYS[league]
+        in_season = (day.month, day.day) >= (start_month, start_day) or (day.month, day.day) <= (end_month, end_day)
+        if league == "nfl":
+            return in_season and day.weekday() in (0, 3, 6)
+        return in_season
+
+    def schedule(self, league: str, day: date) -> List[Tuple[str, str]]:
+        """(home, away) ESPN team ids of every game on a day"""
+        key = (league, day)
+        if key not in self._schedules:
+            games = []
+            if self._plays_on(league, day):
+                rng = random.Random(f"{self.seed}:{league}:{day.isoformat()}")
+                ids = [team["id"] for team in self.teams[league]]
+                rng.shuffle(ids)
+                if league == "nfl":
+                    count = {0: 1, 3: 1, 6: 13}[day.weekday()]
+                else:
+                    count = rng.randint(4, 11)
+                games = [(ids[2 * i], ids[2 * i + 1]) for i in range(min(count, len(ids) // 2))]
+            self._schedules[key] = games
+        return self._schedules[key]
+
+    def _event_id(self, league: str, day: date, slot: int) -> str:
+        return f"{ESPN_LEAGUE_DIGIT[league]}{day.strftime('%Y%m%d')}{slot:02d}"
+
+    def _decode(self, event_id: str) -> Optional[Tuple[str, date, str, str]]:
+        league = {digit: name for name, digit in ESPN_LEAGUE_DIGIT.items()}.get(event_id[:1])
+        try:
+            day = datetime.strptime(event_id[1:9], "%Y%m%d").date()
+            home, away = self.schedule(league, day)[int(event_id[9:])]
+        except (KeyError, ValueError, IndexError):
+            return None
+        return league, day, home, away
+
+    def teams_payload(self, league: str) -> dict:
+        return {"sports": [{"leagues": [{"teams": [{"team": team} for team in self.teams[league]]}]}]}
+
+    def roster_payload(self, league: str, team_id: str) -> Optional[dict]:
+        athletes = self.rosters.get((league, team_id))
+        if athletes is None:
+            return None
+        if league == "nba":
+            return {"athletes": athletes}
+        return {"athletes": [{"position": "offense", "items": athletes[:25]}, {"position": "defense", "items": athletes[25:]}]}
+
+    def scoreboard_payload(self, league: str, day: date) -> dict:
+        events = []
+        for slot, (home, away) in enumerate(self.schedule(league, day)):
+            event_id = self._event_id(league, day, slot)
+            final = day < self.today
+            competitors = self._competitors(event_id, home, away) if final else [
+                {"id": home, "homeAway": "home", "score": "0", "team": {"id": home}},
+                {"id": away, "homeAway": "away", "score": "0", "team": {"id": away}},
+            ]
+            events.append({
+                "id": event_id,
+                "date": f"{day.isoformat()}T23:30Z",
+                "season": {"year": day.year + (day.month >= 9), "type": 2},
+                "status": {"type": {"completed": final, "name": "STATUS_FINAL" if final else "STATUS_SCHEDULED"}},
+                "competitions": [{"id": event_id, "competitors": competitors}],
+            })
+        return {"events": events}
+
+    def summary_payload(self, event_id: str) -> Optional[dict]:
+        decoded = self._decode(event_id)
+        if decoded is None:
+            return None
+        league, day, home, away = decoded
+        if day >= self.today:
+            return {"header": {"id": event_id, "competitions": [{"status": {"type": {"completed": False}}}]}}
+        if event_id not in self._summaries:
+            self._summaries[event_id] = self._build_summary(event_id, league, home, away)
+        return self._summaries[event_id]
+
+    def _competitors(self, event_id: str, home: str, away: str) -> List[dict]:
+        summary = self.summary_payload(event_id)
+        return summary["header"]["competitions"][0]["competitors"]
+
+    def _build_summary(self, event_id: str, league: str, home: str, away: str) -> dict:
+        rng = random.Random(f"{self.seed}:{event_id}")
+        build = self._nba_side if league == "nba" else self._nfl_side
+        sides = {team_id: build(rng, team_id) for team_id in (home, away)}
+        scores = {team_id: side[0] for team_id, side in sides.items()}
+        if league == "nba" and scores[home] == scores[away]:
+            # No ties in basketball: overtime goes to the home side
+            scores[home] += 2
+        competitors = [
+            {
+                "id": team_id,
+                "homeAway": home_away,
+                "score": str(scores[team_id]),
+                "winner": scores[team_id] > scores[other],
+                "team": {"id": team_id},
+            }
+            for team_id, home_away, other in ((home, "home", away), (away, "away", home))
+        ]
+        return {
+            "header": {
+                "id": event_id,
+                "competitions": [{
+                    "id": event_id,
+                    "status": {"type": {"completed": True, "name": "STATUS_FINAL"}},
+                    "competitors": competitors,
+                }],
+            },
+            "boxscore": {
+                "teams": [{"team": {"id": team_id}, "statistics": sides[team_id][1]} for team_id in (home, away)],
+                "players": [{"team": {"id": team_id}, "statistics": sides[team_id][2]} for team_id in (home, away)],
+            },
+        }
+
+    @staticmethod
+    def _athlete(athlete: dict) -> dict:
+        return {key: athlete[key] for key in ("id", "displayName", "headshot", "position")}
+
+    def _nba_side(self, rng: random.Random, team_id: str) -> Tuple[int, List[dict], List[dict]]:
+        totals = Counter()
+        athletes = []
+        for slot, athlete in enumerate(self.rosters[("nba", team_id)][:10]):
+            fga, three_pa, fta = rng.randint(3, 22), rng.randint(0, 10), rng.randint(0, 10)
+            three_pa = min(three_pa, fga)
+            fgm = sum(rng.random() < 0.47 for _ in range(fga))
+            three_pm = min(fgm, sum(rng.random() < 0.36 for _ in range(three_pa)))
+            ftm = sum(rng.random() < 0.78 for _ in range(fta))
+            oreb, dreb = rng.randint(0, 4), rng.randint(0, 9)
+            line = {
+                "points": 2 * fgm + three_pm + ftm, "fgm": fgm, "fga": fga, "3pm": three_pm, "3pa": three_pa,
+                "ftm": ftm, "fta": fta, "oreb": oreb, "dreb": dreb, "ast": rng.randint(0, 10),
+                "stl": rng.randint(0, 3), "blk": rng.randint(0, 3), "tov": rng.randint(0, 5),
+            }
+            totals.update(line)
+            athletes.append({
+                "athlete": self._athlete(athlete),
+                "starter": slot < 5,
+                "didNotPlay": False,
+                "stats": [
+                    str(rng.randint(10, 40)), str(line["points"]), f"{fgm}-{fga}", f"{three_pm}-{three_pa}",
+                    f"{ftm}-{fta}", str(oreb + dreb), str(line["ast"]), str(line["tov"]), str(line["stl"]),
+                    str(line["blk"]), str(oreb), str(dreb), str(rng.randint(0, 5)), f"{rng.randint(-20, 20):+d}",
+                ],
+            })
+        team_stats = [
+            {"name": "fieldGoalsMade-fieldGoalsAttempted", "displayValue": f"{totals['fgm']}-{totals['fga']}"},
+            {"name": "fieldGoalPct", "displayValue": f"{100 * totals['fgm'] / max(totals['fga'], 1):.1f}"},
+            {"name": "threePointFieldGoalsMade-threePointFieldGoalsAttempted", "displayValue": f"{totals['3pm']}-{totals['3pa']}"},
+            {"name": "freeThrowsMade-freeThrowsAttempted", "displayValue": f"{totals['ftm']}-{totals['fta']}"},
+            {"name": "totalRebounds", "displayValue": str(totals["oreb"] + totals["dreb"])},
+            {"name": "offensiveRebounds", "displayValue": str(totals["oreb"])},
+            {"name": "defensiveRebounds", "displayValue": str(totals["dreb"])},
+            {"name": "assists", "displayValue": str(totals["ast"])},
+            {"name": "steals", "displayValue": str(totals["stl"])},
+            {"name": "blocks", "displayValue": str(totals["blk"])},
+            {"name": "turnovers", "displayValue": str(totals["tov"])},
+        ]
+        return totals["points"], team_stats, [{"names": NBA_BOX_KEYS, "keys": NBA_BOX_KEYS, "athletes": athletes}]
+
+    def _nfl_side(self, rng: random.Random, team_id: str) -> Tuple[int, List[dict], List[dict]]:
+        roster = self.rosters[("nfl", team_id)]
+        by_position: Dict[str, List[dict]] = {}
+        for athlete in roster:
+            by_position.setdefault(athlete["position"]["abbreviation"], []).append(athlete)
+        qb = by_position.get("QB", roster)[:1]
+        rushers = qb + by_position.get("RB", [])[:2]
+        receivers = by_position.get("WR", [])[:3] + by_position.get("TE", [])[:1] + by_position.get("RB", [])[:1]
+
+        attempts = rng.randint(22, 45)
+        completions = sum(rng.random() < 0.65 for _ in range(attempts))
+        passing_tds = rng.randint(0, 4)
+        passing = [{
+            "athlete": self._athlete(athlete),
+            "stats": [
+                f"{completions}/{attempts}", str(completions * rng.randint(8, 13)), "7.1", str(passing_tds),
+                str(rng.randint(0, 2)), f"{rng.randint(0, 5)}-{rng.randint(0, 30)}", "55.0", "92.1",
+            ],
+        } for athlete in qb]
+        rushing = []
+        for athlete in rushers:
+            carries = rng.randint(1, 22)
+            rushing.append({
+                "athlete": self._athlete(athlete),
+                "stats": [str(carries), str(carries * rng.randint(-1, 7)), "4.2", str(rng.randint(0, 2)), str(rng.randint(1, 40))],
+            })
+        receiving = []
+        remaining = completions
+        for athlete in receivers:
+            catches = rng.randint(0, remaining) if athlete is not receivers[-1] else remaining
+            remaining -= catches
+            receiving.append({
+                "athlete": self._athlete(athlete),
+                "stats": [str(catches), str(catches * rng.randint(5, 16)), "11.0", str(rng.randint(0, 1)),
+                          str(rng.randint(5, 50)), str(catches + rng.randint(0, 4))],
+            })
+        groups = [
+            {"name": name, "keys": NFL_BOX_KEYS[name], "athletes": athletes}
+            for name, athletes in (("passing", passing), ("rushing", rushing), ("receiving", receiving))
+        ]
+        team_stats = [{"name": "turnovers", "displayValue": str(rng.randint(0, 4))}]
+        return rng.choice((3, 6, 7, 10, 13, 14, 17, 20, 21, 23, 24, 27, 28, 31, 34, 35, 38, 42)), team_stats, groups
+
+
+class UpstreamStandIn:
+    """The aiohttp app serving both stand-ins, counting calls per upstream target"""
+
+    def __init__(
+        self,
+        fixtures: Fixtures,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int = 1,
+        espn_error_rate: float = 0.0,
+    ):
+        self.postgrest = FakePostgREST(fixtures.tables)
+        self.espn = FakeEspn(fixtures, seed)
+        self.markets = fixtures.markets
+        self.markets_by_id = fixtures.markets_by_id()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Share of ESPN calls answered with a 503, to exercise the ingestion's retries
+        self.espn_error_rate = espn_error_rate
+        # Scripted ESPN failures: the next `count` calls get `status` (and Retry-After when set)
+        self.espn_failures = {"count": 0, "status": 503, "retry_after": None}
+        # Gamma faults: share of calls answered with a 503, share held an extra slow_ms first
+        self.gamma_faults = {"error_rate": 0.0, "slow_rate": 0.0, "slow_ms": 0.0}
+        self.calls: Counter = Counter()
+        self._rng = random.Random(seed)
+
+    async def _delay(self) -> None:
+        delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    async def _gamma_fault(self) -> Optional[web.Response]:
+        """Apply the /__bench/gamma faults to one Gamma call: a 503 to send instead, or None"""
+        faults = self.gamma_faults
+        if faults["slow_rate"] and self._rng.random() < faults["slow_rate"]:
+            await asyncio.sleep(faults["slow_ms"] / 1000)
+        if faults["error_rate"] and self._rng.random() < faults["error_rate"]:
+            return web.json_response({"error": "unavailable"}, status=503)
+        return None
+
+    async def rest(self, request: web.Request) -> web.Response:
+        table = request.match_info["table"]
+        self.calls[f"supabase:{table}"] += 1
+        await self._delay()
+        try:
+            rows = self.postgrest.query(table, list(request.query.items()), request.headers.get("Range"))
+        except KeyError as e:
+            return web.json_response({"message": f"unknown relation {e}"}, status=404)
+        return web.json_response(rows)
+
+    async def rest_upsert(self, request: web.Request) -> web.Response:
+        table = request.match_info["table"]
+        self.calls[f"supabase:{table}:upsert"] += 1
+        await self._delay()
+        body = await request.json()
+        rows = self.postgrest.upsert(table, body if isinstance(body, list) else [body], request.query.get("on_conflict", ""))
+        if "return=minimal" in request.headers.get("Prefer", ""):
+            return web.Response(status=201)
+        return web.json_response(rows, status=201)
+
+    async def rest_update(self, request: web.Request) -> web.Response:
+        table = request.match_info["table"]
+        self.calls[f"supabase:{table}:update"] += 1
+        await self._delay()
+        try:
+            rows = self.postgrest.update(table, list(request.query.items()), await request.json())
+        except KeyError as e:
+            return web.json_response({"message": f"unknown relation {e}"}, status=404)
+        if "return=minimal" in request.headers.get("Prefer", ""):
+            return web.Response(status=204)
+        return web.json_response(rows)
+
+    async def espn_api(self, request: web.Request) -> web.Response:
+        league = request.match_info["league"]
+        resource = request.match_info["resource"]
+        target = re.sub(r"teams/\d+/", "teams/{id}/", resource)
+        self.calls[f"espn:/{target}"] += 1
+        await self._delay()
+        failures = self.espn_failures
+        if failures["count"] > 0:
+            failures["count"] -= 1
+            headers = {"Retry-After": failures["retry_after"]} if failures["retry_after"] is not None else None
+            return web.json_response({"error": "unavailable"}, status=failures["status"], headers=headers)
+        if self.espn_error_rate and self._rng.random() < self.espn_error_rate:
+            return web.json_response({"error": "unavailable"}, status=503)
+        if LEAGUE_TO_SPORT.get(league) != f"{request.match_info['sport']}/{league}":
+            return web.json_response({"code": 404, "message": "unknown league"}, status=404)
+
+        payload = None
+        if resource == "teams":
+            payload = self.espn.teams_payload(league)
+        elif resource.startswith("teams/") and resource.endswith("/roster"):
+            payload = self.espn.roster_payload(league, resource.split("/")[1])
+        elif resource == "scoreboard":
+            day = datetime.strptime(request.query.get("dates", self.espn.today.strftime("%Y%m%d")), "%Y%m%d").date()
+            payload = self.espn.scoreboard_payload(league, day)
+        elif resource == "summary":
+            payload = self.espn.summary_payload(request.query.get("event", ""))
+        if payload is None:
+            return web.json_response({"code": 404, "message": "not found"}, status=404)
+        return web.json_response(payload)
+
+    async def espn_clock(self, request: web.Request) -> web.Response:
+        if "today" in request.query:
+            self.espn.today = date.fromisoformat(request.query["today"])
+        if "fail" in request.query:
+            self.espn_failures = {
+                "count": int(request.query["fail"]),
+                "status": int(request.query.get("status", 503)),
+                "retry_after": request.query.get("retry_after"),
+            }
+        return web.json_response({"today": self.espn.today.isoformat(), "failures": self.espn_failures})
+
+    async def list_markets(self, request: web.Request) -> web.Response:
+        self.calls["gamma:/markets"] += 1
+        await self._delay()
+        fault = await self._gamma_fault()
+        if fault is not None:
+            return fault
+        ids = request.query.getall("id", [])
+        if ids:
+            markets = [self.markets_by_id[i] for i in ids if i in self.markets_by_id]
+        else:
+            tag_id = request.query.get("tag_id")
+            if tag_id is not None:
+                markets = self.markets.get(int(tag_id), [])
+            else:
+                markets = list(self.markets_by_id.values())
+        offset = int(request.query.get("offset", 0))
+        limit = request.query.get("limit")
+        markets = markets[offset:offset + int(limit)] if limit is not None else markets[offset:]
+        return web.json_response(markets)
+
+    async def get_market(self, request: web.Request) -> web.Response:
+        self.calls["gamma:/markets/{id}"] += 1
+        await self._delay()
+        fault = await self._gamma_fault()
+        if fault is not None:
+            return fault
+        market = self.markets_by_id.get(request.match_info["market_id"])
+        if market is None:
+            return web.json_response({"type": "not found", "error": "id not found"}, status=404)
+        return web.json_response(market)
+
+    async def move_prices(self, request: web.Request) -> web.Response:
+        """Price feed for stream benchmarks: body {market_id: first outcome's new price, or every outcome's price}"""
+        moved = {}
+        for market_id, price in (await request.json()).items():
+            market = self.markets_by_id.get(str(market_id))
+            if market is None:
+                continue
+            if isinstance(price, list):
+                market["outcomePrices"] = json.dumps([str(round(float(p), 3)) for p in price])
+            else:
+                price = round(float(price), 3)
+                market["outcomePrices"] = f'["{price}", "{round(1 - price, 3)}"]'
+            moved[market_id] = market["outcomePrices"]
+        return web.json_response(moved)
+
+    async def degrade_gamma(self, request: web.Request) -> web.Response:
+        """Gamma incidents for resilience benchmarks: body {"error_rate", "slow_rate", "slow_ms"}, omitted keys reset to 0"""
+        body = await request.json()
+        self.gamma_faults = {key: float(body.get(key, 0.0)) for key in self.gamma_faults}
+        return web.json_response(self.gamma_faults)
+
+    async def truncate(self, request: web.Request) -> web.Response:
+        table = request.query.get("table", "")
+        if table not in self.postgrest.tables:
+            return web.json_response({"message": f"unknown relation {table}"}, status=404)
+        return web.json_response({"table": table, "removed": self.postgrest.truncate(table)})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        if request.method == "POST":
+            self.calls.clear()
+        return web.json_response(dict(self.calls))
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/rest/v1/{table}", self.rest)
+        app.router.add_post("/rest/v1/{table}", self.rest_upsert)
+        app.router.add_patch("/rest/v1/{table}", self.rest_update)
+        app.router.add_get("/markets", self.list_markets)
+        app.router.add_get("/markets/{market_id}", self.get_market)
+        app.router.add_get("/apis/site/v2/sports/{sport}/{league}/{resource:.+}", self.espn_api)
+        app.router.add_route("*", "/__bench/stats", self.stats)
+        app.router.add_post("/__bench/espn", self.espn_clock)
+        app.router.add_post("/__bench/prices", self.move_prices)
+        app.router.add_post("/__bench/gamma", self.degrade_gamma)
+        app.router.add_post("/__bench/truncate", self.truncate)
+        return app
+
+
+def serve(port: int, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 1, espn_error_rate: float = 0.0) -> None:
+    """Build the fixtures and serve the stand-ins until the process is killed"""
+    stand_in = UpstreamStandIn(build_fixtures(seed), latency_ms, jitter_ms, seed, espn_error_rate)
+    web.run_app(stand_in.make_app(), host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fake PostgREST and Gamma APIs for benchmarks")
+    parser.add_argument("--port", type=int, default=54329)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Added to every upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Uniform random extra latency")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--espn-error-rate", type=float, default=0.0, help="Share of ESPN calls failing with 503")
+    args = parser.parse_args()
+    serve(args.port, args.latency_ms, args.jitter_ms, args.seed, args.espn_error_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Seeded fixture data for the benchmark stand-ins.
+
+Every table the controllers read is generated at full size: all NBA/NFL
+teams, full rosters (15 NBA / 53 NFL players per team), one
+player_vs_team_stats row per player per league opponent, home/away
+location splits, recent form and a per-game log (team_game_results) for
+two seasons, plus one Polymarket moneyline market per matchup. The same seed always yields the same rows.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+
+from resources.constants import (
+    LEAGUE_NAME_TO_LEAGUE_ID,
+    LEAGUE_TAG_IDS,
+    NBA_TEAM_IDS,
+    NFL_TEAM_IDS,
+    PLAYER_STATS_TO_AVERAGE,
+)
+
+ROSTER_SIZES = {"nba": 15, "nfl": 53}
+LEAGUE_TEAM_SLUGS = {"nba": list(NBA_TEAM_IDS), "nfl": list(NFL_TEAM_IDS)}
+SEASONS = ("2025-26", "2024-25")
+GAMES_BACK = (5, 10, 20)
+# Games per team per season in team_game_results, and the date of each season's latest round
+GAME_LOG_ROUNDS = 30
+SEASON_LAST_GAME = {"2025-26": date(2026, 1, 14), "2024-25": date(2025, 4, 13)}
+
+NBA_STATS = PLAYER_STATS_TO_AVERAGE[PLAYER_STATS_TO_AVERAGE.index("points"):]
+NFL_STATS = PLAYER_STATS_TO_AVERAGE[:PLAYER_STATS_TO_AVERAGE.index("points")]
+NBA_POSITIONS = ("PG", "SG", "SF", "PF", "C")
+NFL_POSITIONS = ("QB", "RB", "WR", "TE", "OL", "DL", "LB", "CB", "S", "K", "P")
+
+FIRST_NAMES = (
+    "James", "Michael", "Chris", "Anthony", "Kevin", "Jalen", "Tyler", "Marcus",
+    "Devin", "Josh", "Jordan", "Aaron", "Derrick", "Brandon", "Cameron", "Isaiah",
+)
+LAST_NAMES = (
+    "Johnson", "Williams", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor",
+    "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Robinson", "Walker",
+)
+
+
+@dataclass
+class Fixtures:
+    """Rows per table, keyed like the Supabase tables, plus Gamma markets per tag"""
+    tables: Dict[str, List[dict]] = field(default_factory=dict)
+    markets: Dict[int, List[dict]] = field(default_factory=dict)
+
+    def markets_by_id(self) -> Dict[str, dict]:
+        return {market["id"]: market for markets in self.markets.values() for market in markets}
+
+
+def _timestamp(rng: random.Random, base: datetime) -> str:
+    return (base - timedelta(minutes=rng.randint(0, 60 * 24 * 30))).isoformat()
+
+
+def build_fixtures(seed: int = 1) -> Fixtures:
+    """
+    Generate every fixture table.
+
+    Args:
+        seed: Random seed; equal seeds produce identical data
+
+    Returns:
+        Fixtures with rows for teams, venues, players, player_vs_team_stats,
+        team_location_splits, team_recent_form and team_game_results, and
+        markets per league tag
+    """
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+    fixtures = Fixtures(tables={
+        "venues": [],
+        "teams": [],
+        "players": [],
+        "player_vs_team_stats": [],
+        "team_location_splits": [],
+        "team_recent_form": [],
+        "team_game_results": [],
+    })
+    tables = fixtures.tables
+
+    for league in ("nfl", "nba"):
+        league_id = LEAGUE_NAME_TO_LEAGUE_ID[league]
+        teams = []
+        for slug in LEAGUE_TEAM_SLUGS[league]:
+            team_id = len(tables["teams"]) + 1
+            tables["venues"].append({
+                "id": team_id,
+                "name": f"{slug.capitalize()} Arena",
+                "city": None,
+                "state": "NA",
+                "is_indoor": league == "nba",
+                "surface_type": None,
+                "created_at": now.isoformat(),
+            })
+            team = {
+                "id": team_id,
+                "venue_id": team_id,
+                "league_id": league_id,
+                "team_name": slug.capitalize(),
+                "abbreviation": f"{league[0].upper()}{team_id:02d}",
+                "logo_url": None,
+                "created_at": now.isoformat(),
+                "last_updated": _timestamp(rng, now),
+            }
+            tables["teams"].append(team)
+            teams.append(team)
+
+        for team in teams:
+            _add_roster(rng, now, league, team, teams, tables)
+            _add_team_rows(rng, now, team, tables)
+
+        fixtures.markets[LEAGUE_TAG_IDS[league]] = _build_markets(rng, now, league, teams)
+
+    # Own generator, so adding the game log left every other table's rows unchanged
+    game_rng = random.Random(f"{seed}:team_game_results")
+    for league_id in (LEAGUE_NAME_TO_LEAGUE_ID["nfl"], LEAGUE_NAME_TO_LEAGUE_ID["nba"]):
+        league_teams = [team for team in tables["teams"] if team["league_id"] == league_id]
+        _add_game_log(game_rng, now, league_teams, tables)
+
+    return fixtures
+
+
+def _add_roster(rng: random.Random, now: datetime, league: str, team: dict, teams: List[dict], tables: dict) -> None:
+    positions = NBA_POSITIONS if league == "nba" else NFL_POSITIONS
+    stats = NBA_STATS if league == "nba" else NFL_STATS
+    opponents = [t for t in teams if t["id"] != team["id"]]
+
+    for slot in range(ROSTER_SIZES[league]):
+        player_id = len(tables["players"]) + 1
+        tables["players"].append({
+            "id": player_id,
+            "team_id": team["id"],
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "photo_url": None,
+            "position": positions[slot % len(positions)],
+            "status": "Active",
+            "created_at": now.isoformat(),
+        })
+
+        for opponent in opponents:
+            games = rng.randint(1, 12)
+            row = {
+                "id": len(tables["player_vs_team_stats"]) + 1,
+                "player_id": player_id,
+                "opponent_team_id": opponent["id"],
+                "season_count": rng.randint(1, 5),
+                "games": games,
+                "starts": rng.randint(0, games),
+                "wins": None,
+                "losses": None,
+                "ties": None,
+                "last_game_date": (now.date() - timedelta(days=rng.randint(1, 400))).isoformat(),
+                "last_updated": _timestamp(rng, now),
+            }
+            row.update({stat: None for stat in PLAYER_STATS_TO_AVERAGE})
+            row.update({stat: rng.randint(0, 40) * games for stat in stats})
+            row["wins"] = rng.randint(0, games)
+            row["losses"] = games - row["wins"]
+            row["ties"] = 0
+            tables["player_vs_team_stats"].append(row)
+
+
+def _add_team_rows(rng: random.Random, now: datetime, team: dict, tables: dict) -> None:
+    for season in SEASONS:
+        for location in ("home", "away"):
+            games = rng.randint(10, 41)
+            wins = rng.randint(0, games)
+            points = round(rng.uniform(95, 125), 1)
+            allowed = round(rng.uniform(95, 125), 1)
+            tables["team_location_splits"].append({
+                "id": len(tables["team_location_splits"]) + 1,
+                "team_id": team["id"],
+                "season": season,
+                "location": location,
+                "games": games,
+                "wins": wins,
+                "losses": games - wins,
+                "win_pct": round(wins / games, 3),
+                "points_per_game": points,
+                "points_against_per_game": allowed,
+                "plus_minus": round(points - allowed, 1),
+                **_shooting_and_per_game(rng),
+                "offensive_rating": round(rng.uniform(105, 120), 1),
+                "defensive_rating": round(rng.uniform(105, 120), 1),
+                "last_updated": _timestamp(rng, now),
+            })
+
+        for games_back in GAMES_BACK:
+            wins = rng.randint(0, games_back)
+            points = round(rng.uniform(95, 125), 1)
+            allowed = round(rng.uniform(95, 125), 1)
+            last_game = now.date() - timedelta(days=rng.randint(0, 5))
+            tables["team_recent_form"].append({
+                "id": len(tables["team_recent_form"]) + 1,
+                "team_id": team["id"],
+                "season": season,
+                "games_back": games_back,
+                "games": games_back,
+                "wins": wins,
+                "losses": games_back - wins,
+                "win_pct": round(wins / games_back, 3),
+                "streak_type": rng.choice("WL"),
+                "streak_count": rng.randint(1, 5),
+                "points_per_game": points,
+                "points_against_per_game": allowed,
+                "point_differential": round(points - allowed, 1),
+                **_shooting_and_per_game(rng),
+                "first_game_date": (last_game - timedelta(days=2 * games_back)).isoformat(),
+                "last_game_date": last_game.isoformat(),
+                "last_updated": _timestamp(rng, now),
+            })
+
+
+def _add_game_log(rng: random.Random, now: datetime, teams: List[dict], tables: dict) -> None:
+    """GAME_LOG_ROUNDS rounds per season, every team paired with a random opponent each round"""
+    rows = tables["team_game_results"]
+    for season in SEASONS:
+        for round_index in range(GAME_LOG_ROUNDS):
+            day = SEASON_LAST_GAME[season] - timedelta(days=2 * (GAME_LOG_ROUNDS - 1 - round_index))
+            order = teams[:]
+            rng.shuffle(order)
+            for slot, (home, away) in enumerate(zip(order[::2], order[1::2])):
+                game_id = f"{home['league_id']}{day:%Y%m%d}{slot:02d}"
+                home_line, away_line = _box_score(rng), _box_score(rng)
+                if home_line["points_scored"] == away_line["points_scored"]:
+                    home_line["points_scored"] += 1
+                for team, line, opponent_line, is_home in (
+                    (home, home_line, away_line, True),
+                    (away, away_line, home_line, False),
+                ):
+                    won = line["points_scored"] > opponent_line["points_scored"]
+                    rows.append({
+                        "id": len(rows) + 1,
+                        "team_id": team["id"],
+                        "opponent_team_id": (away if is_home else home)["id"],
+                        "game_id": game_id,
+                        "season": season,
+                        "game_date": day.isoformat(),
+                        "is_home": is_home,
+                        "result": "W" if won else "L",
+                        **line,
+                        "points_allowed": opponent_line["points_scored"],
+                        "last_updated": _timestamp(rng, now),
+                    })
+
+
+def _box_score(rng: random.Random) -> dict:
+    attempts, threes, free_throws = rng.randint(80, 95), rng.randint(28, 42), rng.randint(15, 28)
+    made, threes_made, free_throws_made = (
+        round(attempts * rng.uniform(0.42, 0.50)),
+        round(threes * rng.uniform(0.32, 0.40)),
+        round(free_throws * rng.uniform(0.70, 0.85)),
+    )
+    return {
+        "points_scored": 2 * (made - threes_made) + 3 * threes_made + free_throws_made,
+        "field_goals_made": made,
+        "field_goal_attempts": attempts,
+        "three_pt_made": threes_made,
+        "three_pt_attempts": threes,
+        "free_throws_made": free_throws_made,
+        "free_throw_attempts": free_throws,
+        "rebounds_total": rng.randint(38, 50),
+        "rebounds_offensive": rng.randint(8, 14),
+        "assists": rng.randint(20, 30),
+        "steals": rng.randint(5, 10),
+        "blocks": rng.randint(3, 7),
+        "turnovers": rng.randint(11, 17),
+    }
+
+
+def _shooting_and_per_game(rng: random.Random) -> dict:
+    return {
+        "field_goal_pct": round(rng.uniform(0.42, 0.50), 3),
+        "three_pt_pct": round(rng.uniform(0.32, 0.40), 3),
+        "free_throw_pct": round(rng.uniform(0.70, 0.85), 3),
+        "rebounds_per_game": round(rng.uniform(38, 50), 1),
+        "assists_per_game": round(rng.uniform(20, 30), 1),
+        "steals_per_game": round(rng.uniform(5, 10), 1),
+        "blocks_per_game": round(rng.uniform(3, 7), 1),
+        "turnovers_per_game": round(rng.uniform(11, 17), 1),
+    }
+
+
+def _build_markets(rng: random.Random, now: datetime, league: str, teams: List[dict]) -> List[dict]:
+    """One moneyline market per matchup, teams paired off at random"""
+    shuffled = list(teams)
+    rng.shuffle(shuffled)
+    markets = []
+    for away, home in zip(shuffled[::2], shuffled[1::2]):
+        market_id = str(500000 + away["id"] * 100 + home["id"])
+        price = round(rng.uniform(0.2, 0.8), 3)
+        game_day: date = (now + timedelta(days=rng.randint(0, 6))).date()
+        markets.append({
+            "id": market_id,
+            "question": f"{away['team_name']} vs. {home['team_name']}",
+            "slug": f"{league}-{away['abbreviation'].lower()}-{home['abbreviation'].lower()}-{game_day.isoformat()}",
+            "outcomes": f'["{away["team_name"]}", "{home["team_name"]}"]',
+            "outcomePrices": f'["{price}", "{round(1 - price, 3)}"]',
+            "sportsMarketType": "moneyline",
+            "closed": False,
+            "active": True,
+            "volume": str(rng.randint(1000, 2000000)),
+            "liquidity": str(rng.randint(1000, 200000)),
+            "endDate": f"{game_day.isoformat()}T23:00:00Z",
+            "gameStartTime": f"{game_day.isoformat()} 23:00:00+00",
+        })
+    return markets
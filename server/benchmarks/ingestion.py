@@ -0,0 +1,221 @@
+"""
+ESPN ingestion throughput and correctness against the local stand-ins.
+
+    python -m benchmarks.ingestion [--league all] [--latency-ms 50] [--espn-error-rate 0.02] [--verify]
+
+Starts benchmarks.fakes (PostgREST, and ESPN playing a seeded schedule up
+to --today), then per league:
+  - backfills the current season and reports wall time, games, rows written
+    and upstream calls by target (retries of the injected 503s included)
+  - moves the stand-in's clock forward --days-ahead days and times the
+    nightly incremental run, which should only fetch the new games
+With --verify, a second stand-in gets one clean backfill up to the later
+date and every player_vs_team_stats, team_location_splits, team_recent_form
+and team_game_results row must match what backfill + incremental wrote.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, List
+
+import aiohttp
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from supabase import AsyncClient  # noqa: E402
+
+from benchmarks.run import SUPABASE_KEY, start_upstream  # noqa: E402
+from ingestion import Checkpoint, EspnClient, IngestionPipeline, SupabaseWriter  # noqa: E402
+from ingestion.seasons import season_for  # noqa: E402
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID, LEAGUE_TO_SPORT  # noqa: E402
+
+# Rows compared by --verify: table -> columns identifying a row (ids differ between stand-ins)
+VERIFIED_TABLES = {
+    "team_game_results": ("team_id", "game_id"),
+    "team_location_splits": ("team_id", "season", "location"),
+    "team_recent_form": ("team_id", "season", "games_back"),
+}
+
+
+def pipeline_for(upstream: str, session: aiohttp.ClientSession, checkpoint_dir: str, concurrency: int) -> IngestionPipeline:
+    return IngestionPipeline(
+        EspnClient(session, base_url=f"{upstream}/apis/site/v2/sports", concurrency=concurrency, backoff=0.05),
+        SupabaseWriter(AsyncClient(upstream, SUPABASE_KEY)),
+        Checkpoint(checkpoint_dir),
+    )
+
+
+async def upstream_calls(session: aiohttp.ClientSession, upstream: str, reset: bool = False) -> Dict[str, int]:
+    async with session.request("POST" if reset else "GET", f"{upstream}/__bench/stats") as response:
+        return await response.json()
+
+
+async def set_clock(session: aiohttp.ClientSession, upstream: str, today: date) -> None:
+    async with session.post(f"{upstream}/__bench/espn", params={"today": today.isoformat()}) as response:
+        response.raise_for_status()
+
+
+async def clear_game_log(session: aiohttp.ClientSession, upstream: str) -> None:
+    """
+    Drop the fixtures' synthetic team_game_results rows (seeded for the API benchmarks).
+
+    An incremental run recomputes splits and recent form from the stored
+    season log, while a backfill uses only the games it ingested, so
+    leftover rows for the same teams would make the two disagree.
+    """
+    async with session.post(f"{upstream}/__bench/truncate", params={"table": "team_game_results"}) as response:
+        response.raise_for_status()
+
+
+async def snapshot(session: aiohttp.ClientSession, upstream: str, league: str) -> Dict[str, dict]:
+    """Rows written for a league's teams, keyed by natural key (ESPN id for players)"""
+    async def read(path: str) -> List[dict]:
+        rows, start = [], 0
+        while True:
+            headers = {"Range": f"{start}-{start + 999}"}
+            async with session.get(f"{upstream}/rest/v1/{path}&order=id", headers=headers) as response:
+                page = await response.json()
+            rows.extend(page)
+            if len(page) < 1000:
+                return rows
+            start += 1000
+
+    league_id = LEAGUE_NAME_TO_LEAGUE_ID[league]
+    team_ids = {row["id"] for row in await read(f"teams?select=id&league_id=eq.{league_id}")}
+    tables = {}
+    stats = await read("player_vs_team_stats?select=*,players!inner(espn_id)&players.espn_id=gte.0")
+    tables["player_vs_team_stats"] = {
+        # players.id depends on insert order across leagues; the ESPN id does not
+        (row["players"]["espn_id"], row["opponent_team_id"]): _comparable(row, "player_id")
+        for row in stats if row["opponent_team_id"] in team_ids
+    }
+    for table, key in VERIFIED_TABLES.items():
+        tables[table] = {
+            tuple(row[column] for column in key): _comparable(row)
+            for row in await read(f"{table}?select=*") if row["team_id"] in team_ids
+        }
+    return tables
+
+
+def _comparable(row: dict, *ignored: str) -> dict:
+    return {k: v for k, v in row.items() if k not in ("id", "last_updated", "players", *ignored)}
+
+
+async def run_league(args: argparse.Namespace, league: str, upstream: str, workdir: str) -> dict:
+    today = date.fromisoformat(args.today)
+    later = today + timedelta(days=args.days_ahead)
+    season = season_for(league, today)
+    async with aiohttp.ClientSession() as session:
+        pipeline = pipeline_for(upstream, session, os.path.join(workdir, league), args.concurrency)
+        await clear_game_log(session, upstream)
+        await set_clock(session, upstream, today)
+
+        await upstream_calls(session, upstream, reset=True)
+        backfill = await pipeline.backfill(league, [season], today)
+        backfill_calls = await upstream_calls(session, upstream)
+
+        await set_clock(session, upstream, later)
+        await upstream_calls(session, upstream, reset=True)
+        incremental = await pipeline.incremental(league, later)
+        incremental_calls = await upstream_calls(session, upstream)
+        result = {
+            "league": league,
+            "season": season,
+            "backfill": vars(backfill),
+            "backfill_calls": backfill_calls,
+            "incremental": vars(incremental),
+            "incremental_calls": incremental_calls,
+        }
+        if args.verify:
+            result["verified"] = await verify(args, league, season, later, upstream, session, workdir)
+    return result
+
+
+async def verify(
+    args: argparse.Namespace,
+    league: str,
+    season: str,
+    later: date,
+    upstream: str,
+    session: aiohttp.ClientSession,
+    workdir: str,
+) -> bool:
+    """Compare backfill + incremental with one clean backfill on a fresh stand-in"""
+    process = start_upstream(args.port + 1, 0, 0, args.seed)
+    try:
+        fresh = f"http://127.0.0.1:{args.port + 1}"
+        await clear_game_log(session, fresh)
+        await set_clock(session, fresh, later)
+        pipeline = pipeline_for(fresh, session, os.path.join(workdir, f"{league}-fresh"), args.concurrency)
+        await pipeline.backfill(league, [season], later)
+        expected = await snapshot(session, fresh, league)
+    finally:
+        process.terminate()
+        process.join()
+    actual = await snapshot(session, upstream, league)
+    for table, rows in expected.items():
+        if rows != actual[table]:
+            missing = len(rows.keys() - actual[table].keys())
+            differing = sum(1 for key in rows.keys() & actual[table].keys() if rows[key] != actual[table][key])
+            print(f"{league} {table}: {missing} missing, {differing} differing of {len(rows)} rows")
+            return False
+    return True
+
+
+def print_result(result: dict) -> None:
+    for mode in ("backfill", "incremental"):
+        report, calls = result[mode], result[f"{mode}_calls"]
+        espn = {k.split(":", 1)[1]: v for k, v in calls.items() if k.startswith("espn:")}
+        writes = sum(v for k, v in calls.items() if k.startswith("supabase:"))
+        print(
+            f"{result['league']} {mode:<12}{report['seconds']:8.2f} s  {report['days']:4d} days  "
+            f"{report['games']:5d} games  {report['player_rows']:6d} player rows  "
+            f"{writes:4d} supabase calls  espn {espn}"
+        )
+    if "verified" in result:
+        print(f"{result['league']} incremental matches a clean backfill: {result['verified']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ESPN ingestion against local stand-ins")
+    parser.add_argument("--league", choices=sorted(LEAGUE_TO_SPORT) + ["all"], default="all")
+    parser.add_argument("--port", type=int, default=54339, help="Port for the stand-ins (--verify also uses port + 1)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency added to every upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Uniform random extra upstream latency")
+    parser.add_argument("--espn-error-rate", type=float, default=0.02, help="Share of ESPN calls failing with 503")
+    parser.add_argument("--concurrency", type=int, default=16, help="ESPN requests in flight")
+    parser.add_argument("--today", default="2026-01-15", help="Stand-in date the backfill runs on")
+    parser.add_argument("--days-ahead", type=int, default=1, help="Days of games the incremental run picks up")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verify", action="store_true", help="Check incremental results against a clean backfill")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    leagues = sorted(LEAGUE_TO_SPORT) if args.league == "all" else [args.league]
+    upstream_process = start_upstream(args.port, args.latency_ms, args.jitter_ms, args.seed, args.espn_error_rate)
+    workdir = tempfile.TemporaryDirectory(prefix="shadowtrader-ingestion-")
+    try:
+        results = []
+        for league in leagues:
+            result = asyncio.run(run_league(args, league, f"http://127.0.0.1:{args.port}", workdir.name))
+            print_result(result)
+            results.append(result)
+    finally:
+        upstream_process.terminate()
+        upstream_process.join()
+        workdir.cleanup()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
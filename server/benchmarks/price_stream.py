@@ -0,0 +1,225 @@
+"""
+Live price stream fan-out against the local stand-ins.
+
+    python -m benchmarks.price_stream [--clients 1,50,200] [--markets 10] [--seconds 5]
+
+Starts benchmarks.fakes and serves the app with uvicorn on a local port
+(SSE needs a real socket; in-process ASGI transports buffer whole bodies).
+For each client count, that many clients stream the same --markets markets
+from /api/v1/market/stream while the fake price feed moves every market's
+price every --move-ms. Reports:
+  - Gamma calls per market per second, which should stay near
+    1 / PRICE_STREAM.interval however many clients are connected
+  - delivery latency from a price move to each client receiving it
+  - whether every client ended on the last price of every market
+Then checks slow-consumer eviction on the hub directly: a subscriber that
+never reads is evicted once its queue overflows, while a reading one is not.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import aiohttp
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+import uvicorn  # noqa: E402
+
+from benchmarks.fixtures import build_fixtures  # noqa: E402
+from benchmarks.run import API_KEY, percentile, start_upstream, write_config  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StreamClient:
+    """Reads one SSE stream, recording when each market's price arrived and the latest prices"""
+
+    def __init__(self):
+        # (market id, first outcome's price) -> when it arrived; moves are identified by that price
+        self.received: Dict[Tuple[int, str], float] = {}
+        self.prices: Dict[int, Dict[str, str]] = {}
+        self.connected = asyncio.Event()
+        self.events = 0
+
+    def last(self) -> Dict[int, str]:
+        return {market_id: next(iter(prices.values())) for market_id, prices in self.prices.items()}
+
+    async def run(self, session: aiohttp.ClientSession, url: str) -> None:
+        async with session.get(url, headers={"X-API-Key": API_KEY}) as response:
+            response.raise_for_status()
+            self.connected.set()
+            name = None
+            async for line in response.content:
+                line = line.decode().rstrip("\n")
+                if line.startswith("event: "):
+                    name = line[len("event: "):]
+                elif line.startswith("data: ") and name in ("snapshot", "price"):
+                    data = json.loads(line[len("data: "):])
+                    # A price event carries only the outcomes that moved
+                    prices = self.prices.setdefault(data["id"], {})
+                    prices.update(data["prices"])
+                    self.received.setdefault((data["id"], next(iter(prices.values()))), time.perf_counter())
+                    self.events += 1
+
+
+async def fan_out(args: argparse.Namespace, app_url: str, upstream: str, market_ids: List[str], clients: int) -> dict:
+    async with aiohttp.ClientSession() as control, aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=0), timeout=aiohttp.ClientTimeout(total=None)
+    ) as session:
+        url = f"{app_url}/api/v1/market/stream?ids={','.join(market_ids)}"
+        readers = [StreamClient() for _ in range(clients)]
+        tasks = [asyncio.create_task(reader.run(session, url)) for reader in readers]
+        await asyncio.gather(*(reader.connected.wait() for reader in readers))
+        await asyncio.sleep(args.interval * 2)
+
+        await (await control.post(f"{upstream}/__bench/stats")).release()
+        moves: Dict[Tuple[int, str], float] = {}
+        started = time.perf_counter()
+        step = 0
+        while time.perf_counter() - started < args.seconds:
+            step += 1
+            prices = {market_id: round(0.2 + ((step * 7 + i) % 60) / 100, 3) for i, market_id in enumerate(market_ids)}
+            async with control.post(f"{upstream}/__bench/prices", json=prices) as response:
+                await response.json()
+            moved_at = time.perf_counter()
+            for market_id, price in prices.items():
+                moves[(int(market_id), str(price))] = moved_at
+            await asyncio.sleep(args.move_ms / 1000)
+        elapsed = time.perf_counter() - started
+        async with control.get(f"{upstream}/__bench/stats") as response:
+            calls = await response.json()
+        # Let the last move reach everyone
+        await asyncio.sleep(args.interval * 3)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    final = {int(market_id): str(price) for market_id, price in prices.items()}
+    latencies = sorted(
+        (reader.received[key] - moved_at) * 1000
+        for reader in readers
+        for key, moved_at in moves.items()
+        if key in reader.received and reader.received[key] >= moved_at
+    )
+    gamma_calls = calls.get("gamma:/markets/{id}", 0)
+    return {
+        "clients": clients,
+        "markets": len(market_ids),
+        "moves": step,
+        "gamma_calls_per_market_per_s": round(gamma_calls / len(market_ids) / elapsed, 2),
+        "delivery_p50_ms": round(percentile(latencies, 50), 1),
+        "delivery_p95_ms": round(percentile(latencies, 95), 1),
+        "events_per_client": round(statistics.fmean(reader.events for reader in readers), 1),
+        "all_clients_current": all(reader.last() == final for reader in readers),
+    }
+
+
+async def eviction(upstream: str, market_ids: List[str], queue_size: int) -> dict:
+    """A never-reading subscriber is evicted after queue_size updates; a reading one keeps up"""
+    from resources import singletons
+    from resources.price_hub import PriceHub
+
+    hub = PriceHub(singletons.league_controller, interval=0.02, queue_size=queue_size, heartbeat=60)
+    ids = [int(market_ids[0])]
+    slow = hub.subscribe(ids)
+    fast = hub.subscribe(ids)
+    drained = 0
+
+    async def read_fast():
+        nonlocal drained
+        while True:
+            await fast.queue.get()
+            drained += 1
+
+    reader = asyncio.create_task(read_fast())
+    async with aiohttp.ClientSession() as control:
+        for step in range(queue_size * 3):
+            price = 0.3 + (step % 2) * 0.1 + step / 10000
+            async with control.post(f"{upstream}/__bench/prices", json={market_ids[0]: price}) as response:
+                await response.json()
+            await asyncio.sleep(0.05)
+    reader.cancel()
+    await hub.stop()
+    return {
+        "queue_size": queue_size,
+        "slow_evicted": slow.evicted,
+        "slow_last_event": slow.queue.get_nowait()[0] if not slow.queue.empty() else None,
+        "fast_evicted": fast.evicted,
+        "fast_events": drained,
+    }
+
+
+async def run(args: argparse.Namespace, upstream: str) -> None:
+    app_module = importlib.import_module("main")
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        market_ids = [market["id"] for market in build_fixtures(args.seed).markets_by_id().values()][:args.markets]
+        for clients in [int(n) for n in args.clients.split(",")]:
+            result = await fan_out(args, f"http://127.0.0.1:{port}", upstream, market_ids, clients)
+            print(
+                f"{result['clients']:>5} clients x {result['markets']} markets  "
+                f"gamma {result['gamma_calls_per_market_per_s']:>5.2f} calls/market/s  "
+                f"delivery p50 {result['delivery_p50_ms']:>7.1f}ms p95 {result['delivery_p95_ms']:>7.1f}ms  "
+                f"{result['events_per_client']:>6.1f} events/client  current: {result['all_clients_current']}",
+                flush=True,
+            )
+        result = await eviction(upstream, market_ids, args.queue_size)
+        print(
+            f"eviction (queue {result['queue_size']}): never-reading subscriber evicted: {result['slow_evicted']} "
+            f"(last event {result['slow_last_event']!r}); reading subscriber evicted: {result['fast_evicted']} "
+            f"after {result['fast_events']} events"
+        )
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the SSE price stream against a fake price feed")
+    parser.add_argument("--port", type=int, default=54349, help="Port for the upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency added to every upstream call")
+    parser.add_argument("--clients", default="1,50,200", help="Comma-separated client counts to run")
+    parser.add_argument("--markets", type=int, default=10, help="Markets every client follows")
+    parser.add_argument("--seconds", type=float, default=5.0, help="How long prices move per client count")
+    parser.add_argument("--move-ms", type=float, default=500.0, help="Time between price moves")
+    parser.add_argument("--interval", type=float, default=0.25, help="PRICE_STREAM.interval (seconds between polls)")
+    parser.add_argument("--queue-size", type=int, default=8, help="PRICE_STREAM.queue_size for the eviction check")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    upstream_process = start_upstream(args.port, args.latency_ms, 0.0, args.seed)
+    workdir = tempfile.TemporaryDirectory(prefix="shadowtrader-stream-")
+    cwd = os.getcwd()
+    try:
+        write_config(workdir.name, args.port, [f"PRICE_STREAM.interval={args.interval}"])
+        # resources.singletons reads ./config.ini at import
+        os.chdir(workdir.name)
+        asyncio.run(run(args, f"http://127.0.0.1:{args.port}"))
+    finally:
+        os.chdir(cwd)
+        upstream_process.terminate()
+        upstream_process.join()
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
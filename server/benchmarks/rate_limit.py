@@ -0,0 +1,156 @@
+"""
+Rate limiter overhead and cross-worker accuracy.
+
+    python -m benchmarks.rate_limit [--hits 200000] [--processes 4]
+
+Reports:
+  - microseconds per limiter hit for the per-process memory:// storage and
+    the shared-memory shm:// storage, over many distinct client keys
+  - microseconds per request that RateLimitMiddleware (and, for reference,
+    slowapi's own ASGI middleware) adds to a minimal FastAPI app
+  - with several processes hammering one key through shm://, how many hits
+    were allowed versus the limit (exactly the limit when counters are
+    really shared; processes x limit with memory://)
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from fastapi import FastAPI  # noqa: E402
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import FixedWindowRateLimiter  # noqa: E402
+from slowapi import Limiter  # noqa: E402
+from slowapi.middleware import SlowAPIASGIMiddleware  # noqa: E402
+from slowapi.util import get_remote_address  # noqa: E402
+
+from resources.rate_limit import RateLimitMiddleware  # noqa: E402  (also registers the shm:// scheme)
+
+UNREACHABLE_LIMIT = "1000000000/minute"
+
+
+def time_storage_hits(uri: str, hits: int, clients: int) -> float:
+    """Microseconds per FixedWindowRateLimiter.hit() over `clients` distinct keys"""
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    item = parse(UNREACHABLE_LIMIT)
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(clients)]
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(item, "ip", keys[i % clients])
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def time_middleware(uri: str, requests: int, middleware: str = "") -> float:
+    """Microseconds per in-process ASGI request to a trivial route, with or without a limiter middleware"""
+    app = FastAPI()
+
+    @app.get("/api/v1/league/{league}")
+    async def league(league: str):
+        return {"league": league}
+
+    if middleware == "slowapi":
+        app.state.limiter = Limiter(key_func=get_remote_address, default_limits=[UNREACHABLE_LIMIT], storage_uri=uri)
+        app.add_middleware(SlowAPIASGIMiddleware)
+    elif middleware:
+        limiter = Limiter(key_func=get_remote_address, storage_uri=uri)
+        app.add_middleware(RateLimitMiddleware, limiter=limiter, limits=UNREACHABLE_LIMIT)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/league/nba",
+        "raw_path": b"/api/v1/league/nba",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("10.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def drive() -> float:
+        for _ in range(200):
+            await app(dict(scope), receive, send)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        return (time.perf_counter() - start) / requests * 1e6
+
+    return asyncio.run(drive())
+
+
+def _hammer(uri: str, limit: str, hits: int, results) -> None:
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    item = parse(limit)
+    results.put(sum(limiter.hit(item, "10.0.0.1", "/api/v1/league/nba") for _ in range(hits)))
+
+
+def shared_accuracy(uri: str, processes: int, limit_count: int) -> int:
+    """Total hits allowed when `processes` workers each try 2x the limit on one key"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=_hammer, args=(uri, f"{limit_count}/hour", limit_count * 2, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return allowed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure rate limiter overhead and cross-process accuracy")
+    parser.add_argument("--hits", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=10000, help="Distinct client keys for the storage benchmark")
+    parser.add_argument("--requests", type=int, default=20000, help="ASGI requests for the middleware benchmark")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=1000, help="Limit used by the accuracy check")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shadowtrader-ratelimit-") as directory:
+        shm = f"shm://{os.path.join(directory, 'counters')}"
+        # Fresh counter files per phase so phases do not see each other's windows
+        shm_accuracy = f"shm://{os.path.join(directory, 'accuracy')}"
+
+        print(f"storage hit, memory://                 {time_storage_hits('memory://', args.hits, args.clients):8.2f} us")
+        print(f"storage hit, shm://                    {time_storage_hits(shm, args.hits, args.clients):8.2f} us")
+
+        baseline = time_middleware("", args.requests)
+        print(f"request, no limiter                    {baseline:8.2f} us")
+        for middleware, uri in (
+            ("RateLimitMiddleware", "memory://"),
+            ("RateLimitMiddleware", f"shm://{os.path.join(directory, 'middleware')}"),
+            ("slowapi", f"shm://{os.path.join(directory, 'slowapi')}"),
+        ):
+            per_request = time_middleware(uri, args.requests, middleware)
+            label = f"{middleware}, {uri.split(':')[0]}://"
+            print(f"request, {label:<30}{per_request:8.2f} us  (+{per_request - baseline:.2f} us)")
+
+        allowed = shared_accuracy(shm_accuracy, args.processes, args.limit)
+        print(
+            f"{args.processes} processes x {args.limit * 2} hits on one key, limit {args.limit}: "
+            f"{allowed} allowed via shm:// (per-process memory:// would allow {args.processes * args.limit})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Polymarket incidents against the local stand-ins.
+
+    python -m benchmarks.resilience [--requests 400] [--concurrency 8] [--slow-rate 0.03] [--slow-ms 400]
+
+Serves /api/v1/market/{id} in-process with the market cache off (every
+request calls Gamma) and degrades the Gamma stand-in through /__bench/gamma:
+  - slow tail: --slow-rate of calls take --slow-ms longer; run with hedging
+    off, then on. Hedging should cut p99 for a few percent more Gamma calls.
+  - hang: every call hangs past POLYMARKET.call_timeout. The first
+    failure_threshold requests wait out the call timeout; once the circuit
+    opens, requests are answered at once, with the last good market marked
+    stale (X-Stale), or a 503 with Retry-After for markets never fetched.
+  - outage: every call is a 503; same expectations, then recovery once the
+    stand-in is healthy again and the circuit's probe succeeds.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import List
+
+import aiohttp
+import httpx
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from benchmarks.fixtures import build_fixtures  # noqa: E402
+from benchmarks.run import API_KEY, percentile, start_upstream, write_config  # noqa: E402
+
+
+async def drive(client: httpx.AsyncClient, market_ids: List[str], requests: int, concurrency: int) -> dict:
+    """`requests` GETs of /market/{id} over `market_ids` from `concurrency` workers"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            market_id = market_ids[remaining % len(market_ids)]
+            started = time.perf_counter()
+            response = await client.get(f"/api/v1/market/{market_id}")
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code == 200 and "X-Stale" in response.headers:
+                statuses["200 stale"] += 1
+            elif response.status_code == 503 and "Retry-After" in response.headers:
+                statuses["503 retry-after"] += 1
+            else:
+                statuses[str(response.status_code)] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1),
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+async def phase(
+    name: str,
+    client: httpx.AsyncClient,
+    upstream: aiohttp.ClientSession,
+    upstream_url: str,
+    market_ids: List[str],
+    args: argparse.Namespace,
+    requests: int = None,
+) -> dict:
+    await (await upstream.post(f"{upstream_url}/__bench/stats")).release()
+    result = await drive(client, market_ids, requests or args.requests, args.concurrency)
+    async with upstream.get(f"{upstream_url}/__bench/stats") as response:
+        calls = sum((await response.json()).values())
+    result["gamma_calls_per_request"] = round(calls / (requests or args.requests), 3)
+    print(
+        f"{name:<28} p50 {result['p50_ms']:>7.1f}ms  p95 {result['p95_ms']:>7.1f}ms  p99 {result['p99_ms']:>7.1f}ms  "
+        f"max {result['max_ms']:>7.1f}ms  gamma {result['gamma_calls_per_request']:>5.3f}/req  {result['statuses']}",
+        flush=True,
+    )
+    return result
+
+
+async def degrade(upstream: aiohttp.ClientSession, upstream_url: str, **faults: float) -> None:
+    async with upstream.post(f"{upstream_url}/__bench/gamma", json=faults) as response:
+        await response.json()
+
+
+async def run(args: argparse.Namespace, upstream_url: str) -> None:
+    app_module = importlib.import_module("main")
+    async with app_module.lifespan(app_module.app):
+        from resources import singletons
+
+        guard = singletons.polymarket_guard
+        market_ids = list(build_fixtures(args.seed).markets_by_id())
+        # Markets fetched before the incidents, and markets nobody asked for yet
+        known, unknown = market_ids[:args.markets], market_ids[args.markets:args.markets * 2]
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app_module.app),
+            base_url="http://bench",
+            headers={"X-API-Key": API_KEY},
+            timeout=None,
+        ) as client, aiohttp.ClientSession() as upstream:
+            for hedge in (False, True):
+                guard.hedge = hedge
+                guard._windows.clear()
+                await degrade(upstream, upstream_url)
+                # Latency samples for the hedge delay
+                await drive(client, known, guard.min_samples * 2, args.concurrency)
+                await degrade(upstream, upstream_url, slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+                await phase(f"slow tail, hedge {'on' if hedge else 'off'}", client, upstream, upstream_url, known, args)
+
+            await degrade(upstream, upstream_url, slow_rate=1.0, slow_ms=60_000)
+            await phase("hang, fetched markets", client, upstream, upstream_url, known, args)
+            await phase("hang, never fetched", client, upstream, upstream_url, unknown, args, requests=args.markets)
+
+            await degrade(upstream, upstream_url)
+            # Let the open circuit admit its probe
+            await asyncio.sleep(guard.breaker.retry_after())
+            await phase("recovered", client, upstream, upstream_url, known, args)
+
+            await degrade(upstream, upstream_url, error_rate=1.0)
+            await phase("outage (503s), fetched", client, upstream, upstream_url, known, args)
+            await degrade(upstream, upstream_url)
+            await asyncio.sleep(guard.breaker.retry_after())
+            await phase("recovered", client, upstream, upstream_url, known, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Polymarket circuit breaker, hedging and stale fallback")
+    parser.add_argument("--port", type=int, default=54359, help="Port for the upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency added to every upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Uniform random extra upstream latency")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per phase")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--markets", type=int, default=20, help="Markets fetched before the incidents")
+    parser.add_argument("--slow-rate", type=float, default=0.03, help="Share of Gamma calls in the slow tail")
+    parser.add_argument("--slow-ms", type=float, default=400.0, help="Extra latency of a slow Gamma call")
+    parser.add_argument("--call-timeout", type=float, default=1.0, help="POLYMARKET.call_timeout")
+    parser.add_argument("--reset-timeout", type=float, default=2.0, help="POLYMARKET.reset_timeout")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    upstream_process = start_upstream(args.port, args.latency_ms, args.jitter_ms, args.seed)
+    workdir = tempfile.TemporaryDirectory(prefix="shadowtrader-resilience-")
+    cwd = os.getcwd()
+    try:
+        write_config(workdir.name, args.port, [
+            # Every request calls Gamma; last good values are still kept for the fallback
+            "CACHE.market_ttl=0",
+            "CACHE.market_stale_ttl=0",
+            f"POLYMARKET.call_timeout={args.call_timeout}",
+            f"POLYMARKET.reset_timeout={args.reset_timeout}",
+        ])
+        # resources.singletons reads ./config.ini at import
+        os.chdir(workdir.name)
+        asyncio.run(run(args, f"http://127.0.0.1:{args.port}"))
+    finally:
+        os.chdir(cwd)
+        upstream_process.terminate()
+        upstream_process.join()
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Controller- and route-level benchmarks against local upstream stand-ins.
+
+Starts benchmarks.fakes (fake PostgREST + Gamma API with added latency) in
+a child process, points the app at it through a generated config.ini, runs
+the app lifespan and then drives every scenario twice: once calling the
+controller directly and once through the FastAPI route (in-process ASGI,
+auth included). For each scenario it reports latency percentiles, the cold
+first call, throughput and upstream calls per request by target.
+
+Run from the server directory:
+
+    python -m benchmarks.run --latency-ms 20 --iterations 200 --concurrency 8 --output bench-a.json
+    git checkout <other commit>
+    python -m benchmarks.run --latency-ms 20 --iterations 200 --concurrency 8 --output bench-b.json
+    python -m benchmarks.compare bench-a.json bench-b.json
+
+Config can be overridden per run, e.g. `--set REPLICA.enabled=true` or
+`--set CACHE.markets_ttl=0`.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from configparser import ConfigParser
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+import httpx
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from benchmarks import fakes  # noqa: E402
+from benchmarks.fixtures import build_fixtures  # noqa: E402
+from resources.constants import LEAGUE_TAG_IDS  # noqa: E402
+
+API_KEY = "bench"
+# Any JWT-shaped string: the fake PostgREST ignores auth
+SUPABASE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.bench"
+
+
+@dataclass
+class Scenario:
+    name: str
+    kind: str  # "controller" or "route"
+    call: Callable[[], Awaitable[Any]]
+
+
+def write_config(directory: str, port: int, overrides: List[str]) -> str:
+    """Write the config.ini the app reads at import, pointed at the stand-ins"""
+    upstream = f"http://127.0.0.1:{port}"
+    config = ConfigParser()
+    config.read_dict({
+        "SERVER": {
+            "host": "127.0.0.1",
+            "port": "8000",
+            "api_key": API_KEY,
+            "supabase_url": upstream,
+            "supabase_key": SUPABASE_KEY,
+        },
+        "POLYMARKET": {"gamma_url": upstream},
+        # Off by default so Gamma call counts only reflect the scenario; enable with --set POLLER.enabled=true
+        "POLLER": {"enabled": "false"},
+        # Off for the same reason (its background loads read the whole stats table); enable with --set
+        "PLAYER_AVERAGES": {"enabled": "false"},
+        "RECENT_FORM": {"enabled": "false"},
+        "LOCATION_SPLITS": {"enabled": "false"},
+        "REPLICA": {"path": os.path.join(directory, "replica.sqlite3")},
+        # Limits high enough never to reject, so the limiter's cost is measured but not its 429s
+        "RATE_LIMIT": {
+            "default": "1000000000/minute",
+            "storage_uri": f"shm://{os.path.join(directory, 'ratelimit')}",
+        },
+        # Per run, so results never come from a previous run's entries
+        "SHARED_CACHE": {"path": os.path.join(directory, "shared-cache.sqlite3")},
+    })
+    for override in overrides:
+        key, _, value = override.partition("=")
+        section, _, option = key.partition(".")
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, option, value)
+
+    path = os.path.join(directory, "config.ini")
+    with open(path, "w") as f:
+        config.write(f)
+    return path
+
+
+def start_upstream(
+    port: int,
+    latency_ms: float,
+    jitter_ms: float,
+    seed: int,
+    espn_error_rate: float = 0.0,
+) -> multiprocessing.Process:
+    """Serve the stand-ins from a child process so they do not share the app's event loop"""
+    process = multiprocessing.get_context("spawn").Process(
+        target=fakes.serve,
+        args=(port, latency_ms, jitter_ms, seed, espn_error_rate),
+        daemon=True,
+    )
+    process.start()
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Upstream stand-ins did not start on port {port}")
+
+
+def build_scenarios(client: httpx.AsyncClient, seed: int) -> List[Scenario]:
+    """Controller and route scenarios over the first NBA market of the fixtures"""
+    from resources import singletons
+
+    fixtures = build_fixtures(seed)
+    teams = {team["team_name"]: team for team in fixtures.tables["teams"]}
+    market = fixtures.markets[LEAGUE_TAG_IDS["nba"]][0]
+    away_name, home_name = market["question"].split(" vs. ")
+    home, away = teams[home_name], teams[away_name]
+    market_id = int(market["id"])
+    slug, opponent = home_name.lower(), away_name.lower()
+    # A 30-market watchlist across both leagues
+    watchlist = [int(market_id) for market_id in fixtures.markets_by_id()][:30]
+
+    league = singletons.league_controller
+    player = singletons.player_controller
+    team = singletons.team_controller
+    slate = singletons.slate_controller
+    page = singletons.market_page_controller
+
+    controllers = {
+        "league.markets": lambda: league.get_markets_by_league("nba"),
+        "league.market_by_id": lambda: league.get_market_by_id(market_id),
+        "league.markets_by_ids": lambda: league.get_markets_by_ids(watchlist),
+        "league.roster": lambda: league.get_team_rosters_by_league_and_team("nba", slug),
+        "league.slate": lambda: slate.get_slate("nba", None, 10),
+        "market.page": lambda: page.get_market_page(market_id, None, 10),
+        "player.stats_vs": lambda: player.get_full_team_players_averages("nba", slug, opponent),
+        "player.averages_matrix.nba": lambda: player.get_league_averages_matrix("nba", "team"),
+        "player.averages_matrix.nfl": lambda: player.get_league_averages_matrix("nfl", "team"),
+        "team.location_splits": lambda: team.get_team_location_splits(home["id"]),
+        "team.recent_form": lambda: team.get_team_recent_form(home["id"], None, 10),
+        "team.matchup_location_context": lambda: team.get_matchup_location_context(home["id"], away["id"]),
+        "team.matchup_momentum": lambda: team.get_matchup_momentum(home["id"], away["id"], None, 10),
+    }
+    routes = {
+        "league.markets": "/api/v1/league/nba",
+        "league.markets_stream": "/api/v1/league/nba/stream?fields=id,question,slug,outcomes,outcomePrices",
+        "league.market_by_id": f"/api/v1/market/{market_id}",
+        "league.markets_by_ids": f"/api/v1/market?ids={','.join(map(str, watchlist))}",
+        "league.roster": f"/api/v1/league/nba/{slug}",
+        "league.slate": "/api/v1/league/nba/slate",
+        "market.page": f"/api/v1/market/{market_id}/page",
+        "player.stats_vs": f"/api/v1/player/nba/{slug}/stats-vs/{opponent}",
+        "player.averages_matrix.nba": "/api/v1/player/nba/averages-matrix?by=team",
+        "player.averages_matrix.nfl": "/api/v1/player/nfl/averages-matrix?by=team",
+        "team.location_splits": f"/api/v1/team/nba/{slug}/location-splits",
+        "team.recent_form": f"/api/v1/team/nba/{slug}/recent-form?games_back=10",
+        # No precomputed team_recent_form row has this size; only the recent form engine answers it
+        "team.recent_form.games_back_7": f"/api/v1/team/nba/{slug}/recent-form?games_back=7",
+        "team.matchup_location_context": (
+            f"/api/v1/team/matchup/location-context?home_team_id={home['id']}&away_team_id={away['id']}"
+        ),
+        "team.matchup_momentum": (
+            f"/api/v1/team/matchup/momentum?team1_id={home['id']}&team2_id={away['id']}&games_back=10"
+        ),
+    }
+
+    def route_call(path: str) -> Callable[[], Awaitable[Any]]:
+        async def call():
+            response = await client.get(path)
+            if response.status_code >= 400:
+                raise RuntimeError(f"GET {path} -> {response.status_code}: {response.text[:200]}")
+            return response
+        return call
+
+    scenarios = [Scenario(name, "controller", call) for name, call in controllers.items()]
+    scenarios += [Scenario(name, "route", route_call(path)) for name, path in routes.items()]
+    return scenarios
+
+
+def reset_app_caches() -> None:
+    """Empty in-process and shared caches so every scenario's first call is cold"""
+    from resources import singletons
+
+    singletons.markets_cache.invalidate()
+    singletons.market_cache.invalidate()
+    singletons.averages_matrix.invalidate()
+    if singletons.shared_cache is not None:
+        singletons.shared_cache.clear()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(
+    scenario: Scenario,
+    iterations: int,
+    concurrency: int,
+    upstream: aiohttp.ClientSession,
+    upstream_url: str,
+) -> dict:
+    """Run one scenario: a cold call, then `iterations` calls from `concurrency` workers"""
+    reset_app_caches()
+    await (await upstream.post(f"{upstream_url}/__bench/stats")).release()
+
+    errors: List[str] = []
+
+    async def timed() -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            await scenario.call()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    cold_ms = await timed()
+
+    remaining = iterations
+    latencies: List[float] = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            elapsed = await timed()
+            if elapsed is not None:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    async with upstream.get(f"{upstream_url}/__bench/stats") as response:
+        calls = await response.json()
+
+    requests = iterations + 1
+    latencies.sort()
+    return {
+        "name": scenario.name,
+        "kind": scenario.kind,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "cold_ms": round(cold_ms, 3) if cold_ms is not None else None,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else None,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall > 0 else None,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "upstream_calls_per_request": round(sum(calls.values()) / requests, 3),
+        "upstream_calls": {target: round(count / requests, 3) for target, count in sorted(calls.items())},
+    }
+
+
+async def run(args: argparse.Namespace, upstream_url: str) -> List[dict]:
+    app_module = importlib.import_module("main")
+    results = []
+    async with app_module.lifespan(app_module.app):
+        from resources import singletons
+
+        # Measure served-from-store reads, not the window before the first load lands
+        while singletons.player_averages_enabled and not singletons.player_averages_store.ready:
+            await asyncio.sleep(0.05)
+        while singletons.recent_form_enabled and not singletons.recent_form_engine.ready:
+            await asyncio.sleep(0.05)
+        while singletons.location_splits_enabled and not singletons.location_splits_aggregator.ready:
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://bench",
+            headers={"X-API-Key": API_KEY},
+            timeout=None,
+        ) as client, aiohttp.ClientSession() as upstream:
+            for scenario in build_scenarios(client, args.seed):
+                if args.kind != "all" and scenario.kind != args.kind:
+                    continue
+                if args.only and not any(part in scenario.name for part in args.only):
+                    continue
+                result = await measure(scenario, args.iterations, args.concurrency, upstream, upstream_url)
+                results.append(result)
+                print_result(result)
+    return results
+
+
+def print_result(result: dict) -> None:
+    print(
+        f"{result['kind']:<10} {result['name']:<32} "
+        f"cold {result['cold_ms'] or 0:>9.2f}ms  "
+        f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+        f"{result['throughput_rps'] or 0:>9.1f} req/s  "
+        f"upstream/req {result['upstream_calls_per_request']:>6.2f}"
+        + (f"  errors {result['errors']} ({result['first_error']})" if result["errors"] else ""),
+        flush=True,
+    )
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*argv: str) -> str:
+        return subprocess.run(
+            ["git", *argv], cwd=SERVER_DIR, capture_output=True, text=True, check=False
+        ).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark controllers and routes against local upstream stand-ins")
+    parser.add_argument("--port", type=int, default=54329, help="Port for the upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency added to every upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Uniform random extra upstream latency")
+    parser.add_argument("--seed", type=int, default=1, help="Fixture and jitter seed")
+    parser.add_argument("--iterations", type=int, default=100, help="Timed calls per scenario after the cold call")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers per scenario")
+    parser.add_argument("--kind", choices=("all", "controller", "route"), default="all")
+    parser.add_argument("--only", action="append", help="Run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="SECTION.key=value")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+
+    upstream_process = start_upstream(args.port, args.latency_ms, args.jitter_ms, args.seed)
+    workdir = tempfile.TemporaryDirectory(prefix="shadowtrader-bench-")
+    cwd = os.getcwd()
+    try:
+        write_config(workdir.name, args.port, args.overrides)
+        # resources.singletons reads ./config.ini at import
+        os.chdir(workdir.name)
+        results = asyncio.run(run(args, f"http://127.0.0.1:{args.port}"))
+    finally:
+        os.chdir(cwd)
+        upstream_process.terminate()
+        upstream_process.join()
+        workdir.cleanup()
+
+    if output:
+        report = {
+            "meta": {
+                **git_revision(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k != "output"},
+            },
+            "results": results,
+        }
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
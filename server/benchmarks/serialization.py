@@ -0,0 +1,123 @@
+"""
+Cost of turning stats rows into a response body, per roster-sized response.
+
+    python -m benchmarks.serialization [--league nfl] [--iterations 2000]
+
+For one team's player_vs_team_stats rows against one opponent (53 rows for
+an NFL roster, 15 for NBA), reports microseconds per response for:
+  - building the player averages from the rows: validated into
+    PlayerVsTeamStats vs used as trusted dicts ([SERIALIZATION] trusted_rows),
+    with Pydantic's model_construct for reference
+  - encoding the player averages payload: jsonable_encoder + JSONResponse vs
+    FastJSONResponse ([SERIALIZATION] fast_json)
+  - both together, default path vs fast path
+and checks that both paths produce the same JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from benchmarks.fixtures import build_fixtures  # noqa: E402
+from controllers.player_controller import PlayerController  # noqa: E402
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID  # noqa: E402
+from resources.serialization import FastJSONResponse  # noqa: E402
+from schemas import PlayerVsTeamStats  # noqa: E402
+
+
+def roster_rows(league: str, seed: int):
+    """Rows shaped like repo.get_player_stats_vs: one team's players vs one opponent, player embedded"""
+    tables = build_fixtures(seed).tables
+    league_id = LEAGUE_NAME_TO_LEAGUE_ID[league]
+    team, opponent = [t for t in tables["teams"] if t["league_id"] == league_id][:2]
+    players = {p["id"]: p for p in tables["players"] if p["team_id"] == team["id"]}
+    rows = [
+        {
+            **row,
+            "players": {key: players[row["player_id"]][key] for key in ("first_name", "last_name", "photo_url")},
+        }
+        for row in tables["player_vs_team_stats"]
+        if row["player_id"] in players and row["opponent_team_id"] == opponent["id"]
+    ]
+    return team, opponent, rows
+
+
+def build_payload(controller: PlayerController, league: str, team: dict, opponent: dict, rows, construct=False) -> dict:
+    """What get_team_players_averages_for_teams does after its read"""
+    if construct:
+        stats = [
+            (PlayerVsTeamStats.model_construct(**{k: v for k, v in row.items() if k != "players"}), row["players"])
+            for row in rows
+        ]
+    else:
+        # Copies, since the controller pops the embedded player off each row
+        stats = controller._rows_to_stats([dict(row) for row in rows])
+    return {
+        "team_name": team["team_name"],
+        "team_id": team["id"],
+        "opponent_name": opponent["team_name"],
+        "opponent_id": opponent["id"],
+        "league": league,
+        "all_players": [controller._get_player_averages_against_a_team(p, info) for p, info in stats],
+    }
+
+
+def encode_default(payload: dict) -> bytes:
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def encode_fast(payload: dict) -> bytes:
+    return FastJSONResponse(content=payload).body
+
+
+def per_call_us(fn, iterations: int) -> float:
+    for _ in range(min(iterations, 100)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure row building and JSON encoding per roster-sized response")
+    parser.add_argument("--league", choices=sorted(LEAGUE_NAME_TO_LEAGUE_ID), default="nfl")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    team, opponent, rows = roster_rows(args.league, args.seed)
+    validated = PlayerController(None, None, None)
+    trusted = PlayerController(None, None, None, trusted_rows=True)
+    payload = build_payload(validated, args.league, team, opponent, rows)
+
+    default_body = encode_default(payload)
+    fast_body = encode_fast(build_payload(trusted, args.league, team, opponent, rows))
+    if json.loads(default_body) != json.loads(fast_body):
+        raise SystemExit("fast path produced different JSON")
+
+    n = args.iterations
+    results = [
+        ("rows -> averages, validated", per_call_us(lambda: build_payload(validated, args.league, team, opponent, rows), n)),
+        ("rows -> averages, model_construct", per_call_us(lambda: build_payload(validated, args.league, team, opponent, rows, construct=True), n)),
+        ("rows -> averages, trusted dicts", per_call_us(lambda: build_payload(trusted, args.league, team, opponent, rows), n)),
+        ("encode, jsonable_encoder + JSONResponse", per_call_us(lambda: encode_default(payload), n)),
+        ("encode, FastJSONResponse", per_call_us(lambda: encode_fast(payload), n)),
+        ("total, default path", per_call_us(lambda: encode_default(build_payload(validated, args.league, team, opponent, rows)), n)),
+        ("total, fast path", per_call_us(lambda: encode_fast(build_payload(trusted, args.league, team, opponent, rows)), n)),
+    ]
+    print(f"{args.league}: {len(rows)} rows, {len(default_body)} byte body")
+    for label, us in results:
+        print(f"{label:<42}{us:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
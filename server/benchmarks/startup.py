@@ -0,0 +1,132 @@
+"""
+Worker cold start against the local stand-ins.
+
+    python -m benchmarks.startup [--runs 5] [--set SECTION.key=value]
+
+Each run is a fresh interpreter, as after a gunicorn worker restart, with
+its own config.ini and shared cache so nothing is inherited from a previous
+run. Reports the median of:
+  - import: `import main`, and whether it imported the supabase package
+  - startup: the app lifespan up to the point the worker reports ready
+  - the first request to a few routes right after startup
+with [STARTUP] warm_up off and on. Warm-up should move the first requests'
+upstream round trips into startup.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+# Only the standard library at module level: spawned children import this
+# module too, and anything it imports would not count against `import main`
+
+
+def first_requests(seed: int) -> Dict[str, str]:
+    """Routes a worker typically serves first: listings, a roster and a market page"""
+    from benchmarks.fixtures import build_fixtures
+    from resources.constants import LEAGUE_TAG_IDS
+
+    market = build_fixtures(seed).markets[LEAGUE_TAG_IDS["nba"]][0]
+    market_id = market["id"]
+    slug = market["question"].split(" vs. ")[1].lower()
+    return {
+        "league.markets": "/api/v1/league/nba",
+        "league.roster": f"/api/v1/league/nba/{slug}",
+        "team.recent_form": f"/api/v1/team/nba/{slug}/recent-form?games_back=10",
+        "market.page": f"/api/v1/market/{market_id}/page",
+    }
+
+
+async def cold_start(paths: Dict[str, str], api_key: str) -> dict:
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    supabase_imported = "supabase" in sys.modules
+    import httpx
+
+    result = {"import_ms": (imported - started) * 1000, "supabase_at_import": supabase_imported}
+    async with main.lifespan(main.app):
+        result["startup_ms"] = (time.perf_counter() - imported) * 1000
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app),
+            base_url="http://bench",
+            headers={"X-API-Key": api_key},
+            timeout=None,
+        ) as client:
+            for name, path in paths.items():
+                request_started = time.perf_counter()
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"GET {path} -> {response.status_code}: {response.text[:200]}")
+                result[name] = (time.perf_counter() - request_started) * 1000
+    return result
+
+
+def child(workdir: str, paths: Dict[str, str], api_key: str, results) -> None:
+    # resources.singletons reads ./config.ini at import
+    os.chdir(workdir)
+    sys.path.insert(0, SERVER_DIR)
+    try:
+        results.put(asyncio.run(cold_start(paths, api_key)))
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_cold(port: int, overrides: List[str], paths: Dict[str, str]) -> dict:
+    from benchmarks.run import API_KEY, write_config
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    with tempfile.TemporaryDirectory(prefix="shadowtrader-startup-") as workdir:
+        write_config(workdir, port, overrides)
+        process = context.Process(target=child, args=(workdir, paths, API_KEY, results))
+        process.start()
+        result = results.get(timeout=120)
+        process.join()
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark worker import, startup and first requests")
+    parser.add_argument("--port", type=int, default=54369, help="Port for the upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency added to every upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Uniform random extra upstream latency")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per configuration")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="SECTION.key=value")
+    args = parser.parse_args()
+
+    from benchmarks.run import start_upstream
+
+    paths = first_requests(args.seed)
+    upstream_process = start_upstream(args.port, args.latency_ms, args.jitter_ms, args.seed)
+    try:
+        for warm_up in ("false", "true"):
+            overrides = [f"STARTUP.warm_up={warm_up}", *args.overrides]
+            runs = [run_cold(args.port, overrides, paths) for _ in range(args.runs)]
+            medians = {key: statistics.median(run[key] for run in runs) for key in ["import_ms", "startup_ms", *paths]}
+            first = "  ".join(f"{name} {medians[name]:>6.1f}ms" for name in paths)
+            print(
+                f"warm_up={warm_up:<5}  import {medians['import_ms']:>6.1f}ms "
+                f"(supabase imported: {any(run['supabase_at_import'] for run in runs)})  "
+                f"startup {medians['startup_ms']:>6.1f}ms  first requests: {first}",
+                flush=True,
+            )
+    finally:
+        upstream_process.terminate()
+        upstream_process.join()
+
+
+if __name__ == "__main__":
+    main()
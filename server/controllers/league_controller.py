@@ -1,103 +1,366 @@
 import aiohttp
+import asyncio
 import json
-from typing import List, Optional
-from resources.constants import LEAGUE_TAG_IDS, LEAGUE_TO_SPORT, NBA_TEAM_IDS, NFL_TEAM_IDS
-from supabase import Client
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from resources.constants import LEAGUE_TAG_IDS, LEAGUE_TO_SPORT, NBA_TEAM_IDS, NFL_TEAM_IDS, POLYMARKET_GAMMA_URL
+from resources.metrics import observe_upstream
+from resources.repository import StatsRepository
+from resources.resilience import UpstreamGuard, UpstreamStatusError, UpstreamUnavailable, mark_stale
+from resources.team_index import TeamIndex
+from resources.ttl_cache import TTLCache
 
 
 class LeagueController:
-    def __init__(self, db: Client):
+    def __init__(
+        self,
+        repo: StatsRepository,
+        team_index: TeamIndex,
+        session: Optional[aiohttp.ClientSession] = None,
+        gamma_url: str = POLYMARKET_GAMMA_URL,
+        markets_cache: Optional[TTLCache] = None,
+        market_cache: Optional[TTLCache] = None,
+        page_size: int = 100,
+        page_concurrency: int = 4,
+        ids_per_query: int = 50,
+        guard: Optional[UpstreamGuard] = None,
+    ):
         self.test = "test"
-        self.db = db
-    
+        self.repo = repo
+        self.team_index = team_index
+        # Shared Gamma API session, injected by the app lifespan (see main.py)
+        self.session = session
+        self.gamma_url = gamma_url.rstrip("/")
+        # League listings keyed by tag_id; concurrent misses share one upstream call
+        self.markets_cache = markets_cache or TTLCache(ttl=30, stale_ttl=120)
+        # Single markets keyed by id, kept briefly since prices move
+        self.market_cache = market_cache or TTLCache(ttl=10, stale_ttl=20)
+        # Listings are paged through /markets with limit/offset, up to page_concurrency pages in flight
+        self.page_size = page_size
+        self.page_concurrency = page_concurrency
+        # Batch lookups ask /markets for up to ids_per_query ids per call, page_concurrency calls in flight
+        self.ids_per_query = ids_per_query
+        # Circuit breaker, time budget and hedging around every Gamma call
+        self.guard = guard or UpstreamGuard("polymarket")
+
+    async def _get_json(self, target: str, url: str, params: Optional[list] = None):
+        """
+        GET a Gamma API endpoint through the Polymarket guard (circuit breaker, time budget, hedging).
+
+        Args:
+            target: Endpoint template for metrics and latency tracking (e.g. '/markets/{id}')
+            url: Full URL
+            params: Optional query parameters
+
+        Raises:
+            UpstreamStatusError: For a non-200 answer (a ValueError)
+            UpstreamUnavailable: When Polymarket is down, slow or failing, or its circuit is open
+            ValueError: If the body is not JSON
+        """
+        async def attempt():
+            session = self._get_session()
+            with observe_upstream("polymarket", target):
+                async with session.get(url, params=params) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        raise UpstreamStatusError(
+                            response.status,
+                            f"Polymarket API returned status {response.status}: {error_text}",
+                        )
+                    try:
+                        return await response.json()
+                    except (json.JSONDecodeError, aiohttp.ContentTypeError) as e:
+                        raise ValueError(f"Failed to parse Polymarket response: {str(e)}")
+
+        return await self.guard.call(target, attempt)
+
+    async def _with_last_good(self, cache: TTLCache, key, fetch):
+        """
+        cache.get_or_fetch, falling back to the last good value (marked stale) while Polymarket is unavailable.
+
+        Raises:
+            UpstreamUnavailable: When there is no earlier value to fall back to
+        """
+        try:
+            return await cache.get_or_fetch(key, fetch)
+        except UpstreamUnavailable:
+            last = cache.last_good(key)
+            if last is None:
+                raise
+            value, age = last
+            mark_stale("polymarket", age)
+            return value
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the injected Gamma API session, failing loudly if the lifespan never set it"""
+        if self.session is None or self.session.closed:
+            raise RuntimeError("Polymarket session is not open; it is created in the app lifespan")
+        return self.session
     
     async def get_markets_by_league(self,league: str):
         """
         Fetch active moneyline markets from Polymarket for a given league.
+        Served from the in-process TTL cache when possible.
         
         Args:
             league: The league slug (e.g., "nba", "nfl")
             
         Returns:
-            List of Market objects
-            
+            List of Market objects; the last good listing, marked stale,
+            while Polymarket is unavailable
+
         Raises:
-            ValueError: If the league is unknown
-            aiohttp.ClientError: If the HTTP request fails
-            json.JSONDecodeError: If response cannot be parsed
+            ValueError: If the league is unknown or the response cannot be parsed
+            UpstreamUnavailable: If Polymarket is unavailable and nothing was fetched before
         """
+        tag_id = self.get_tag_id(league)
+
+        return await self._with_last_good(
+            self.markets_cache,
+            tag_id,
+            lambda: self.fetch_markets_by_tag(tag_id),
+        )
+
+    def get_tag_id(self, league: str) -> int:
+        """Polymarket tag id for a league slug, raising ValueError if the league is unknown"""
         league = league.lower()
-        
         tag_id = LEAGUE_TAG_IDS.get(league)
         if tag_id is None:
             raise ValueError(f"Unknown league: {league}")
-        
+        return tag_id
+
+    async def iter_markets_by_league(self, league: str) -> AsyncIterator[dict]:
+        """
+        Yield a league's active moneyline markets one by one, for streaming responses.
+
+        A cached listing (in-process or host-wide) is replayed as-is. Otherwise
+        the listing is fetched through the markets cache, so concurrent cold
+        requests share one walk through the Gamma pages. The request that
+        starts the walk yields markets page by page as they arrive, so the
+        first ones reach the client before the last page has been fetched.
+        The others replay the listing once it is complete. When Polymarket is
+        unavailable, the last good listing is served, marked stale, as
+        get_markets_by_league does.
+
+        Raises:
+            ValueError: If the league is unknown
+            UpstreamUnavailable: If Polymarket is unavailable and nothing was fetched before,
+                or it failed after part of the listing was sent
+        """
+        tag_id = self.get_tag_id(league)
+        usable_for = self.markets_cache.ttl + self.markets_cache.stale_ttl
+        markets = self.markets_cache.peek(tag_id, max_age=usable_for)
+        if markets is None:
+            markets = self.markets_cache.peek_shared(tag_id, max_age=usable_for)
+        if markets is not None:
+            for market in markets:
+                yield market
+            return
+
+        pages: "asyncio.Queue[List[dict]]" = asyncio.Queue()
+
+        async def fetch() -> List[dict]:
+            # Runs only if this request starts the fetch; joined requests never see its pages
+            fetched = []
+            async for page in self.iter_markets_by_tag(tag_id):
+                fetched.extend(page)
+                pages.put_nowait(page)
+            return fetched
+
+        listing = asyncio.ensure_future(self.markets_cache.get_or_fetch(tag_id, fetch))
+        # A client that disconnects leaves the fetch running for the cache; nobody awaits its outcome then
+        listing.add_done_callback(lambda t: t.cancelled() or t.exception())
+        sent = 0
+        while not listing.done() or not pages.empty():
+            if pages.empty():
+                next_page = asyncio.ensure_future(pages.get())
+                try:
+                    await asyncio.wait({next_page, listing}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    next_page.cancel()
+                if not next_page.done() or next_page.cancelled():
+                    continue
+                page = next_page.result()
+            else:
+                page = pages.get_nowait()
+            for market in page:
+                yield market
+            sent += len(page)
+
+        try:
+            markets = listing.result()
+        except UpstreamUnavailable:
+            last = self.markets_cache.last_good(tag_id)
+            # Part of a fresh listing already went out; a stale tail would not match it
+            if sent or last is None:
+                raise
+            markets, age = last
+            mark_stale("polymarket", age)
+        for market in markets[sent:]:
+            yield market
+
+    async def fetch_markets_by_tag(self, tag_id: int) -> List[dict]:
+        """Fetch every active moneyline market for a Polymarket tag straight from the Gamma API"""
+        markets = []
+        async for page in self.iter_markets_by_tag(tag_id):
+            markets.extend(page)
+        return markets
+
+    async def iter_markets_by_tag(self, tag_id: int) -> AsyncIterator[List[dict]]:
+        """
+        Yield a tag's markets page by page, in listing order.
+
+        The first page is fetched alone so small leagues cost one call; after
+        a full page, the next `page_concurrency` pages are fetched at once.
+        A short page ends the listing and cancels any pages past it.
+        """
+        offset = 0
+        wave = 1
+        while True:
+            pages = [
+                asyncio.ensure_future(self.fetch_markets_page(tag_id, offset + i * self.page_size))
+                for i in range(wave)
+            ]
+            try:
+                for page in pages:
+                    markets = await page
+                    if markets:
+                        yield markets
+                    if len(markets) < self.page_size:
+                        return
+            finally:
+                for page in pages:
+                    # Pages past the end (or abandoned by a disconnected client) are not awaited
+                    page.cancel()
+                    page.add_done_callback(lambda t: t.cancelled() or t.exception())
+            offset += wave * self.page_size
+            wave = self.page_concurrency
+
+    async def fetch_markets_page(self, tag_id: int, offset: int) -> List[dict]:
+        """Fetch one page of active moneyline markets for a Polymarket tag"""
         url = (
-            f"https://gamma-api.polymarket.com/markets"
+            f"{self.gamma_url}/markets"
             f"?sports_market_types=moneyline"
             f"&closed=false"
             f"&tag_id={tag_id}"
+            f"&limit={self.page_size}"
+            f"&offset={offset}"
         )
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=15) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise aiohttp.ClientResponseError(
-                        response.request_info,
-                        response.history,
-                        status=response.status,
-                        message=f"Polymarket API error {response.status}: {error_text}"
-                    )
-                
-                try:
-                    data = await response.json()
-                    # Assuming the response is a list of market objects
-                    markets = [item for item in data]
-                    return markets
-                except json.JSONDecodeError as e:
-                    raise ValueError(f"Failed to parse Polymarket response: {str(e)}")
-                except Exception as e:
-                    raise ValueError(f"Failed to deserialize markets: {str(e)}")
+        # The response is a list of market objects
+        return await self._get_json("/markets", url)
 
     async def get_market_by_id(self,market_id: int):
         """
         Fetch a single market by its ID from Polymarket's Gamma API.
+        Served from the market cache when possible.
 
         Args:
             market_id: The ID of the market to fetch
 
         Returns:
-            Market: The parsed market object
+            Market: The parsed market object; the last good one, marked
+            stale, while Polymarket is unavailable
 
         Raises:
             ValueError: For invalid responses, parsing errors, or unexpected status codes
-            aiohttp.ClientError: For network/connection issues
+            UpstreamUnavailable: If Polymarket is unavailable and the market was never fetched
         """
-        url = f"https://gamma-api.polymarket.com/markets/{market_id}"
+        return await self._with_last_good(
+            self.market_cache,
+            market_id,
+            lambda: self.fetch_market_by_id(market_id),
+        )
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, timeout=15) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise ValueError(
-                            f"Polymarket API returned status {response.status}: {error_text}"
-                        )
+    async def fetch_market_by_id(self, market_id: int) -> dict:
+        """Fetch a single market straight from the Gamma API (see get_market_by_id)"""
+        return await self._get_json("/markets/{id}", f"{self.gamma_url}/markets/{market_id}")
 
-                    try:
-                        data = await response.json()
-                        # Parse into Pydantic model
-                        market = data
-                        return market
-                    except Exception as parse_err:
-                        error_text = await response.text()
-                        raise ValueError(
-                            f"Failed to parse market response: {str(parse_err)}\n"
-                            f"Raw body: {error_text}"
-                        )
+    async def get_markets_by_ids(self, market_ids: Iterable[int]) -> dict:
+        """
+        Fetch many markets at once, each id served from the market cache when possible.
+
+        Cache misses are fetched together through /markets with repeated `id`
+        parameters (see fetch_markets_by_ids) instead of one call per id.
+
+        Args:
+            market_ids: Market ids
+
+        Returns:
+            {"markets": {id: market}, "errors": {id: {"status": ..., "detail": ...}}, "stale": [id]},
+            ids as strings; 404 for ids Polymarket does not know, 503 while
+            Polymarket is unavailable, 502 for other failed calls. Ids under
+            "stale" are last good markets served during an outage.
+        """
+        results = await self.market_cache.get_or_fetch_many(market_ids, self.fetch_markets_by_ids)
+        markets, errors, stale = {}, {}, []
+        for market_id, result in results.items():
+            if isinstance(result, UpstreamUnavailable):
+                last = self.market_cache.last_good(market_id)
+                if last is not None:
+                    result, age = last
+                    mark_stale("polymarket", age)
+                    stale.append(str(market_id))
+            if isinstance(result, KeyError):
+                errors[str(market_id)] = {"status": 404, "detail": f"Market {market_id} not found"}
+            elif isinstance(result, UpstreamUnavailable):
+                errors[str(market_id)] = {"status": 503, "detail": str(result)}
+            elif isinstance(result, Exception):
+                errors[str(market_id)] = {"status": 502, "detail": str(result)}
+            else:
+                markets[str(market_id)] = result
+        return {"markets": markets, "errors": errors, "stale": stale}
+
+    async def fetch_markets_by_ids(self, market_ids: List[int]) -> Dict[int, dict]:
+        """
+        Fetch markets straight from the Gamma API, `ids_per_query` ids per /markets call.
+
+        Returns:
+            Dict of market id -> market; ids Polymarket did not return are left out
+
+        Raises:
+            ValueError, UpstreamUnavailable: If a call fails (every id of the batch is reported failed)
+        """
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch_chunk(chunk: List[int]) -> List[dict]:
+            params = [("id", str(market_id)) for market_id in chunk] + [("limit", str(len(chunk)))]
+            async with semaphore:
+                return await self._get_json("/markets?id", f"{self.gamma_url}/markets", params)
+
+        chunks = [market_ids[i:i + self.ids_per_query] for i in range(0, len(market_ids), self.ids_per_query)]
+        pages = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        return {int(market["id"]): market for page in pages for market in page}
+
+    async def resolve_market_teams(
+        self,
+        league: str,
+        market: dict,
+    ) -> Optional[Tuple[dict, dict]]:
+        """
+        Map a Polymarket moneyline market to our (home, away) team records.
+
+        Moneyline questions read "<away> vs. <home>" (the client splits on
+        " vs." the same way), so the second team is treated as the home side.
 
-            except aiohttp.ClientError as http_err:
-                raise ValueError(f"Failed to fetch market from Polymarket: {str(http_err)}")
+        Args:
+            league: The league slug (e.g., "nba", "nfl")
+            market: A Gamma API market object
+
+        Returns:
+            (home_team, away_team) records from the team index, or None if
+            the market is not a two-team matchup we can resolve
+        """
+        question = market.get("question") or ""
+        sides = [side.strip().rstrip("?").strip() for side in question.split(" vs. ")]
+        if len(sides) != 2 or not all(sides):
+            return None
+
+        await self.team_index.ensure_loaded()
+        away_team = self.team_index.resolve(league, sides[0])
+        home_team = self.team_index.resolve(league, sides[1])
+        if home_team is None or away_team is None or home_team["id"] == away_team["id"]:
+            return None
+
+        return home_team, away_team
 
     async def get_team_rosters_by_league_and_team(
         self,
@@ -118,21 +381,21 @@ class LeagueController:
         team_name = team_name.lower()
         # Default positions to search for so it doesn't return like 50 people back
         skill_positions = ["QB", "RB", "WR", "TE", "P", "K"]
-        league_map = {
-            "nfl": 1,
-            "nba": 2
-        }
 
-        
-        response = (
-            self.db
-            .table("players")
-            .select("*, teams!inner(*)")
-            .ilike("teams.team_name", f"%{team_name}%")
-            .eq("teams.league_id", league_map[league])
-            .execute()
-        )
+        await self.team_index.ensure_loaded()
+        team = self.team_index.resolve(league, team_name)
+        if team is None:
+            return []
 
-        return response.data
+        return await self.get_team_roster(team["id"])
+
+    async def get_team_roster(self, team_id: int) -> List[dict]:
+        """
+        Fetch the roster for an already-resolved team from our DB.
+
+        Args:
+            team_id: Internal team ID
+        """
+        return await self.repo.get_roster(team_id)
 
         
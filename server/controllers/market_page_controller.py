@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Optional
+
+from controllers.league_controller import LeagueController
+from controllers.player_controller import PlayerController
+from controllers.team_controller import TeamController
+
+logger = logging.getLogger(__name__)
+
+
+async def _section(awaitable: Awaitable[Any]) -> dict:
+    """Run one page section, reporting a failure in the section instead of failing the page"""
+    try:
+        return {"data": await awaitable, "error": None}
+    except Exception as e:
+        logger.warning("Market page section failed: %s", e)
+        return {"data": None, "error": str(e)}
+
+
+class MarketPageController:
+    """Aggregates everything the client's market view needs into one document"""
+
+    def __init__(
+        self,
+        league_controller: LeagueController,
+        player_controller: PlayerController,
+        team_controller: TeamController,
+    ):
+        self.league_controller = league_controller
+        self.player_controller = player_controller
+        self.team_controller = team_controller
+
+    async def get_market_page(
+        self,
+        market_id: int,
+        season: Optional[str] = None,
+        games_back: int = 10
+    ) -> dict:
+        """
+        Fetch a market and all of its team data concurrently.
+
+        The market's teams are resolved once and their ids reused by every
+        section: rosters, players' stats vs the opponent, location splits,
+        matchup location context, recent form and momentum. Each section is
+        reported as {"data": ..., "error": ...} so one failing read does not
+        blank the whole page.
+
+        Args:
+            market_id: Polymarket market ID
+            season: Optional season string. If None, each team's latest season is used.
+            games_back: Number of recent games for recent form and momentum (default 10)
+
+        Returns:
+            Dict with the market, league, resolved teams and per-section results
+
+        Raises:
+            ValueError: If the market itself cannot be fetched
+        """
+        market = await self.league_controller.get_market_by_id(market_id)
+
+        # Same league extraction as the client: the slug starts with the league (e.g. "nba-lal-bos-...")
+        league = (market.get("slug") or "").split("-")[0].lower()
+        page = {
+            "market": market,
+            "league": league,
+            "home_team": None,
+            "away_team": None,
+            "sections": {},
+        }
+
+        try:
+            teams = await self.league_controller.resolve_market_teams(league, market)
+        except ValueError as e:
+            teams = None
+            page["error"] = str(e)
+        if teams is None:
+            page.setdefault("error", "Could not resolve both teams for this market")
+            return page
+
+        home, away = teams
+        page["home_team"] = {"team_id": home["id"], "team_name": home["team_name"]}
+        page["away_team"] = {"team_id": away["id"], "team_name": away["team_name"]}
+        team_ids = [home["id"], away["id"]]
+
+        (
+            home_roster,
+            away_roster,
+            home_players,
+            away_players,
+            splits,
+            forms,
+        ) = await asyncio.gather(
+            _section(self.league_controller.get_team_roster(home["id"])),
+            _section(self.league_controller.get_team_roster(away["id"])),
+            _section(self.player_controller.get_team_players_averages_for_teams(league, home, away)),
+            _section(self.player_controller.get_team_players_averages_for_teams(league, away, home)),
+            _section(self.team_controller.get_location_splits_for_teams(team_ids, season)),
+            _section(self.team_controller.get_recent_form_for_teams(team_ids, season, games_back)),
+        )
+
+        page["sections"] = {
+            "rosters": {"home": home_roster, "away": away_roster},
+            "player_stats_vs": {"home": home_players, "away": away_players},
+            "location_splits": self._per_team(splits, home["id"], away["id"]),
+            "location_context": self._derive(
+                splits,
+                lambda data: self.team_controller.build_location_context(data[home["id"]], data[away["id"]]),
+            ),
+            "recent_form": self._per_team(forms, home["id"], away["id"]),
+            "momentum": self._derive(
+                forms,
+                lambda data: self.team_controller.build_momentum(data[home["id"]], data[away["id"]], games_back),
+            ),
+        }
+        return page
+
+    @staticmethod
+    def _per_team(section: dict, home_id: int, away_id: int) -> dict:
+        """Split a batched {team_id: ...} section into home/away sections"""
+        if section["error"] is not None:
+            return {"home": section, "away": section}
+        return {
+            "home": {"data": section["data"][home_id], "error": None},
+            "away": {"data": section["data"][away_id], "error": None},
+        }
+
+    @staticmethod
+    def _derive(section: dict, build) -> dict:
+        """Build a section from another section's data, propagating its error"""
+        if section["error"] is not None:
+            return section
+        return {"data": build(section["data"]), "error": None}
@@ -1,17 +1,37 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 from schemas import PlayerVsTeamStats
 from datetime import date, datetime
 from pydantic import BaseModel, Field
+from resources.conditional import Validator
 from resources.constants import LEAGUE_TO_SPORT, LEAGUE_NAME_TO_LEAGUE_ID
-from supabase import Client
+from resources.averages_matrix import AveragesMatrix
+from resources.player_averages import PlayerAveragesStore, compute_player_averages
+from resources.repository import StatsRepository
+from resources.team_index import TeamIndex
 
 class PlayerController:
-    def __init__(self, db: Client):
+    def __init__(
+        self,
+        repo: StatsRepository,
+        team_index: TeamIndex,
+        averages_matrix: AveragesMatrix,
+        trusted_rows: bool = False,
+        averages_store: Optional[PlayerAveragesStore] = None,
+    ):
         self.test = "test"
-        self.db = db
+        self.repo = repo
+        self.team_index = team_index
+        self.averages_matrix = averages_matrix
+        # Rows from our own DB already match the schema; when trusted they are used as plain dicts
+        self.trusted_rows = trusted_rows
+        # Materialized averages; once loaded, stats-vs reads are lookups instead of queries
+        self.averages_store = averages_store
+
+    def _store_ready(self) -> bool:
+        return self.averages_store is not None and self.averages_store.ready
 
 
-    def get_full_team_players_averages(self,
+    async def get_full_team_players_averages(self,
         league: str,
         team_name: str,
         opponent_name: str,):
@@ -23,157 +43,149 @@ class PlayerController:
         if not league_id:
             return []
 
-        # 1. Fetch team_id from supabase 'teams' table based on team_name and league_id
-        team_response = (
-            self.db
-            .table("teams")
-            .select("id")
-            .ilike("team_name", f"%{team_name}%")
-            .eq("league_id", league_id)
-            .execute()
-        )
+        # 1. Resolve both teams from the in-memory team index
+        await self.team_index.ensure_loaded()
+        team = self.team_index.resolve(league, team_name)
+        opponent = self.team_index.resolve(league, opponent_name)
 
-        if not team_response.data:
+        if team is None or opponent is None:
             return []
 
-        team_id = team_response.data[0]["id"]
+        return await self.get_team_players_averages_for_teams(league, team, opponent, team_name, opponent_name)
 
-        # 2. Fetch opponent_id from supabase 'teams' table based on opponent_name and league_id
-        opponent_response = (
-            self.db
-            .table("teams")
-            .select("id")
-            .ilike("team_name", f"%{opponent_name}%")
-            .eq("league_id", league_id)
-            .execute()
-        )
 
-        if not opponent_response.data:
-            return []
-
-        opponent_id = opponent_response.data[0]["id"]
-
-
-        # Get the current team's players stats against a team 
-        teams_player_stats = self.get_team_players_stats_against_team(team_id=team_id,opponent_id=opponent_id)        
+    async def get_team_players_averages_for_teams(
+        self,
+        league: str,
+        team: dict,
+        opponent: dict,
+        team_name: Optional[str] = None,
+        opponent_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Builds a full teams averages against an opponent from already-resolved team records.
+
+        Args:
+            league: League slug (e.g., 'nba')
+            team: Team record from the team index
+            opponent: Opponent record from the team index
+            team_name: Name echoed back in the response (defaults to the team's name)
+            opponent_name: Name echoed back in the response (defaults to the opponent's name)
+        """
+        team_id = team["id"]
+        opponent_id = opponent["id"]
 
         full_team_averages = {
-            "team_name": team_name,
+            "team_name": team_name or team["team_name"],
             "team_id": team_id,
-            "opponent_name": opponent_name,
+            "opponent_name": opponent_name or opponent["team_name"],
             "opponent_id": opponent_id,
-            "league": league,
+            "league": league.lower(),
             "all_players": []
         }
 
 
+        if self._store_ready():
+            full_team_averages["all_players"] = self.averages_store.get_players(team_id, opponent_id)
+            return full_team_averages
+
+        # Get the current team's players stats against a team 
+        teams_player_stats = await self.get_team_players_stats_against_team(team_id=team_id,opponent_id=opponent_id)        
+
         # Calculate the averages for all these players
-        for player in teams_player_stats:
-            players_averages = self._get_player_averages_against_a_team(player=player)
+        for player, player_info in teams_player_stats:
+            players_averages = self._get_player_averages_against_a_team(player=player, player_info=player_info)
             full_team_averages["all_players"].append(players_averages)
 
 
         return full_team_averages
 
 
-    def get_team_players_stats_against_team(
+    async def get_stats_vs_validator(
         self,
-        team_id: int,
-        opponent_id: int,
-    ) -> List[PlayerVsTeamStats]:
+        league: str,
+        team_name: str,
+        opponent_name: str,
+    ) -> Validator:
         """
-        Fetches a teams players stats against a team from player_vs_team_stats table
+        Cache validator of the player_vs_team_stats rows behind a team-vs-opponent response.
+
+        Returns:
+            Newest last_updated, row count and team/player names; empty if the teams are unknown
         """
-        
-
-        # 3. Get all players from supabase 'players' table that are part of team_id
-        players_response = (
-            self.db
-            .table("players")
-            .select("id")
-            .eq("team_id", team_id)
-            .execute()
+        if league.lower() not in LEAGUE_NAME_TO_LEAGUE_ID:
+            return Validator()
+
+        await self.team_index.ensure_loaded()
+        team = self.team_index.resolve(league, team_name)
+        opponent = self.team_index.resolve(league, opponent_name)
+        if team is None or opponent is None:
+            return Validator()
+
+        names = [team["team_name"], opponent["team_name"]]
+        if self._store_ready():
+            players = self.averages_store.get_players(team["id"], opponent["id"])
+            return Validator.of(
+                [self.averages_store.get_last_updated(team["id"], opponent["id"])],
+                names + [f"{player['first_name']} {player['last_name']}" for player in players],
+                rows=len(players),
+            )
+        rows = await self.repo.get_player_stats_vs_versions(team["id"], opponent["id"])
+        return Validator.of(
+            (row["last_updated"] for row in rows),
+            names + [f"{row['players']['first_name']} {row['players']['last_name']}" for row in rows],
         )
 
-        if not players_response.data:
-            return []
 
-        player_ids = [player["id"] for player in players_response.data]
+    async def get_league_averages_matrix(self, league: str, by: str = "team") -> dict:
+        """
+        Gets every team x opponent (or player x opponent) per-game average for a league in one shot.
 
-        # 4. For each player part of team_id, get all the stats against the opponent_id obtained earlier
-        stats_response = (
-            self.db
-            .table("player_vs_team_stats")
-            .select("*")
-            .in_("player_id", player_ids)
-            .eq("opponent_team_id", opponent_id)
-            .execute()
-        )
-        
-        return [PlayerVsTeamStats(**stat) for stat in stats_response.data]
+        Args:
+            league: League slug (e.g., 'nba')
+            by: 'team' or 'player'
 
+        Returns:
+            Columnar matrix dict, see AveragesMatrix.get_matrix
+        """
+        return await self.averages_matrix.get_matrix(league, by)
 
-    
-    def _get_player_averages_against_a_team(self, player: PlayerVsTeamStats) -> Dict[str, Any]:
-        """Calculate a players averages using the data from player_vs_team_stats table"""
-        games = player.games or 0
-
-        # Fetch player info from players table
-        player_info_response = (
-            self.db
-            .table("players")
-            .select("first_name, last_name, photo_url")
-            .eq("id", player.player_id)
-            .execute()
-        )
 
-        player_info = player_info_response.data[0] if player_info_response.data else {}
-        first_name = player_info.get("first_name", "")
-        last_name = player_info.get("last_name", "")
-        photo_url = player_info.get("photo_url", "")
-
-        if games == 0:
-            return {
-                "player_id": player.player_id,
-                "opponent_team_id": player.opponent_team_id,
-                "games": 0,
-                "first_name": first_name,
-                "last_name": last_name,
-                "photo_url": photo_url,
-            }
-
-        # Stats to average (cumulative stats that should be divided by games)
-        stats_to_average = [
-            # NFL stats
-            "passing_attempts", "passing_completions", "passing_yards",
-            "passing_tds", "passing_ints", "passing_sacks",
-            "rushing_attempts", "rushing_yards", "rushing_tds",
-            "receiving_targets", "receptions", "receiving_yards", "receiving_tds",
-            # NBA stats
-            "points", "field_goal_attempts", "field_goals_made",
-            "three_pt_attempts", "three_pt_made",
-            "free_throw_attempts", "free_throws_made",
-            "rebounds_total", "rebounds_offensive", "rebounds_defensive",
-            "assists", "steals", "blocks", "turnovers",
-        ]
-
-        averages = {
-            "player_id": player.player_id,
-            "opponent_team_id": player.opponent_team_id,
-            "games": games,
-            "starts": player.starts,
-            "wins": player.wins,
-            "losses": player.losses,
-            "ties": player.ties,
-            "last_game_date": player.last_game_date,
-            "first_name": first_name,
-            "last_name": last_name,
-            "photo_url": photo_url,
-        }
+    async def get_team_players_stats_against_team(
+        self,
+        team_id: int,
+        opponent_id: int,
+    ) -> List[Tuple[Union[PlayerVsTeamStats, Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Fetches a teams players stats against a team from player_vs_team_stats table.
+        Player names and photos are embedded in the same query rather than looked up per player.
 
-        for stat in stats_to_average:
-            value = getattr(player, stat, None)
-            if value is not None:
-                averages[f"{stat}_avg"] = round(value / games, 2)
+        Returns:
+            List of (stats, player_info) pairs, player_info holding first_name, last_name and photo_url.
+            Stats are PlayerVsTeamStats, or the raw row dicts when trusted_rows is set.
+        """
+        # 2. One read: every stats row vs opponent_id for players on team_id, with the player embedded
+        rows = await self.repo.get_player_stats_vs(team_id, opponent_id)
+        return self._rows_to_stats(rows)
 
-        return averages
\ No newline at end of file
+    def _rows_to_stats(
+        self,
+        rows: List[Dict[str, Any]],
+    ) -> List[Tuple[Union[PlayerVsTeamStats, Dict[str, Any]], Dict[str, Any]]]:
+        """Split the embedded player off each row and validate the rest unless rows are trusted"""
+        results = []
+        for row in rows:
+            player_info = row.pop("players", None) or {}
+            # model_construct would not help: in Pydantic v2 it is slower than validating
+            results.append((row if self.trusted_rows else PlayerVsTeamStats(**row), player_info))
+        return results
+
+    def _get_player_averages_against_a_team(
+        self,
+        player: Union[PlayerVsTeamStats, Dict[str, Any]],
+        player_info: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Calculate a players averages using the data from player_vs_team_stats table"""
+        # Validated models keep their field values in __dict__; trusted rows already are that dict
+        fields = player if isinstance(player, dict) else player.__dict__
+        return compute_player_averages(fields, player_info)
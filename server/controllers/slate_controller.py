@@ -0,0 +1,96 @@
+import asyncio
+from typing import Optional
+
+from controllers.league_controller import LeagueController
+from controllers.team_controller import TeamController
+from resources.market_poller import MarketPoller
+
+
+class SlateController:
+    """Builds matchup context and momentum for every active market in a league in one pass"""
+
+    def __init__(
+        self,
+        league_controller: LeagueController,
+        team_controller: TeamController,
+        market_poller: MarketPoller,
+    ):
+        self.league_controller = league_controller
+        self.team_controller = team_controller
+        self.market_poller = market_poller
+
+    async def get_slate(
+        self,
+        league: str,
+        season: Optional[str] = None,
+        games_back: int = 10
+    ) -> dict:
+        """
+        Fetch location context and momentum for every active moneyline market in a league.
+
+        Team lookups are shared across games, and the splits and form rows for
+        every team on the slate are read with a few batched in_() queries.
+
+        Args:
+            league: League slug (e.g., 'nba')
+            season: Optional season string. If None, each team's latest season is used.
+            games_back: Number of recent games for momentum (default 10)
+
+        Returns:
+            Dict with one entry per resolvable game, plus the ids of markets
+            that could not be mapped to two teams
+
+        Raises:
+            ValueError: If the league is unknown
+        """
+        league = league.lower()
+        snapshot = self.market_poller.get_snapshot(league)
+        if snapshot is not None:
+            markets = snapshot.markets
+        else:
+            markets = await self.league_controller.get_markets_by_league(league)
+
+        resolved = await asyncio.gather(
+            *(self.league_controller.resolve_market_teams(league, market) for market in markets)
+        )
+
+        games = []
+        unmatched = []
+        for market, teams in zip(markets, resolved):
+            if teams is None:
+                unmatched.append(market.get("id"))
+            else:
+                games.append((market, *teams))
+
+        team_ids = {team["id"] for _, home, away in games for team in (home, away)}
+        splits, forms = await asyncio.gather(
+            self.team_controller.get_location_splits_for_teams(team_ids, season),
+            self.team_controller.get_recent_form_for_teams(team_ids, season, games_back),
+        )
+
+        return {
+            "league": league,
+            "season": season,
+            "games_back": games_back,
+            "snapshot_version": snapshot.version if snapshot is not None else None,
+            "snapshot_timestamp": snapshot.fetched_at if snapshot is not None else None,
+            "games": [
+                {
+                    "market_id": market.get("id"),
+                    "question": market.get("question"),
+                    "slug": market.get("slug"),
+                    "outcomes": market.get("outcomes"),
+                    "outcome_prices": market.get("outcomePrices"),
+                    "home_team": {"team_id": home["id"], "team_name": home["team_name"]},
+                    "away_team": {"team_id": away["id"], "team_name": away["team_name"]},
+                    "location_context": self.team_controller.build_location_context(
+                        splits[home["id"]], splits[away["id"]]
+                    ),
+                    "momentum": self.team_controller.build_momentum(
+                        forms[home["id"]], forms[away["id"]], games_back
+                    ),
+                }
+                for market, home, away in games
+            ],
+            "unmatched_market_ids": unmatched,
+        }
@@ -1,11 +1,82 @@
-from typing import Optional
-from supabase import Client
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from resources.conditional import Validator
+from resources.location_splits import LocationSplitsAggregator
+from resources.recent_form import RecentFormEngine
+from resources.repository import StatsRepository
+from resources.team_index import TeamIndex
 
 class TeamController:
-    def __init__(self, db: Client):
-        self.db = db
+    def __init__(
+        self,
+        repo: StatsRepository,
+        team_index: TeamIndex,
+        batch_size: int = 30,
+        max_concurrency: int = 4,
+        recent_form: Optional[RecentFormEngine] = None,
+        location_splits: Optional[LocationSplitsAggregator] = None,
+    ):
+        self.repo = repo
+        self.team_index = team_index
+        # Computes recent form for any games_back from the game log; team_recent_form rows otherwise
+        self.recent_form = recent_form
+        # Folds each game into running home/away sums; team_location_splits rows otherwise
+        self.location_splits = location_splits
+        # Batched reads split team ids into in_() chunks of batch_size, at most max_concurrency in flight
+        self.batch_size = batch_size
+        self._batch_semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _get_team(self, team_id: int) -> dict:
+        """Look up a team by internal id in the team index"""
+        await self.team_index.ensure_loaded()
+        team = self.team_index.get(team_id)
+        if team is None:
+            raise ValueError(f"Team with id {team_id} not found")
+        return team
+
+    async def resolve_team(self, league: str, team_name: str) -> dict:
+        """Resolve a team by name/slug in the team index, raising ValueError if unknown"""
+        await self.team_index.ensure_loaded()
+        return self.team_index.require(league, team_name)
+
+    async def get_validator(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None
+    ) -> Validator:
+        """
+        Cache validator of the rows a team route would read.
 
-    def get_team_location_splits(
+        Teams are resolved first, so an unknown id raises ValueError (404)
+        before any If-None-Match is compared.
+
+        Args:
+            table: 'team_location_splits' or 'team_recent_form'
+            team_ids: Internal team IDs
+            season: Optional season filter
+            games_back: Optional games_back filter (team_recent_form only)
+
+        Returns:
+            Newest last_updated, row count and team names behind the response
+        """
+        teams = [await self._get_team(team_id) for team_id in team_ids]
+        team_ids = [team["id"] for team in teams]
+        names = [team["team_name"] for team in teams]
+        if table == "team_recent_form":
+            forms = [self._engine_form(team_id, season, games_back or 10) for team_id in team_ids]
+            if all(forms):
+                return Validator.of((form["last_updated"] for form in forms), names, sum(form["games"] for form in forms))
+        if table == "team_location_splits":
+            splits = [self._aggregated_splits(team_id, season) for team_id in team_ids]
+            if all(splits):
+                rows = [row for team_splits in splits for row in team_splits]
+                return Validator.of((row["last_updated"] for row in rows), names, sum(row["games"] for row in rows))
+        rows = await self.repo.get_team_row_versions(table, team_ids, season, games_back)
+        return Validator.of((row["last_updated"] for row in rows), names)
+
+    async def get_team_location_splits(
         self,
         team_id: int,
         season: Optional[str] = None
@@ -20,38 +91,58 @@ class TeamController:
         Returns:
             Dict with team info and home/away split data
         """
-        # Get team info
-        team_response = (
-            self.db
-            .table("teams")
-            .select("id, team_name, abbreviation")
-            .eq("id", team_id)
-            .single()
-            .execute()
-        )
+        team = await self._get_team(team_id)
 
-        if not team_response.data:
-            raise ValueError(f"Team with id {team_id} not found")
+        splits = self._aggregated_splits(team_id, season)
+        if splits:
+            return self._shape_location_splits(team, splits, season)
 
-        team = team_response.data
+        # Latest season first when no season is given
+        splits = await self.repo.get_team_rows("team_location_splits", [team_id], season)
 
-        # Build query for splits
-        query = (
-            self.db
-            .table("team_location_splits")
-            .select("*")
-            .eq("team_id", team_id)
-        )
+        return self._shape_location_splits(team, splits, season)
+
+    async def get_location_splits_for_teams(
+        self,
+        team_ids: Iterable[int],
+        season: Optional[str] = None
+    ) -> Dict[int, dict]:
+        """
+        Fetch home/away splits for many teams with a few batched in_() queries.
+
+        Args:
+            team_ids: Internal team IDs
+            season: Optional season string. If None, each team gets its latest season.
 
-        if season:
-            query = query.eq("season", season)
-        else:
-            # Get the latest season
-            query = query.order("season", desc=True)
+        Returns:
+            Dict of team_id -> the same shape as get_team_location_splits
+        """
+        teams = await self._get_teams(team_ids)
+        rows_by_team: Dict[int, List[dict]] = {}
+        for team_id in teams:
+            splits = self._aggregated_splits(team_id, season)
+            if splits:
+                rows_by_team[team_id] = splits
+        missing = [team_id for team_id in teams if team_id not in rows_by_team]
+        if missing:
+            rows_by_team.update(await self._fetch_for_teams("team_location_splits", missing, season))
 
-        splits_response = query.execute()
+        return {
+            team_id: self._shape_location_splits(team, rows_by_team.get(team_id, []), season)
+            for team_id, team in teams.items()
+        }
 
-        if not splits_response.data:
+    def _aggregated_splits(self, team_id: int, season: Optional[str]) -> List[dict]:
+        """Splits derived from the running sums, or [] when the aggregator cannot answer"""
+        aggregator = self.location_splits
+        if aggregator is None or not aggregator.ready:
+            return []
+        return aggregator.get(team_id, season)
+
+    @staticmethod
+    def _shape_location_splits(team: dict, splits: List[dict], season: Optional[str]) -> dict:
+        """Build the location splits response from a team's split rows (latest season first)"""
+        if not splits:
             return {
                 "team_id": team["id"],
                 "team_name": team["team_name"],
@@ -61,7 +152,6 @@ class TeamController:
             }
 
         # Group by location
-        splits = splits_response.data
         season_str = splits[0]["season"] if splits else season
 
         home_split = next((s for s in splits if s["location"] == "home"), None)
@@ -75,7 +165,7 @@ class TeamController:
             "away": away_split
         }
 
-    def get_team_location_splits_by_name(
+    async def get_team_location_splits_by_name(
         self,
         league: str,
         team_name: str,
@@ -92,29 +182,12 @@ class TeamController:
         Returns:
             Dict with team info and home/away split data
         """
-        league_map = {"nfl": 1, "nba": 2}
-        league_id = league_map.get(league.lower())
-
-        if league_id is None:
-            raise ValueError(f"Unknown league: {league}")
-
-        # Find the team
-        team_response = (
-            self.db
-            .table("teams")
-            .select("id, team_name, abbreviation")
-            .eq("league_id", league_id)
-            .ilike("team_name", f"%{team_name}%")
-            .single()
-            .execute()
-        )
-
-        if not team_response.data:
-            raise ValueError(f"Team '{team_name}' not found in {league.upper()}")
+        await self.team_index.ensure_loaded()
+        team = self.team_index.require(league, team_name)
 
-        return self.get_team_location_splits(team_response.data["id"], season)
+        return await self.get_team_location_splits(team["id"], season)
 
-    def get_matchup_location_context(
+    async def get_matchup_location_context(
         self,
         home_team_id: int,
         away_team_id: int,
@@ -132,9 +205,16 @@ class TeamController:
         Returns:
             Dict with home team's home splits and away team's away splits
         """
-        home_splits = self.get_team_location_splits(home_team_id, season)
-        away_splits = self.get_team_location_splits(away_team_id, season)
+        home_splits, away_splits = await asyncio.gather(
+            self.get_team_location_splits(home_team_id, season),
+            self.get_team_location_splits(away_team_id, season),
+        )
 
+        return self.build_location_context(home_splits, away_splits)
+
+    @staticmethod
+    def build_location_context(home_splits: dict, away_splits: dict) -> dict:
+        """Combine two location split responses into a matchup location context"""
         return {
             "season": home_splits["season"],
             "home_team": {
@@ -149,7 +229,7 @@ class TeamController:
             }
         }
 
-    def get_team_recent_form(
+    async def get_team_recent_form(
         self,
         team_id: int,
         season: Optional[str] = None,
@@ -166,38 +246,62 @@ class TeamController:
         Returns:
             Dict with team info and recent form data
         """
-        # Get team info
-        team_response = (
-            self.db
-            .table("teams")
-            .select("id, team_name, abbreviation")
-            .eq("id", team_id)
-            .single()
-            .execute()
-        )
+        team = await self._get_team(team_id)
 
-        if not team_response.data:
-            raise ValueError(f"Team with id {team_id} not found")
+        form = self._engine_form(team_id, season, games_back)
+        if form is not None:
+            return self._shape_recent_form(team, [form], season)
 
-        team = team_response.data
+        # Latest season first when no season is given
+        forms = await self.repo.get_team_rows("team_recent_form", [team_id], season, games_back)
 
-        # Build query for recent form
-        query = (
-            self.db
-            .table("team_recent_form")
-            .select("*")
-            .eq("team_id", team_id)
-            .eq("games_back", games_back)
-        )
+        return self._shape_recent_form(team, forms, season)
+
+    async def get_recent_form_for_teams(
+        self,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: int = 10
+    ) -> Dict[int, dict]:
+        """
+        Fetch recent form for many teams with a few batched in_() queries.
 
-        if season:
-            query = query.eq("season", season)
-        else:
-            query = query.order("season", desc=True)
+        Args:
+            team_ids: Internal team IDs
+            season: Optional season string. If None, each team gets its latest season.
+            games_back: Number of recent games (default 10)
+
+        Returns:
+            Dict of team_id -> the same shape as get_team_recent_form
+        """
+        teams = await self._get_teams(team_ids)
+        rows_by_team: Dict[int, List[dict]] = {}
+        for team_id in teams:
+            form = self._engine_form(team_id, season, games_back)
+            if form is not None:
+                rows_by_team[team_id] = [form]
+        missing = [team_id for team_id in teams if team_id not in rows_by_team]
+        if missing:
+            rows_by_team.update(await self._fetch_for_teams(
+                "team_recent_form", missing, season, games_back=games_back
+            ))
 
-        form_response = query.limit(1).execute()
+        return {
+            team_id: self._shape_recent_form(team, rows_by_team.get(team_id, []), season)
+            for team_id, team in teams.items()
+        }
 
-        if not form_response.data:
+    def _engine_form(self, team_id: int, season: Optional[str], games_back: int) -> Optional[dict]:
+        """Recent form computed from the game log, or None when the engine cannot answer"""
+        engine = self.recent_form
+        if engine is None or not engine.ready or games_back > engine.capacity:
+            return None
+        return engine.get(team_id, season, games_back)
+
+    @staticmethod
+    def _shape_recent_form(team: dict, forms: List[dict], season: Optional[str]) -> dict:
+        """Build the recent form response from a team's form rows (latest season first)"""
+        if not forms:
             return {
                 "team_id": team["id"],
                 "team_name": team["team_name"],
@@ -205,7 +309,7 @@ class TeamController:
                 "recent_form": None
             }
 
-        form = form_response.data[0]
+        form = forms[0]
 
         return {
             "team_id": team["id"],
@@ -214,7 +318,7 @@ class TeamController:
             "recent_form": form
         }
 
-    def get_team_recent_form_by_name(
+    async def get_team_recent_form_by_name(
         self,
         league: str,
         team_name: str,
@@ -233,29 +337,12 @@ class TeamController:
         Returns:
             Dict with team info and recent form data
         """
-        league_map = {"nfl": 1, "nba": 2}
-        league_id = league_map.get(league.lower())
-
-        if league_id is None:
-            raise ValueError(f"Unknown league: {league}")
-
-        # Find the team
-        team_response = (
-            self.db
-            .table("teams")
-            .select("id, team_name, abbreviation")
-            .eq("league_id", league_id)
-            .ilike("team_name", f"%{team_name}%")
-            .single()
-            .execute()
-        )
-
-        if not team_response.data:
-            raise ValueError(f"Team '{team_name}' not found in {league.upper()}")
+        await self.team_index.ensure_loaded()
+        team = self.team_index.require(league, team_name)
 
-        return self.get_team_recent_form(team_response.data["id"], season, games_back)
+        return await self.get_team_recent_form(team["id"], season, games_back)
 
-    def get_matchup_momentum(
+    async def get_matchup_momentum(
         self,
         team1_id: int,
         team2_id: int,
@@ -274,9 +361,16 @@ class TeamController:
         Returns:
             Dict with both teams' recent form for comparison
         """
-        team1_form = self.get_team_recent_form(team1_id, season, games_back)
-        team2_form = self.get_team_recent_form(team2_id, season, games_back)
+        team1_form, team2_form = await asyncio.gather(
+            self.get_team_recent_form(team1_id, season, games_back),
+            self.get_team_recent_form(team2_id, season, games_back),
+        )
+
+        return self.build_momentum(team1_form, team2_form, games_back)
 
+    @staticmethod
+    def build_momentum(team1_form: dict, team2_form: dict, games_back: int) -> dict:
+        """Combine two recent form responses into a matchup momentum comparison"""
         return {
             "season": team1_form["season"],
             "games_back": games_back,
@@ -291,3 +385,41 @@ class TeamController:
                 "recent_form": team2_form["recent_form"]
             }
         }
+
+
+    async def _get_teams(self, team_ids: Iterable[int]) -> Dict[int, dict]:
+        """Look up several teams in the team index, raising for any unknown id"""
+        await self.team_index.ensure_loaded()
+        teams = {}
+        for team_id in dict.fromkeys(team_ids):
+            team = self.team_index.get(team_id)
+            if team is None:
+                raise ValueError(f"Team with id {team_id} not found")
+            teams[team_id] = team
+        return teams
+
+    async def _fetch_for_teams(
+        self,
+        table: str,
+        team_ids: List[int],
+        season: Optional[str],
+        games_back: Optional[int] = None,
+    ) -> Dict[int, List[dict]]:
+        """
+        Read `table` rows for many teams in chunked in_() queries run with bounded concurrency.
+
+        Returns:
+            Dict of team_id -> rows, latest season first so shaping can take the first match
+        """
+        async def fetch_chunk(chunk: List[int]) -> List[dict]:
+            async with self._batch_semaphore:
+                return await self.repo.get_team_rows(table, chunk, season, games_back)
+
+        chunks = [team_ids[i:i + self.batch_size] for i in range(0, len(team_ids), self.batch_size)]
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+        rows_by_team: Dict[int, List[dict]] = {}
+        for rows in results:
+            for row in rows:
+                rows_by_team.setdefault(row["team_id"], []).append(row)
+        return rows_by_team
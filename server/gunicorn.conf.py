@@ -1,11 +1,40 @@
-from configparser import ConfigParser
+import os
+import shutil
+import sys
+import tempfile
 
+# Gunicorn loads this file by path, before the app directory is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-_config = ConfigParser()
-_config.read("config.ini")
+from resources.config import get_config  # noqa: E402
+
+_config = get_config()
 _host = "{}:{}".format(_config.get("SERVER","host"),_config.get("SERVER","port"))
 
+# Workers write Prometheus samples here so /metrics can aggregate across all of them.
+# Must be in the environment before any worker imports prometheus_client.
+_metrics_dir = _config.get(
+    "METRICS",
+    "multiproc_dir",
+    fallback=os.path.join(tempfile.gettempdir(), "shadowtrader-prometheus"),
+)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", _metrics_dir)
+
 
 wsgi_app = "main:app"
 worker_class = "uvicorn.workers.UvicornWorker"
-bind = _host
\ No newline at end of file
+bind = _host
+
+
+def on_starting(server):
+    """Start every master run with an empty metrics directory so old workers' samples are not counted"""
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop the exited worker's live gauges; its counters and histograms are kept"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
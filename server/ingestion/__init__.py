@@ -0,0 +1,23 @@
+"""
+ESPN ingestion: populates teams, players, team_game_results,
+player_vs_team_stats, team_location_splits and team_recent_form.
+
+    python -m ingestion backfill --league nba --seasons 2025-26,2024-25
+    python -m ingestion incremental            # nightly, every league
+
+See ingestion.pipeline.IngestionPipeline for how a run is structured and
+schema.sql for the unique keys the upserts rely on.
+"""
+from ingestion.checkpoint import Checkpoint
+from ingestion.espn import EspnClient, EspnError
+from ingestion.pipeline import IngestionPipeline, IngestionReport
+from ingestion.writer import SupabaseWriter
+
+__all__ = [
+    "Checkpoint",
+    "EspnClient",
+    "EspnError",
+    "IngestionPipeline",
+    "IngestionReport",
+    "SupabaseWriter",
+]
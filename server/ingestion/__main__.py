@@ -0,0 +1,93 @@
+"""
+Run an ESPN ingestion from the command line (from the server directory).
+
+    python -m ingestion backfill --league nba --seasons 2025-26,2024-25
+    python -m ingestion incremental
+    python -m ingestion incremental --every 300   # games land minutes after the final whistle
+
+Settings come from [INGESTION] in config.ini; Supabase credentials default
+to [SERVER] and need write access to the stats tables.
+"""
+import argparse
+import asyncio
+import logging
+from configparser import ConfigParser
+from dataclasses import asdict
+from datetime import date
+
+from supabase import AsyncClient
+
+from ingestion.checkpoint import Checkpoint
+from ingestion.espn import EspnClient
+from ingestion.pipeline import IngestionPipeline
+from ingestion.seasons import season_for
+from ingestion.writer import SupabaseWriter
+from resources.config import get_config
+from resources.constants import ESPN_SITE_API_URL, LEAGUE_TO_SPORT
+from resources.http_session import create_espn_session
+
+
+async def run(config: ConfigParser, args: argparse.Namespace) -> None:
+    leagues = sorted(LEAGUE_TO_SPORT) if args.league == "all" else [args.league]
+    db = AsyncClient(
+        config.get("INGESTION", "supabase_url", fallback=config.get("SERVER", "supabase_url")),
+        config.get("INGESTION", "supabase_key", fallback=config.get("SERVER", "supabase_key")),
+    )
+    session = create_espn_session(config)
+    try:
+        pipeline = IngestionPipeline(
+            EspnClient(
+                session,
+                base_url=args.espn_url or config.get("INGESTION", "espn_url", fallback=ESPN_SITE_API_URL),
+                concurrency=config.getint("INGESTION", "concurrency", fallback=16),
+                retries=config.getint("INGESTION", "retries", fallback=4),
+                backoff=config.getfloat("INGESTION", "backoff", fallback=0.5),
+            ),
+            SupabaseWriter(
+                db,
+                chunk_size=config.getint("INGESTION", "chunk_size", fallback=500),
+                concurrency=config.getint("INGESTION", "write_concurrency", fallback=4),
+            ),
+            Checkpoint(args.checkpoint_dir or config.get("INGESTION", "checkpoint_dir", fallback=".ingestion")),
+            # Empty when the API computes recent form from team_game_results ([RECENT_FORM])
+            games_back=[int(n) for n in config.get("INGESTION", "games_back", fallback="5,10,20").split(",") if n.strip()],
+            location_splits=config.getboolean("INGESTION", "location_splits", fallback=True),
+            day_batch=config.getint("INGESTION", "day_batch", fallback=14),
+            overlap_days=config.getint("INGESTION", "overlap_days", fallback=2),
+        )
+        while True:
+            today = date.fromisoformat(args.today) if args.today else date.today()
+            for league in leagues:
+                if args.mode == "backfill":
+                    seasons = args.seasons.split(",") if args.seasons else [season_for(league, today)]
+                    report = await pipeline.backfill(league, seasons, today)
+                else:
+                    report = await pipeline.incremental(league, today)
+                logging.info("Ingestion finished: %s", asdict(report))
+            if args.mode == "backfill" or not args.every:
+                break
+            await asyncio.sleep(args.every)
+    finally:
+        await session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest ESPN games into the stats tables")
+    parser.add_argument("mode", choices=("backfill", "incremental"))
+    parser.add_argument("--league", choices=sorted(LEAGUE_TO_SPORT) + ["all"], default="all")
+    parser.add_argument("--seasons", help="Comma-separated seasons to backfill, e.g. 2025-26,2024-25 (default: current)")
+    parser.add_argument("--today", help="Treat this date (YYYY-MM-DD) as today")
+    parser.add_argument("--espn-url", help="Override [INGESTION] espn_url")
+    parser.add_argument("--checkpoint-dir", help="Override [INGESTION] checkpoint_dir")
+    parser.add_argument("--every", type=float, help="Repeat incremental runs every this many seconds instead of exiting")
+    parser.add_argument("--config", default="config.ini")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # One line per PostgREST request otherwise
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(get_config(args.config), args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+In-memory aggregation of parsed games into stats table rows.
+
+Games are folded into player_vs_team_stats totals in date order, and into
+team_game_results rows from which location splits and recent form are
+derived per (team, season).
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from ingestion.parse import Game, PlayerLine
+from ingestion.seasons import season_for
+from resources.constants import PLAYER_STATS_TO_AVERAGE
+from resources.team_games import TEAM_GAME_STATS, TeamTotals, recent_form_fields
+
+Matchup = Tuple[int, int]   # (player_id, opponent_team_id)
+
+# player_vs_team_stats columns the pipeline owns (besides the stat totals)
+PLAYER_TOTALS_COLUMNS = (
+    "player_id", "opponent_team_id", "season_count", "games", "starts",
+    "wins", "losses", "ties", "last_game_date", "last_updated",
+)
+
+
+def result(points: int, opponent_points: int) -> str:
+    if points > opponent_points:
+        return "W"
+    if points < opponent_points:
+        return "L"
+    return "T"
+
+
+def team_game_rows(game: Game, team_ids: Mapping[str, int], stamp: str) -> List[dict]:
+    """Both team_game_results rows of a game (ESPN team ids mapped to ours)"""
+    rows = []
+    for side in (game.home, game.away):
+        opponent = game.opponent(side.espn_team_id)
+        row = {
+            "team_id": team_ids[side.espn_team_id],
+            "opponent_team_id": team_ids[opponent.espn_team_id],
+            "game_id": game.game_id,
+            "season": game.season,
+            "game_date": game.game_date,
+            "is_home": side.is_home,
+            "result": result(side.points, opponent.points),
+            "points_scored": side.points,
+            "points_allowed": opponent.points,
+            "last_updated": stamp,
+        }
+        row.update({stat: side.stats.get(stat, 0) for stat in TEAM_GAME_STATS})
+        rows.append(row)
+    return rows
+
+
+def empty_player_totals(player_id: int, opponent_team_id: int) -> dict:
+    row = {column: None for column in PLAYER_STATS_TO_AVERAGE}
+    row.update({
+        "player_id": player_id,
+        "opponent_team_id": opponent_team_id,
+        "season_count": 0,
+        "games": 0,
+        "starts": 0,
+        "wins": 0,
+        "losses": 0,
+        "ties": 0,
+        "last_game_date": None,
+    })
+    return row
+
+
+def fold_player_game(row: dict, game: Game, line: PlayerLine) -> bool:
+    """
+    Add one box score line to a player_vs_team_stats row.
+
+    Lines on or before the row's last_game_date are already counted and are
+    skipped, so re-applying a game after a crash never double counts it
+    (a player plays at most one game per day).
+
+    Returns:
+        True if the line was added
+    """
+    last = row.get("last_game_date")
+    last = last.isoformat() if isinstance(last, date) else last
+    if last is not None and game.game_date <= last:
+        return False
+
+    if last is None or season_for(game.league, date.fromisoformat(last)) != game.season:
+        row["season_count"] = (row.get("season_count") or 0) + 1
+    team = game.team(line.espn_team_id)
+    outcome = result(team.points, game.opponent(line.espn_team_id).points)
+    row["games"] = (row.get("games") or 0) + 1
+    row["starts"] = (row.get("starts") or 0) + int(line.starter)
+    row["wins"] = (row.get("wins") or 0) + (outcome == "W")
+    row["losses"] = (row.get("losses") or 0) + (outcome == "L")
+    row["ties"] = (row.get("ties") or 0) + (outcome == "T")
+    for stat, value in line.stats.items():
+        row[stat] = (row.get(stat) or 0) + value
+    row["last_game_date"] = game.game_date
+    return True
+
+
+def fold_player_totals(
+    games: Iterable[Game],
+    team_ids: Mapping[str, int],
+    player_ids: Mapping[str, int],
+    existing: Optional[Dict[Matchup, dict]] = None,
+) -> Dict[Matchup, dict]:
+    """
+    player_vs_team_stats rows after folding in every line of `games`.
+
+    Args:
+        games: Parsed games, any order (they are folded oldest first)
+        team_ids: ESPN team id -> teams.id
+        player_ids: ESPN athlete id -> players.id; unmapped athletes are skipped
+        existing: Current rows by matchup to add to; None builds totals from scratch
+
+    Returns:
+        The rows that changed, by (player_id, opponent_team_id)
+    """
+    rows = existing if existing is not None else {}
+    changed: Dict[Matchup, dict] = {}
+    for game in sorted(games, key=lambda g: (g.game_date, g.game_id)):
+        for line in game.players:
+            player_id = player_ids.get(line.espn_athlete_id)
+            if player_id is None:
+                continue
+            matchup = (player_id, team_ids[game.opponent(line.espn_team_id).espn_team_id])
+            row = rows.get(matchup)
+            if row is None:
+                row = rows[matchup] = empty_player_totals(*matchup)
+            if fold_player_game(row, game, line):
+                changed[matchup] = row
+    return changed
+
+
+def team_season_rows(
+    team_id: int,
+    season: str,
+    log: Sequence[Mapping],
+    games_back: Iterable[int],
+    stamp: str,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    team_location_splits and team_recent_form rows of one team's season.
+
+    Args:
+        log: The team's team_game_results rows for the season, any order
+        games_back: Recent form window sizes to store
+
+    Returns:
+        (location split rows, recent form rows)
+    """
+    splits = []
+    for location, is_home in (("home", True), ("away", False)):
+        games = [row for row in log if row["is_home"] == is_home]
+        if games:
+            splits.append({
+                "team_id": team_id,
+                "season": season,
+                "location": location,
+                **TeamTotals.of(games).location_split_fields(),
+                "last_updated": stamp,
+            })
+
+    newest_first = sorted(log, key=lambda row: (str(row["game_date"]), row["game_id"]), reverse=True)
+    forms = []
+    for window in games_back:
+        fields = recent_form_fields(newest_first[:window])
+        if fields:
+            forms.append({"team_id": team_id, "season": season, "games_back": window, **fields, "last_updated": stamp})
+    return splits, forms
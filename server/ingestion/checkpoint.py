@@ -0,0 +1,133 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from ingestion.parse import Game
+
+
+class Checkpoint:
+    """
+    Resumable ingestion progress, kept in a directory.
+
+    A backfill spools every parsed game to `<league>-<season>.jsonl` and
+    marks the scoreboard day done once all of its games are on disk, so an
+    interrupted backfill restarts from the first unfinished day without
+    refetching anything. After the aggregates are written the spool is
+    dropped and the league's cursor (the last day ingested) is set; the
+    incremental run starts from there.
+
+    state.json is replaced atomically on every save, so a crash leaves
+    either the old or the new state, never a torn one.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._state_path = os.path.join(directory, "state.json")
+        self._state: Dict[str, dict] = {}
+        if os.path.exists(self._state_path):
+            with open(self._state_path) as f:
+                self._state = json.load(f)
+
+    def _league(self, league: str) -> dict:
+        return self._state.setdefault(league, {"backfill": {}, "cursor": None, "processed": {}})
+
+    def _spool_path(self, league: str, season: str) -> str:
+        return os.path.join(self.directory, f"{league}-{season}.jsonl")
+
+    def _save(self) -> None:
+        tmp = self._state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._state_path)
+
+    # Backfill
+
+    def done_days(self, league: str, season: str) -> Set[str]:
+        """Scoreboard days (YYYYMMDD) whose games are already spooled"""
+        return set(self._league(league)["backfill"].get(season, []))
+
+    def load_games(self, league: str, season: str) -> List[Game]:
+        """Games spooled by earlier (possibly interrupted) runs of this backfill"""
+        path = self._spool_path(league, season)
+        if not os.path.exists(path):
+            return []
+        done = self.done_days(league, season)
+        games = []
+        with open(path) as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break   # torn last line from a crash mid-write; its day is not marked done
+                game = Game.from_dict(json.loads(line))
+                if game.game_date.replace("-", "") in done:
+                    games.append(game)
+        return games
+
+    def record_days(self, league: str, season: str, games_by_day: Dict[str, List[Game]]) -> None:
+        """Spool the games of finished days, then mark those days done"""
+        path = self._spool_path(league, season)
+        self._drop_torn_line(path)
+        with open(path, "a") as f:
+            for games in games_by_day.values():
+                for game in games:
+                    f.write(json.dumps(game.to_dict(), separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        days = self._league(league)["backfill"].setdefault(season, [])
+        days.extend(day for day in games_by_day if day not in days)
+        self._save()
+
+    @staticmethod
+    def _drop_torn_line(path: str) -> None:
+        """Cut a torn last line left by a crash, so the next append starts a line of its own"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+    def finish_backfill(self, league: str, seasons: Iterable[str]) -> None:
+        """Forget the spool of written seasons"""
+        state = self._league(league)
+        for season in seasons:
+            state["backfill"].pop(season, None)
+            path = self._spool_path(league, season)
+            if os.path.exists(path):
+                os.remove(path)
+        self._save()
+
+    # Incremental
+
+    def cursor(self, league: str) -> Optional[str]:
+        """Last day (YYYYMMDD) whose games are all written, or None before the first backfill"""
+        return self._league(league)["cursor"]
+
+    def processed(self, league: str) -> Set[str]:
+        """Event ids written on the days the next incremental run rescans"""
+        return {event_id for ids in self._league(league)["processed"].values() for event_id in ids}
+
+    def advance(self, league: str, cursor: str, processed_by_day: Dict[str, Iterable[str]], keep_from: str) -> None:
+        """
+        Move the cursor after a successful write.
+
+        Args:
+            cursor: New last ingested day (YYYYMMDD)
+            processed_by_day: Event ids written, by day
+            keep_from: Days before this (YYYYMMDD) are never rescanned; their ids are dropped
+        """
+        state = self._league(league)
+        processed = state["processed"]
+        for day, ids in processed_by_day.items():
+            processed[day] = sorted(set(processed.get(day, [])) | set(ids))
+        state["processed"] = {day: ids for day, ids in processed.items() if day >= keep_from}
+        if state["cursor"] is None or cursor > state["cursor"]:
+            state["cursor"] = cursor
+        self._save()
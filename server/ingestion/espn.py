@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import aiohttp
+
+from resources.constants import ESPN_SITE_API_URL, LEAGUE_TO_SPORT
+from resources.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+# Worth another attempt: rate limiting and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class EspnError(Exception):
+    """An ESPN request that failed for good (non-retryable status, or out of retries)"""
+
+
+class EspnClient:
+    """
+    ESPN site API client for the ingestion pipeline.
+
+    Every request shares one pooled session and passes through a semaphore,
+    so however many coroutines the pipeline fans out, at most `concurrency`
+    requests are on the wire. Timeouts, connection errors, 429s and 5xx
+    responses are retried with exponential backoff and full jitter; the
+    Retry-After header is honoured when ESPN sends one.
+
+    Args:
+        session: Pooled session (see resources.http_session.create_espn_session); not closed here
+        base_url: ESPN site API root, e.g. https://site.api.espn.com/apis/site/v2/sports
+        concurrency: Requests in flight at once
+        retries: Attempts after the first before giving up
+        backoff: Base delay in seconds, doubled per attempt
+        max_backoff: Cap on a single delay
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str = ESPN_SITE_API_URL,
+        concurrency: int = 16,
+        retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+    ):
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def get_teams(self, league: str) -> dict:
+        return await self._get(league, "/teams", "/teams", {"limit": 100})
+
+    async def get_roster(self, league: str, espn_team_id: str) -> dict:
+        return await self._get(league, f"/teams/{espn_team_id}/roster", "/teams/{id}/roster")
+
+    async def get_scoreboard(self, league: str, day: str) -> dict:
+        """Every event on one day (YYYYMMDD)"""
+        return await self._get(league, "/scoreboard", "/scoreboard", {"dates": day, "limit": 100})
+
+    async def get_summary(self, league: str, event_id: str) -> dict:
+        """Game summary of one event, including the box score"""
+        return await self._get(league, "/summary", "/summary", {"event": event_id})
+
+    async def _get(self, league: str, path: str, target: str, params: Optional[dict] = None) -> dict:
+        url = f"{self.base_url}/{LEAGUE_TO_SPORT[league]}{path}"
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._semaphore:
+                try:
+                    with observe_upstream("espn", target):
+                        async with self.session.get(url, params=params) as response:
+                            if response.status == 200:
+                                return await response.json(content_type=None)
+                            if response.status not in RETRY_STATUSES:
+                                raise EspnError(f"ESPN {target} returned {response.status}: {await response.text()}")
+                            retry_after = response.headers.get("Retry-After")
+                            error = f"status {response.status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = repr(e)
+
+            if attempt >= self.retries:
+                raise EspnError(f"ESPN {target} failed after {attempt + 1} attempts: {error}")
+            # Sleep outside the semaphore so a backing-off request does not hold a slot
+            await asyncio.sleep(self._delay(attempt, retry_after))
+            attempt += 1
+            logger.debug("Retrying ESPN %s %s (attempt %d): %s", target, params, attempt, error)
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
@@ -0,0 +1,254 @@
+"""
+Turn ESPN site API payloads into the few fields the stats tables need.
+
+ESPN box scores list each stat group's `keys` once and every athlete's
+`stats` as strings in the same order ("9-17", "4/6", "--"); compound keys
+such as `fieldGoalsMade-fieldGoalsAttempted` fill two columns.
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# ESPN season types: 1 preseason, 2 regular season, 3 postseason
+PRESEASON = 1
+
+# (stat group, ESPN key) -> player_vs_team_stats columns; group None matches any group
+PLAYER_STAT_KEYS: Dict[Tuple[Optional[str], str], Tuple[str, ...]] = {
+    # NFL
+    ("passing", "completions/passingAttempts"): ("passing_completions", "passing_attempts"),
+    ("passing", "passingYards"): ("passing_yards",),
+    ("passing", "passingTouchdowns"): ("passing_tds",),
+    ("passing", "interceptions"): ("passing_ints",),
+    ("passing", "sacks-sackYardsLost"): ("passing_sacks",),
+    ("rushing", "rushingAttempts"): ("rushing_attempts",),
+    ("rushing", "rushingYards"): ("rushing_yards",),
+    ("rushing", "rushingTouchdowns"): ("rushing_tds",),
+    ("receiving", "receivingTargets"): ("receiving_targets",),
+    ("receiving", "receptions"): ("receptions",),
+    ("receiving", "receivingYards"): ("receiving_yards",),
+    ("receiving", "receivingTouchdowns"): ("receiving_tds",),
+    # NBA
+    (None, "points"): ("points",),
+    (None, "fieldGoalsMade-fieldGoalsAttempted"): ("field_goals_made", "field_goal_attempts"),
+    (None, "threePointFieldGoalsMade-threePointFieldGoalsAttempted"): ("three_pt_made", "three_pt_attempts"),
+    (None, "freeThrowsMade-freeThrowsAttempted"): ("free_throws_made", "free_throw_attempts"),
+    (None, "rebounds"): ("rebounds_total",),
+    (None, "offensiveRebounds"): ("rebounds_offensive",),
+    (None, "defensiveRebounds"): ("rebounds_defensive",),
+    (None, "assists"): ("assists",),
+    (None, "steals"): ("steals",),
+    (None, "blocks"): ("blocks",),
+    (None, "turnovers"): ("turnovers",),
+}
+
+# ESPN team box score stat name -> team_game_results columns
+TEAM_STAT_NAMES: Dict[str, Tuple[str, ...]] = {
+    "fieldGoalsMade-fieldGoalsAttempted": ("field_goals_made", "field_goal_attempts"),
+    "threePointFieldGoalsMade-threePointFieldGoalsAttempted": ("three_pt_made", "three_pt_attempts"),
+    "freeThrowsMade-freeThrowsAttempted": ("free_throws_made", "free_throw_attempts"),
+    "totalRebounds": ("rebounds_total",),
+    "offensiveRebounds": ("rebounds_offensive",),
+    "assists": ("assists",),
+    "steals": ("steals",),
+    "blocks": ("blocks",),
+    "turnovers": ("turnovers",),
+}
+
+
+@dataclass
+class TeamLine:
+    """One side of a finished game"""
+    espn_team_id: str
+    is_home: bool
+    points: int
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class PlayerLine:
+    """One athlete's box score line, merged across stat groups"""
+    espn_athlete_id: str
+    espn_team_id: str
+    display_name: str
+    photo_url: Optional[str] = None
+    position: Optional[str] = None
+    starter: bool = False
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class Game:
+    """A finished game: both teams and every athlete who recorded a stat"""
+    game_id: str
+    league: str
+    game_date: str   # YYYY-MM-DD, the scoreboard day it was listed under
+    season: str
+    home: TeamLine
+    away: TeamLine
+    players: List[PlayerLine] = field(default_factory=list)
+
+    def team(self, espn_team_id: str) -> TeamLine:
+        return self.home if self.home.espn_team_id == espn_team_id else self.away
+
+    def opponent(self, espn_team_id: str) -> TeamLine:
+        return self.away if self.home.espn_team_id == espn_team_id else self.home
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Game":
+        return cls(**{
+            **data,
+            "home": TeamLine(**data["home"]),
+            "away": TeamLine(**data["away"]),
+            "players": [PlayerLine(**line) for line in data.get("players", [])],
+        })
+
+
+def _int(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _split_values(value: str, parts: int) -> List[int]:
+    """'9-17' / '4/6' -> [9, 17]; extra numbers are dropped ('3-21' sacks-sackYardsLost -> [3])"""
+    text = str(value)
+    # A leading minus is a sign, not a separator (-3 rushing yards)
+    negative = text.startswith("-") and text[1:2].isdigit()
+    numbers = [_int(piece) for piece in text.lstrip("-").replace("/", "-").split("-")]
+    if negative:
+        numbers[0] = -numbers[0]
+    return (numbers + [0] * parts)[:parts]
+
+
+def parse_teams(payload: dict) -> List[dict]:
+    """Teams listed by /teams: espn_id, name ('Hawks'), display_name, abbreviation, logo_url"""
+    teams = []
+    for sport in payload.get("sports", []):
+        for league in sport.get("leagues", []):
+            for entry in league.get("teams", []):
+                team = entry.get("team", entry)
+                logos = team.get("logos") or [{}]
+                teams.append({
+                    "espn_id": str(team["id"]),
+                    "name": team.get("name") or team.get("shortDisplayName") or team.get("displayName"),
+                    "display_name": team.get("displayName"),
+                    "abbreviation": team.get("abbreviation"),
+                    "logo_url": logos[0].get("href"),
+                })
+    return teams
+
+
+def parse_roster(payload: dict) -> List[dict]:
+    """
+    Athletes of a /teams/{id}/roster payload.
+
+    NBA rosters are a flat `athletes` list, NFL rosters group them by unit
+    (`athletes: [{position: 'offense', items: [...]}, ...]`); both come back flat.
+    """
+    athletes = []
+    for entry in payload.get("athletes", []):
+        for athlete in entry["items"] if "items" in entry else [entry]:
+            athletes.append({
+                "espn_id": str(athlete["id"]),
+                "first_name": athlete.get("firstName") or athlete.get("displayName", ""),
+                "last_name": athlete.get("lastName"),
+                "photo_url": (athlete.get("headshot") or {}).get("href"),
+                "position": (athlete.get("position") or {}).get("abbreviation"),
+                "status": (athlete.get("status") or {}).get("name"),
+            })
+    return athletes
+
+
+def parse_scoreboard(payload: dict) -> List[str]:
+    """Ids of the finished, non-preseason events on a /scoreboard day"""
+    event_ids = []
+    for event in payload.get("events", []):
+        if (event.get("season") or {}).get("type") == PRESEASON:
+            continue
+        status = event.get("status") or (event.get("competitions") or [{}])[0].get("status") or {}
+        if (status.get("type") or {}).get("completed"):
+            event_ids.append(str(event["id"]))
+    return event_ids
+
+
+def parse_summary(league: str, event_id: str, game_date: str, season: str, payload: dict) -> Optional[Game]:
+    """
+    A finished game from a /summary payload.
+
+    Returns:
+        The game, or None if it is not final or has no box score
+    """
+    competition = ((payload.get("header") or {}).get("competitions") or [{}])[0]
+    if not ((competition.get("status") or {}).get("type") or {}).get("completed"):
+        return None
+    competitors = competition.get("competitors") or []
+    boxscore = payload.get("boxscore") or {}
+    if len(competitors) != 2 or not boxscore:
+        return None
+
+    team_stats = {
+        str(entry["team"]["id"]): _team_stats(entry.get("statistics") or [])
+        for entry in boxscore.get("teams", [])
+    }
+    sides = {}
+    for competitor in competitors:
+        espn_team_id = str(competitor.get("id") or competitor["team"]["id"])
+        sides[competitor.get("homeAway")] = TeamLine(
+            espn_team_id=espn_team_id,
+            is_home=competitor.get("homeAway") == "home",
+            points=_int(competitor.get("score")),
+            stats=team_stats.get(espn_team_id, {}),
+        )
+    if set(sides) != {"home", "away"}:
+        return None
+
+    return Game(
+        game_id=str(event_id),
+        league=league,
+        game_date=game_date,
+        season=season,
+        home=sides["home"],
+        away=sides["away"],
+        players=_player_lines(boxscore.get("players") or []),
+    )
+
+
+def _team_stats(statistics: List[dict]) -> Dict[str, int]:
+    stats: Dict[str, int] = {}
+    for stat in statistics:
+        columns = TEAM_STAT_NAMES.get(stat.get("name"))
+        if columns:
+            for column, value in zip(columns, _split_values(stat.get("displayValue", ""), len(columns))):
+                stats[column] = value
+    return stats
+
+
+def _player_lines(teams: List[dict]) -> List[PlayerLine]:
+    lines: Dict[str, PlayerLine] = {}
+    for team in teams:
+        espn_team_id = str(team["team"]["id"])
+        for group in team.get("statistics") or []:
+            name = group.get("name")
+            columns = [PLAYER_STAT_KEYS.get((name, key)) or PLAYER_STAT_KEYS.get((None, key)) for key in group.get("keys", [])]
+            for entry in group.get("athletes") or []:
+                if entry.get("didNotPlay") or not entry.get("stats"):
+                    continue
+                athlete = entry["athlete"]
+                line = lines.get(str(athlete["id"]))
+                if line is None:
+                    line = lines[str(athlete["id"])] = PlayerLine(
+                        espn_athlete_id=str(athlete["id"]),
+                        espn_team_id=espn_team_id,
+                        display_name=athlete.get("displayName", ""),
+                        photo_url=(athlete.get("headshot") or {}).get("href"),
+                        position=(athlete.get("position") or {}).get("abbreviation"),
+                    )
+                line.starter = line.starter or bool(entry.get("starter"))
+                for target, value in zip(columns, entry["stats"]):
+                    if target:
+                        for column, number in zip(target, _split_values(value, len(target))):
+                            line.stats[column] = line.stats.get(column, 0) + number
+    return list(lines.values())
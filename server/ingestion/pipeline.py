@@ -0,0 +1,390 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Collection, Dict, Iterable, List, Optional, Sequence, Set
+
+from ingestion.aggregate import PLAYER_TOTALS_COLUMNS, fold_player_totals, team_game_rows, team_season_rows
+from ingestion.checkpoint import Checkpoint
+from ingestion.espn import EspnClient
+from ingestion.parse import Game, parse_roster, parse_scoreboard, parse_summary, parse_teams
+from ingestion.seasons import season_days, season_for
+from ingestion.writer import SupabaseWriter
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID, PLAYER_STATS_TO_AVERAGE
+
+logger = logging.getLogger(__name__)
+
+PLAYER_STATS_COLUMNS = PLAYER_TOTALS_COLUMNS + tuple(PLAYER_STATS_TO_AVERAGE)
+
+
+def _day_key(day: date) -> str:
+    return day.strftime("%Y%m%d")
+
+
+@dataclass
+class IngestionReport:
+    """What one run read and wrote"""
+    league: str
+    mode: str
+    days: int = 0
+    games: int = 0
+    team_game_rows: int = 0
+    player_rows: int = 0
+    split_rows: int = 0
+    form_rows: int = 0
+    seconds: float = 0.0
+
+
+class IngestionPipeline:
+    """
+    Walks ESPN for one league and writes the stats tables.
+
+    backfill() reads every finished game of the given seasons (days fetched
+    `day_batch` at a time, each day's summaries concurrently), spools them
+    to the checkpoint as days complete, then aggregates everything in
+    memory and writes the totals in chunked upserts, replacing what was
+    there for those matchups.
+
+    incremental() rescans only the days since the checkpoint cursor (plus
+    `overlap_days` for games that finished late), skips events already
+    written, adds the new games on top of the stored player_vs_team_stats
+    totals and recomputes the splits and recent form of the teams that
+    played. A game's team_game_results rows are written right after the
+    totals that include it, so a run that failed later on is simply run
+    again: games already in team_game_results are not added twice.
+
+    Args:
+        espn: ESPN client (bounded concurrency and retries live there)
+        writer: Chunked Supabase writer
+        checkpoint: Resumable progress store
+        games_back: Recent form window sizes written to team_recent_form
+        location_splits: Write team_location_splits; off when the API folds
+            them from team_game_results itself. With no games_back either,
+            runs never re-read whole season logs.
+        day_batch: Scoreboard days fetched concurrently during a backfill
+        overlap_days: Days before the cursor an incremental run rescans
+    """
+
+    def __init__(
+        self,
+        espn: EspnClient,
+        writer: SupabaseWriter,
+        checkpoint: Checkpoint,
+        games_back: Sequence[int] = (5, 10, 20),
+        location_splits: bool = True,
+        day_batch: int = 14,
+        overlap_days: int = 2,
+    ):
+        self.espn = espn
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.games_back = tuple(games_back)
+        self.location_splits = location_splits
+        self.day_batch = day_batch
+        self.overlap_days = overlap_days
+
+    async def backfill(self, league: str, seasons: Sequence[str], today: Optional[date] = None) -> IngestionReport:
+        """
+        Ingest whole seasons from scratch (resuming a previous interrupted backfill).
+
+        player_vs_team_stats totals of every matchup played in these seasons
+        are replaced by the sums over these seasons only, so list every
+        season that should count.
+        """
+        started = time.perf_counter()
+        today = today or date.today()
+        report = IngestionReport(league, "backfill")
+
+        team_ids = await self.sync_teams(league)
+        player_ids = await self.sync_rosters(league, team_ids)
+
+        games: List[Game] = []
+        for season in seasons:
+            done = self.checkpoint.done_days(league, season)
+            pending = [day for day in season_days(league, season, today) if _day_key(day) not in done]
+            report.days += len(pending)
+            for i in range(0, len(pending), self.day_batch):
+                batch = pending[i:i + self.day_batch]
+                fetched = await asyncio.gather(*(self.fetch_day(league, day) for day in batch))
+                # Past days are final and spooled; today's games may not all be over yet
+                finished = {}
+                for day, day_games in zip(batch, fetched):
+                    if day < today:
+                        finished[_day_key(day)] = day_games
+                    else:
+                        games.extend(day_games)
+                self.checkpoint.record_days(league, season, finished)
+            games.extend(self.checkpoint.load_games(league, season))
+
+        games = self._known_teams(games, team_ids)
+        player_ids.update(await self.sync_game_players(games, team_ids, player_ids, move=False))
+        await self.write(games, team_ids, player_ids, replace=True, report=report)
+
+        self.checkpoint.finish_backfill(league, seasons)
+        self._advance(league, games, today)
+        report.seconds = time.perf_counter() - started
+        return report
+
+    async def incremental(self, league: str, today: Optional[date] = None) -> IngestionReport:
+        """
+        Ingest the games finished since the last run.
+
+        Raises:
+            ValueError: If the league has never been backfilled
+        """
+        started = time.perf_counter()
+        today = today or date.today()
+        report = IngestionReport(league, "incremental")
+        cursor = self.checkpoint.cursor(league)
+        if cursor is None:
+            raise ValueError(f"No checkpoint for {league}; run a backfill first")
+
+        first = datetime.strptime(cursor, "%Y%m%d").date() - timedelta(days=self.overlap_days)
+        days = [first + timedelta(days=i) for i in range((today - first).days + 1)]
+        report.days = len(days)
+        processed = self.checkpoint.processed(league)
+
+        team_ids = await self.sync_teams(league)
+        fetched = await asyncio.gather(*(self.fetch_day(league, day, skip=processed) for day in days))
+        games = self._known_teams([game for day_games in fetched for game in day_games], team_ids)
+
+        if games:
+            player_ids = await self.sync_game_players(games, team_ids, None, move=True)
+            # Left by an earlier run that failed after writing them: already in the player totals
+            recorded = {
+                row["game_id"]
+                for row in await self.writer.select_in(
+                    "team_game_results", "game_id", "game_id", [game.game_id for game in games]
+                )
+            }
+            await self.write(games, team_ids, player_ids, replace=False, report=report, recorded=recorded)
+        self._advance(league, games, today)
+        report.seconds = time.perf_counter() - started
+        return report
+
+    async def fetch_day(self, league: str, day: date, skip: Iterable[str] = ()) -> List[Game]:
+        """Every finished game listed on one scoreboard day, minus event ids in `skip`"""
+        skip = set(skip)
+        event_ids = [
+            event_id for event_id in parse_scoreboard(await self.espn.get_scoreboard(league, _day_key(day)))
+            if event_id not in skip
+        ]
+        summaries = await asyncio.gather(*(self.espn.get_summary(league, event_id) for event_id in event_ids))
+        season = season_for(league, day)
+        games = [
+            parse_summary(league, event_id, day.isoformat(), season, summary)
+            for event_id, summary in zip(event_ids, summaries)
+        ]
+        return [game for game in games if game is not None]
+
+    async def sync_teams(self, league: str) -> Dict[str, int]:
+        """
+        Upsert the league's teams from ESPN, matched to existing rows by league and team name.
+
+        Returns:
+            ESPN team id -> teams.id
+        """
+        espn_teams = parse_teams(await self.espn.get_teams(league))
+        league_id = LEAGUE_NAME_TO_LEAGUE_ID[league]
+        written = await self.writer.upsert(
+            "teams",
+            [
+                {
+                    "league_id": league_id,
+                    "team_name": team["name"],
+                    "abbreviation": team["abbreviation"],
+                    "logo_url": team["logo_url"],
+                }
+                for team in espn_teams
+            ],
+            on_conflict="league_id,team_name",
+            returning=True,
+        )
+        ids = {row["team_name"]: row["id"] for row in written}
+        return {team["espn_id"]: ids[team["name"]] for team in espn_teams if team["name"] in ids}
+
+    async def sync_rosters(self, league: str, team_ids: Dict[str, int]) -> Dict[str, int]:
+        """
+        Upsert every current roster.
+
+        Returns:
+            ESPN athlete id -> players.id
+        """
+        espn_team_ids = list(team_ids)
+        rosters = await asyncio.gather(*(self.espn.get_roster(league, espn_id) for espn_id in espn_team_ids))
+        rows = {}
+        for espn_team_id, roster in zip(espn_team_ids, rosters):
+            for athlete in parse_roster(roster):
+                rows[athlete["espn_id"]] = {
+                    "espn_id": int(athlete["espn_id"]),
+                    "team_id": team_ids[espn_team_id],
+                    "first_name": athlete["first_name"],
+                    "last_name": athlete["last_name"],
+                    "photo_url": athlete["photo_url"],
+                    "position": athlete["position"],
+                    "status": athlete["status"],
+                }
+        written = await self.writer.upsert("players", list(rows.values()), on_conflict="espn_id", returning=True)
+        return {str(row["espn_id"]): row["id"] for row in written}
+
+    async def sync_game_players(
+        self,
+        games: Sequence[Game],
+        team_ids: Dict[str, int],
+        known: Optional[Dict[str, int]],
+        move: bool,
+    ) -> Dict[str, int]:
+        """
+        Make sure every athlete in the box scores has a players row.
+
+        Athletes missing from the players table (no longer on a roster) are
+        inserted on the team of their latest game. With `move`, known
+        athletes are also moved to that team, which keeps trades current
+        between backfills.
+
+        Args:
+            known: ESPN athlete id -> players.id already known; None reads them for these athletes
+
+        Returns:
+            ESPN athlete id -> players.id for every athlete in the games
+        """
+        latest = {}
+        for game in sorted(games, key=lambda g: (g.game_date, g.game_id)):
+            for line in game.players:
+                latest[line.espn_athlete_id] = line
+        if not latest:
+            return {}
+
+        teams: Dict[str, int] = {}
+        if known is None:
+            rows = await self.writer.select_in("players", "id, espn_id, team_id", "espn_id", [int(i) for i in latest])
+            known = {str(row["espn_id"]): row["id"] for row in rows}
+            teams = {str(row["espn_id"]): row["team_id"] for row in rows}
+        ids = {espn_id: known[espn_id] for espn_id in latest if espn_id in known}
+
+        missing = []
+        for espn_id, line in latest.items():
+            if espn_id in known:
+                continue
+            first_name, _, last_name = line.display_name.partition(" ")
+            missing.append({
+                "espn_id": int(espn_id),
+                "team_id": team_ids[line.espn_team_id],
+                "first_name": first_name,
+                "last_name": last_name or None,
+                "photo_url": line.photo_url,
+                "position": line.position,
+                "status": None,
+            })
+        if missing:
+            written = await self.writer.upsert("players", missing, on_conflict="espn_id", returning=True)
+            ids.update({str(row["espn_id"]): row["id"] for row in written})
+
+        if move:
+            moves: Dict[int, List[int]] = defaultdict(list)
+            for espn_id, line in latest.items():
+                team_id = team_ids[line.espn_team_id]
+                if espn_id in known and teams.get(espn_id) != team_id:
+                    moves[team_id].append(int(espn_id))
+            # Updates, not an upsert: Postgres checks an upsert's insert row against NOT NULL (first_name) first
+            await asyncio.gather(*(
+                self.writer.update("players", {"team_id": team_id}, "espn_id", espn_ids)
+                for team_id, espn_ids in moves.items()
+            ))
+        return ids
+
+    async def write(
+        self,
+        games: Sequence[Game],
+        team_ids: Dict[str, int],
+        player_ids: Dict[str, int],
+        replace: bool,
+        report: IngestionReport,
+        recorded: Collection[str] = (),
+    ) -> None:
+        """
+        Aggregate games and upsert player_vs_team_stats, team_game_results,
+        team_location_splits and team_recent_form.
+
+        Args:
+            replace: Build player totals from these games alone instead of adding to stored totals
+            recorded: Ids of games already in team_game_results, and so in the stored totals;
+                their rows are rewritten but they are not folded in again
+        """
+        stamp = datetime.now(timezone.utc).isoformat()
+        report.games = len(games)
+
+        folding = [game for game in games if game.game_id not in recorded]
+        existing = None
+        if not replace:
+            stored = await self.writer.select_in(
+                "player_vs_team_stats",
+                ", ".join(PLAYER_STATS_COLUMNS),
+                "player_id",
+                {player_ids[line.espn_athlete_id] for game in folding for line in game.players if line.espn_athlete_id in player_ids},
+            )
+            existing = {(row["player_id"], row["opponent_team_id"]): row for row in stored}
+        changed = fold_player_totals(folding, team_ids, player_ids, existing)
+        player_rows = [
+            {**{column: row.get(column) for column in PLAYER_STATS_COLUMNS}, "last_updated": stamp}
+            for row in changed.values()
+        ]
+        await self.writer.upsert("player_vs_team_stats", player_rows, on_conflict="player_id,opponent_team_id")
+        report.player_rows = len(player_rows)
+
+        # Only after the totals: these rows are what marks a game as folded in (see incremental())
+        game_rows = [row for game in games for row in team_game_rows(game, team_ids, stamp)]
+        await self.writer.upsert("team_game_results", game_rows, on_conflict="team_id,game_id")
+        report.team_game_rows = len(game_rows)
+
+        if not self.location_splits and not self.games_back:
+            return
+        logs = await self._season_logs(game_rows, replace)
+        splits, forms = [], []
+        for (team_id, season), log in logs.items():
+            team_splits, team_forms = team_season_rows(team_id, season, log, self.games_back, stamp)
+            if self.location_splits:
+                splits.extend(team_splits)
+            forms.extend(team_forms)
+        await asyncio.gather(
+            self.writer.upsert("team_location_splits", splits, on_conflict="team_id,season,location"),
+            self.writer.upsert("team_recent_form", forms, on_conflict="team_id,season,games_back"),
+        )
+        report.split_rows, report.form_rows = len(splits), len(forms)
+
+    async def _season_logs(self, game_rows: List[dict], replace: bool) -> Dict[tuple, List[dict]]:
+        """Full season game logs of every (team, season) in game_rows"""
+        logs: Dict[tuple, List[dict]] = defaultdict(list)
+        if replace:
+            for row in game_rows:
+                logs[(row["team_id"], row["season"])].append(row)
+            return logs
+
+        teams_by_season: Dict[str, Set[int]] = defaultdict(set)
+        for row in game_rows:
+            teams_by_season[row["season"]].add(row["team_id"])
+        reads = await asyncio.gather(*(
+            self.writer.select_in("team_game_results", "*", "team_id", team_ids, filters={"season": season})
+            for season, team_ids in teams_by_season.items()
+        ))
+        for rows in reads:
+            for row in rows:
+                logs[(row["team_id"], row["season"])].append(row)
+        return logs
+
+    @staticmethod
+    def _known_teams(games: List[Game], team_ids: Dict[str, int]) -> List[Game]:
+        """Drop games involving teams outside the league (all-star and exhibition games)"""
+        known = [game for game in games if game.home.espn_team_id in team_ids and game.away.espn_team_id in team_ids]
+        if len(known) < len(games):
+            logger.info("Skipped %d games against teams outside the league", len(games) - len(known))
+        return known
+
+    def _advance(self, league: str, games: Sequence[Game], today: date) -> None:
+        processed: Dict[str, List[str]] = defaultdict(list)
+        for game in games:
+            processed[game.game_date.replace("-", "")].append(game.game_id)
+        keep_from = _day_key(today - timedelta(days=self.overlap_days))
+        self.checkpoint.advance(league, _day_key(today), processed, keep_from)
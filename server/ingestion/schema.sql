@@ -0,0 +1,43 @@
+-- Schema the ESPN ingestion needs on top of the existing stats tables.
+-- Run once in the Supabase SQL editor; every statement is idempotent.
+
+-- Per-team, per-game log that location splits and recent form are derived from
+create table if not exists team_game_results (
+    id bigint generated by default as identity primary key,
+    team_id bigint not null references teams (id),
+    opponent_team_id bigint not null references teams (id),
+    game_id text not null,
+    season text not null,
+    game_date date not null,
+    is_home boolean not null,
+    result text not null check (result in ('W', 'L', 'T')),
+    points_scored integer not null,
+    points_allowed integer not null,
+    field_goals_made integer not null default 0,
+    field_goal_attempts integer not null default 0,
+    three_pt_made integer not null default 0,
+    three_pt_attempts integer not null default 0,
+    free_throws_made integer not null default 0,
+    free_throw_attempts integer not null default 0,
+    rebounds_total integer not null default 0,
+    rebounds_offensive integer not null default 0,
+    assists integer not null default 0,
+    steals integer not null default 0,
+    blocks integer not null default 0,
+    turnovers integer not null default 0,
+    last_updated timestamptz not null default now(),
+    unique (team_id, game_id)
+);
+create index if not exists team_game_results_team_season on team_game_results (team_id, season, game_date desc);
+-- Watermark reads of the API's recent form engine
+create index if not exists team_game_results_last_updated on team_game_results (last_updated);
+
+-- ESPN athlete id, the key rosters and box scores are matched on
+alter table players add column if not exists espn_id bigint;
+create unique index if not exists players_espn_id on players (espn_id);
+
+-- Unique keys the chunked upserts resolve conflicts on
+create unique index if not exists teams_league_team_name on teams (league_id, team_name);
+create unique index if not exists player_vs_team_stats_matchup on player_vs_team_stats (player_id, opponent_team_id);
+create unique index if not exists team_location_splits_key on team_location_splits (team_id, season, location);
+create unique index if not exists team_recent_form_key on team_recent_form (team_id, season, games_back);
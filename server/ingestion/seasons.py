@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+from typing import List
+
+# (month, day) each league's season window opens and closes; it closes in the following calendar year
+SEASON_WINDOWS = {
+    "nfl": ((9, 1), (2, 28)),
+    "nba": ((10, 1), (6, 30)),
+}
+
+
+def season_for(league: str, day: date) -> str:
+    """Season string ('2025-26') a game played on `day` belongs to"""
+    start = SEASON_WINDOWS[league][0]
+    year = day.year if (day.month, day.day) >= start else day.year - 1
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+def season_start_year(season: str) -> int:
+    return int(season.split("-")[0])
+
+
+def season_days(league: str, season: str, until: date) -> List[date]:
+    """Every day of a season's window up to and including `until`"""
+    (start_month, start_day), (end_month, end_day) = SEASON_WINDOWS[league]
+    year = season_start_year(season)
+    first = date(year, start_month, start_day)
+    last = min(date(year + 1, end_month, end_day), until)
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient
+
+from resources.metrics import observe_upstream
+from resources.repository import PAGE_SIZE
+
+
+def chunked(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class SupabaseWriter:
+    """
+    Chunked bulk reads and upserts against Supabase for the ingestion pipeline.
+
+    Every upsert is split into `chunk_size` rows per request and up to
+    `concurrency` chunks are sent at once; every row of one call must carry
+    the same columns (PostgREST sets missing columns to null on insert).
+
+    Args:
+        db: Supabase client with write access to the stats tables
+        chunk_size: Rows per upsert request
+        concurrency: Upsert requests in flight at once
+    """
+
+    def __init__(self, db: AsyncClient, chunk_size: int = 500, concurrency: int = 4):
+        self.db = db
+        self.chunk_size = chunk_size
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def upsert(self, table: str, rows: List[dict], on_conflict: str, returning: bool = False) -> List[dict]:
+        """
+        Insert or update rows on the table's unique key.
+
+        Args:
+            table: Table name
+            rows: Rows to write, all with the same keys
+            on_conflict: Comma-separated unique key columns, e.g. 'team_id,game_id'
+            returning: Return the written rows (with their ids) instead of nothing
+
+        Returns:
+            The written rows when returning is set, else []
+        """
+        async def send(chunk: Sequence[dict]) -> List[dict]:
+            async with self._semaphore:
+                with observe_upstream("supabase", table):
+                    response = await (
+                        self.db
+                        .table(table)
+                        .upsert(
+                            list(chunk),
+                            on_conflict=on_conflict,
+                            returning=ReturnMethod.representation if returning else ReturnMethod.minimal,
+                        )
+                        .execute()
+                    )
+            return response.data or []
+
+        written = await asyncio.gather(*(send(chunk) for chunk in chunked(rows, self.chunk_size)))
+        return [row for chunk in written for row in chunk] if returning else []
+
+    async def update(
+        self,
+        table: str,
+        values: Dict[str, Any],
+        column: str,
+        keys: Iterable[Any],
+        chunk_size: int = 100,
+    ) -> None:
+        """
+        Set `values` on every existing row whose `column` is one of `keys`.
+
+        Unlike an upsert, nothing is inserted, so the rows need not carry the
+        table's required columns. Keys are sent `chunk_size` at a time.
+        """
+        async def send(chunk: Sequence[Any]) -> None:
+            async with self._semaphore:
+                with observe_upstream("supabase", table):
+                    await (
+                        self.db
+                        .table(table)
+                        .update(values, returning=ReturnMethod.minimal)
+                        .in_(column, list(chunk))
+                        .execute()
+                    )
+
+        await asyncio.gather(*(send(chunk) for chunk in chunked(sorted(set(keys)), chunk_size)))
+
+    async def select_in(
+        self,
+        table: str,
+        columns: str,
+        column: str,
+        values: Iterable[Any],
+        filters: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 100,
+    ) -> List[dict]:
+        """
+        Every row whose `column` is one of `values`, read in id-ordered pages of PAGE_SIZE.
+
+        Values are sent `chunk_size` at a time to keep the URL short.
+
+        Args:
+            filters: Extra equality filters, column -> value
+        """
+        async def read(chunk: Sequence[Any]) -> List[dict]:
+            rows: List[dict] = []
+            start = 0
+            while True:
+                query = self.db.table(table).select(columns).in_(column, list(chunk))
+                for key, value in (filters or {}).items():
+                    query = query.eq(key, value)
+                async with self._semaphore:
+                    with observe_upstream("supabase", table):
+                        response = await query.order("id").range(start, start + PAGE_SIZE - 1).execute()
+                page = response.data or []
+                rows.extend(page)
+                if len(page) < PAGE_SIZE:
+                    return rows
+                start += PAGE_SIZE
+
+        pages = await asyncio.gather(*(read(chunk) for chunk in chunked(sorted(set(values)), chunk_size)))
+        return [row for page in pages for row in page]
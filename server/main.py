@@ -1,18 +1,151 @@
 # main.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from fastapi.responses import JSONResponse, Response
 from slowapi.errors import RateLimitExceeded
 
 from routes.league_router import league_router
 from routes.player_router import player_router
 from routes.market_router import market_router
 from routes.team_router import team_router
+from resources.http_session import create_polymarket_session
+from resources.metrics import RATE_LIMIT_REJECTIONS, MetricsMiddleware, metrics_response, route_label
+from resources.rate_limit import DEFAULT_RATE_LIMIT, RateLimitMiddleware
+from resources.resilience import StaleResponseMiddleware, UpstreamUnavailable
+from resources.singletons import (
+    config,
+    game_log,
+    json_response,
+    league_controller,
+    limiter,
+    market_poller,
+    price_hub,
+    player_averages_enabled,
+    player_averages_store,
+    replica_enabled,
+    replica_store,
+    replica_sync,
+    shared_cache,
+    supabase,
+    team_index,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Response:
+    """429 for any exhausted limit (per IP or per API key), counted per route"""
+    # Per-IP limits reject before routing: match the route here so the label is still the template
+    RATE_LIMIT_REJECTIONS.labels(route_label(request.scope, request.app.routes)).inc()
+    return JSONResponse({"error": f"Rate limit exceeded: {exc.detail}"}, status_code=429)
+
+
+def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable) -> Response:
+    """503 instead of a 500 when an upstream is down and there is nothing cached to serve"""
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers=headers)
+
+
+async def warm_up(wait_for_stores: bool, poll_markets: bool = True) -> None:
+    """
+    Prime what a fresh worker's first requests would otherwise wait on:
+    the team index and every league's market snapshot (which also fills
+    the markets cache), plus, if asked, the first load of the in-memory stores.
+
+    Without the poller only the markets cache is filled: a snapshot nothing
+    refreshes would be preferred over the live cache for the worker's life.
+    """
+    async def load_team_index():
+        try:
+            await team_index.refresh()
+        except Exception as e:
+            # Not fatal: the index loads itself on first use
+            logger.warning("Warm-up team index load failed: %s", e)
+
+    async def until_ready(store):
+        while not store.ready:
+            await asyncio.sleep(0.05)
+
+    async def load_markets():
+        leagues = market_poller.leagues
+        results = await asyncio.gather(
+            *(league_controller.get_markets_by_league(league) for league in leagues),
+            return_exceptions=True,
+        )
+        for league, result in zip(leagues, results):
+            if isinstance(result, Exception):
+                logger.warning("Warm-up market load failed for %s: %s", league, result)
+
+    steps = [load_team_index(), market_poller.refresh_all() if poll_markets else load_markets()]
+    if wait_for_stores:
+        if player_averages_enabled:
+            steps.append(until_ready(player_averages_store))
+        if game_log.consumers:
+            steps.append(until_ready(game_log))
+    await asyncio.gather(*steps)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Owns per-worker resources: opened before the first request, closed on shutdown.
+
+    Nothing heavier than parsing config.ini happens at import (the Supabase
+    client is built on first use). With [STARTUP] warm_up on, the worker
+    finishes startup, and so reports ready, only once warm_up() has primed
+    its caches or warm_up_timeout has passed.
+    """
+    polymarket_session = create_polymarket_session(config)
+    league_controller.session = polymarket_session
+    # Entered before anything starts: a failure partway through startup still stops what did start
+    try:
+        if replica_enabled:
+            # Reads fall back to Supabase until the first sync of every table lands; one worker per host syncs
+            replica_store.open()
+            replica_sync.start()
+        if player_averages_enabled:
+            # Loads in the background; stats-vs reads the database until the first load lands
+            player_averages_store.start()
+        if game_log.consumers:
+            # Same for recent form and splits: team_recent_form / team_location_splits rows until the game log is loaded
+            game_log.start()
+        poll_markets = config.getboolean("POLLER", "enabled", fallback=True)
+        if config.getboolean("STARTUP", "warm_up", fallback=True):
+            timeout = config.getfloat("STARTUP", "warm_up_timeout", fallback=10)
+            try:
+                await asyncio.wait_for(
+                    warm_up(config.getboolean("STARTUP", "wait_for_stores", fallback=False), poll_markets),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                # Serve anyway; whatever is still cold loads on first use
+                logger.warning("Warm-up did not finish within %ss; starting cold", timeout)
+            except Exception:
+                # Same: warming up is an optimization, never a reason not to serve
+                logger.exception("Warm-up failed; starting cold")
+        team_index.start()
+        if poll_markets:
+            market_poller.start()
+        yield
+    finally:
+        await market_poller.stop()
+        await price_hub.stop()
+        await player_averages_store.stop()
+        await game_log.stop()
+        await team_index.stop()
+        if replica_enabled:
+            await replica_sync.stop()
+            replica_store.close()
+        league_controller.session = None
+        await polymarket_session.close()
+        await supabase.aclose()
+        if shared_cache is not None:
+            shared_cache.close()
 
-# Rate limiter - 60 requests per minute per IP
-limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
 
 app = FastAPI(
     title="Sports Prediction Market API",
@@ -20,10 +153,25 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=json_response,
 )
 
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+app.add_exception_handler(UpstreamUnavailable, upstream_unavailable_handler)
+
+# Flags responses served from a last good payload during an upstream outage (Warning / X-Stale)
+app.add_middleware(StaleResponseMiddleware)
+
+# Per-IP limits, counted host-wide across workers; added before CORS so preflight requests are not counted
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=limiter,
+    limits=config.get("RATE_LIMIT", "default", fallback=DEFAULT_RATE_LIMIT),
+    exempt_paths=("/", "/metrics"),
+    on_reject=rate_limit_exceeded_handler,
+)
 
 # CORS - allow your frontend origin(s)
 app.add_middleware(
@@ -38,8 +186,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],                  # Allow GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],                  # Allow any headers
+    expose_headers=["X-Snapshot-Version", "X-Snapshot-Timestamp", "ETag", "Last-Modified", "Warning", "X-Stale", "Retry-After"],
 )
 
+# Prometheus: the middleware is added last so it is outermost and times everything, CORS included.
+# /metrics aggregates all gunicorn workers (see gunicorn.conf.py); sync, so file reads run in the threadpool.
+if config.getboolean("METRICS", "enabled", fallback=True):
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_response, methods=["GET"], include_in_schema=False)
+
 # Include API routers with prefix
 app.include_router(league_router)
 app.include_router(player_router)
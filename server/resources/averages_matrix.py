@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID, PLAYER_STATS_TO_AVERAGE
+from resources.repository import StatsRepository
+from resources.shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class LeagueStatsFrame:
+    """Columnar copy of a league's player_vs_team_stats rows"""
+    league: str
+    player_ids: np.ndarray      # (n,) int64
+    team_ids: np.ndarray        # (n,) int64, the player's team
+    opponent_ids: np.ndarray    # (n,) int64
+    games: np.ndarray           # (n,) float64
+    totals: np.ndarray          # (n, len(PLAYER_STATS_TO_AVERAGE)) float64, NaN where NULL
+    player_names: Dict[int, str]
+    loaded_at: float
+
+    def per_game(self) -> np.ndarray:
+        """Divide every stat column by games in one pass; rows with no games become NaN"""
+        games = np.where(self.games > 0, self.games, np.nan)
+        return self.totals / games[:, None]
+
+
+class AveragesMatrix:
+    """
+    League-wide player-vs-opponent averages computed with NumPy.
+
+    The whole league's player_vs_team_stats is loaded once (cached for `ttl`
+    seconds) and every per-game average is derived in a single vectorized
+    division, instead of one getattr loop per player per request.
+    Finished matrices also go to the host-wide shared cache when given one,
+    so only one worker per host loads and computes each of them.
+
+    Loads are single-flight per league: concurrent misses share one read,
+    and an expired frame keeps being served while one background read
+    replaces it.
+    """
+
+    def __init__(self, repo: StatsRepository, ttl: float = 300.0, shared: Optional[SharedCache] = None):
+        self.repo = repo
+        self.ttl = ttl
+        self.shared = shared
+        self._frames: Dict[str, LeagueStatsFrame] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def load(self, league: str) -> LeagueStatsFrame:
+        """
+        Return the league's stats frame, reading it from the database if missing.
+
+        An expired frame is returned as-is while a background read refreshes it.
+
+        Raises:
+            ValueError: If the league is unknown
+        """
+        league = league.lower()
+        league_id = LEAGUE_NAME_TO_LEAGUE_ID.get(league)
+        if league_id is None:
+            raise ValueError(f"Unknown league: {league}")
+
+        frame = self._frames.get(league)
+        task = self._inflight.get(league)
+        if frame is not None:
+            if task is None and time.monotonic() - frame.loaded_at >= self.ttl:
+                self._start_load(league, league_id)
+            return frame
+
+        if task is None:
+            task = self._start_load(league, league_id)
+        # Shield so one cancelled request does not cancel the read for everyone else
+        return await asyncio.shield(task)
+
+    def _start_load(self, league: str, league_id: int) -> asyncio.Task:
+        task = asyncio.ensure_future(self._read_frame(league, league_id))
+        # Mark the exception as retrieved for background refreshes nobody awaits
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[league] = task
+        return task
+
+    async def _read_frame(self, league: str, league_id: int) -> LeagueStatsFrame:
+        try:
+            frame = self._build_frame(league, await self.repo.get_league_player_stats(league_id))
+        except Exception:
+            if league in self._frames:
+                logger.warning("Averages matrix refresh failed for %s; keeping stale frame", league, exc_info=True)
+            raise
+        else:
+            self._frames[league] = frame
+            if self.shared is not None:
+                # Matrices computed from the previous frame are outdated now
+                self.shared.delete_prefix(f"averages_matrix:{league}:")
+            return frame
+        finally:
+            self._inflight.pop(league, None)
+
+    def invalidate(self, league: Optional[str] = None) -> None:
+        """Drop one league's frame and shared matrices, or all of them when league is None"""
+        if league is None:
+            self._frames.clear()
+            if self.shared is not None:
+                self.shared.delete_prefix("averages_matrix:")
+        else:
+            self._frames.pop(league.lower(), None)
+            if self.shared is not None:
+                self.shared.delete_prefix(f"averages_matrix:{league.lower()}:")
+
+    async def get_matrix(self, league: str, by: str = "team") -> dict:
+        """
+        Build the averages matrix for a league.
+
+        Args:
+            league: League slug (e.g., 'nba')
+            by: 'team' for team x opponent (sum of the roster's per-game averages)
+                or 'player' for player x opponent
+
+        Returns:
+            Columnar dict: 'columns' names each position of every entry in 'rows'.
+            Stat columns that are NULL for the whole league are dropped.
+
+        Raises:
+            ValueError: If the league or `by` is unknown
+        """
+        if by not in ("team", "player"):
+            raise ValueError(f"Unknown matrix grouping: {by}")
+
+        shared_key = f"averages_matrix:{league.lower()}:{by}"
+        if self.shared is not None and league.lower() in LEAGUE_NAME_TO_LEAGUE_ID:
+            shared_entry = self.shared.get(shared_key)
+            if shared_entry is not None:
+                return shared_entry.value
+
+        frame = await self.load(league)
+        per_game = frame.per_game()
+
+        if by == "player":
+            keys = np.column_stack((frame.player_ids, frame.team_ids, frame.opponent_ids))
+            key_columns = ["player_id", "team_id", "opponent_team_id", "games"]
+            values = per_game
+            counts = frame.games
+        else:
+            pairs = np.column_stack((frame.team_ids, frame.opponent_ids))
+            keys, inverse = np.unique(pairs, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            values = np.zeros((len(keys), per_game.shape[1]))
+            seen = np.zeros((len(keys), per_game.shape[1]), dtype=bool)
+            np.add.at(values, inverse, np.nan_to_num(per_game, nan=0.0))
+            np.logical_or.at(seen, inverse, ~np.isnan(per_game))
+            values[~seen] = np.nan
+            counts = np.bincount(inverse, minlength=len(keys)).astype(np.float64)
+            key_columns = ["team_id", "opponent_team_id", "players"]
+
+        present = ~np.all(np.isnan(values), axis=0) if len(values) else np.zeros(values.shape[1], dtype=bool)
+        stat_columns = [f"{stat}_avg" for stat, keep in zip(PLAYER_STATS_TO_AVERAGE, present) if keep]
+        values = np.round(values[:, present], 2)
+
+        rows = [
+            [*map(int, key), int(count), *(None if np.isnan(v) else float(v) for v in row)]
+            for key, count, row in zip(keys, counts, values)
+        ]
+
+        result = {
+            "league": frame.league,
+            "by": by,
+            "columns": key_columns + stat_columns,
+            "rows": rows,
+        }
+        if by == "player":
+            result["player_names"] = frame.player_names
+        remaining = self.ttl - (time.monotonic() - frame.loaded_at)
+        if self.shared is not None and remaining > 0:
+            # Expires with the frame it was built from; matrices of a stale frame are not shared
+            self.shared.set(shared_key, result, remaining)
+        return result
+
+    @staticmethod
+    def _build_frame(league: str, rows: List[dict]) -> LeagueStatsFrame:
+        n = len(rows)
+        player_ids = np.fromiter((r["player_id"] for r in rows), dtype=np.int64, count=n)
+        team_ids = np.fromiter((r["players"]["team_id"] for r in rows), dtype=np.int64, count=n)
+        opponent_ids = np.fromiter((r["opponent_team_id"] for r in rows), dtype=np.int64, count=n)
+        games = np.fromiter((r.get("games") or 0 for r in rows), dtype=np.float64, count=n)
+        # None -> NaN happens in the float conversion of the object array
+        totals = np.array(
+            [[r.get(stat) for stat in PLAYER_STATS_TO_AVERAGE] for r in rows],
+            dtype=np.float64,
+        ).reshape(n, len(PLAYER_STATS_TO_AVERAGE))
+        player_names = {
+            r["player_id"]: f'{r["players"].get("first_name") or ""} {r["players"].get("last_name") or ""}'.strip()
+            for r in rows
+        }
+        return LeagueStatsFrame(
+            league=league,
+            player_ids=player_ids,
+            team_ids=team_ids,
+            opponent_ids=opponent_ids,
+            games=games,
+            totals=totals,
+            player_names=player_names,
+            loaded_at=time.monotonic(),
+        )
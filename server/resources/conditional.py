@@ -0,0 +1,161 @@
+import hashlib
+from configparser import ConfigParser
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple, Type
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from resources.serialization import FastJSONResponse
+from resources.shared_cache import SharedCache
+
+# Cache-Control per route key; any of them can be overridden under [CACHE_CONTROL] in config.ini
+DEFAULT_CACHE_CONTROL = {
+    "default": "private, max-age=60, must-revalidate",
+    "team.location_splits": "private, max-age=300, must-revalidate",
+    "team.recent_form": "private, max-age=300, must-revalidate",
+    "team.matchup_location_context": "private, max-age=300, must-revalidate",
+    "team.matchup_momentum": "private, max-age=300, must-revalidate",
+    "player.stats_vs": "private, max-age=300, must-revalidate",
+}
+
+
+class CacheControlPolicy:
+    """Resolves the Cache-Control header for a route from config with built-in defaults"""
+
+    def __init__(self, config: ConfigParser):
+        self._values = dict(DEFAULT_CACHE_CONTROL)
+        if config.has_section("CACHE_CONTROL"):
+            self._values.update(config.items("CACHE_CONTROL"))
+
+    def for_route(self, route: str) -> str:
+        return self._values.get(route, self._values["default"])
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a PostgREST timestamp (ISO 8601) into an aware UTC datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+@dataclass(frozen=True)
+class Validator:
+    """
+    What a response's ETag and Last-Modified are derived from.
+
+    The newest last_updated alone misses deleted rows and renamed teams or
+    players (neither moves it), so the number of rows behind the response
+    and the names it shows are part of the ETag too.
+    """
+
+    last_modified: Optional[datetime] = None
+    rows: int = 0
+    names: Tuple[str, ...] = ()
+
+    @classmethod
+    def of(cls, stamps: Iterable[Optional[str]], names: Iterable[str], rows: Optional[int] = None) -> "Validator":
+        """
+        Build a validator from the last_updated of each row behind a response.
+
+        Args:
+            stamps: last_updated of every row (None where unset)
+            names: Team/player names the response shows
+            rows: Row count to hash; defaults to the number of stamps
+        """
+        stamps = list(stamps)
+        return cls(
+            last_modified=parse_timestamp(max(filter(None, stamps), default=None)),
+            rows=len(stamps) if rows is None else rows,
+            names=tuple(names),
+        )
+
+
+def make_etag(request: Request, validator: Validator) -> str:
+    """Weak ETag over the route path, its query parameters and the validator"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    stamp = validator.last_modified.isoformat() if validator.last_modified else "none"
+    names = "\x1f".join(validator.names)
+    digest = hashlib.sha1(
+        f"{request.url.path}?{query}|{stamp}|{validator.rows}|{names}".encode()
+    ).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+    If-None-Match takes precedence when both are sent (RFC 9110 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: ignore the W/ prefix on both sides
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+async def conditional_get(
+    request: Request,
+    cache_control: str,
+    validator: Validator,
+    build: Callable[[], Awaitable[Any]],
+    shared: Optional[SharedCache] = None,
+    response_class: Type[JSONResponse] = JSONResponse,
+) -> Response:
+    """
+    Answer a GET with 304 when the client's validators still match, otherwise build the payload.
+
+    Args:
+        request: The incoming request (its path and query feed the ETag)
+        cache_control: Cache-Control header value for this route
+        validator: Newest last_updated, row count and names behind the response
+        build: Coroutine factory producing the response body; not called on 304
+        shared: Host-wide cache for rendered bodies. The ETag already covers the
+            path, the query and the validator, so it is the key.
+        response_class: JSONResponse, or FastJSONResponse to skip jsonable_encoder
+
+    Returns:
+        A 304 Response or a `response_class` response, both carrying ETag/Last-Modified/Cache-Control
+    """
+    etag = make_etag(request, validator)
+    last_modified = validator.last_modified
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    if shared is not None:
+        shared_entry = shared.get(f"response:{etag}")
+        if shared_entry is not None:
+            return Response(content=shared_entry.value, media_type="application/json", headers=headers)
+
+    payload = await build()
+    if not issubclass(response_class, FastJSONResponse):
+        payload = jsonable_encoder(payload)
+    response = response_class(content=payload, headers=headers)
+    if shared is not None:
+        shared.set(f"response:{etag}", response.body)
+    return response
@@ -0,0 +1,27 @@
+import os
+from configparser import ConfigParser
+from functools import lru_cache
+from typing import Optional
+
+# Overrides ./config.ini, e.g. for running the app from another directory
+CONFIG_PATH_ENV = "SHADOWTRADER_CONFIG"
+
+
+def get_config(path: Optional[str] = None) -> ConfigParser:
+    """
+    The parsed config.ini, read once per process and shared by every module.
+
+    Args:
+        path: File to read; defaults to $SHADOWTRADER_CONFIG, then ./config.ini
+
+    Returns:
+        The ConfigParser for that file (the same object on every call)
+    """
+    return _load(os.path.abspath(path or os.environ.get(CONFIG_PATH_ENV, "config.ini")))
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> ConfigParser:
+    config = ConfigParser()
+    config.read(path)
+    return config
@@ -15,12 +15,33 @@ LEAGUE_NAME_TO_LEAGUE_ID = {
     "nba": 2
 }
 
+# Base URL of ESPN's site API; sport paths from LEAGUE_TO_SPORT are appended
+ESPN_SITE_API_URL = "https://site.api.espn.com/apis/site/v2/sports"
+
+# Base URL of Polymarket's Gamma API (markets, events)
+POLYMARKET_GAMMA_URL = "https://gamma-api.polymarket.com"
+
 # League tag IDs (used in some ESPN API endpoints or filters)
 LEAGUE_TAG_IDS = {
     "nba": 745,
     "nfl": 450,
 }
 
+# Cumulative player_vs_team_stats columns that are divided by games to get per-game averages
+PLAYER_STATS_TO_AVERAGE = [
+    # NFL stats
+    "passing_attempts", "passing_completions", "passing_yards",
+    "passing_tds", "passing_ints", "passing_sacks",
+    "rushing_attempts", "rushing_yards", "rushing_tds",
+    "receiving_targets", "receptions", "receiving_yards", "receiving_tds",
+    # NBA stats
+    "points", "field_goal_attempts", "field_goals_made",
+    "three_pt_attempts", "three_pt_made",
+    "free_throw_attempts", "free_throws_made",
+    "rebounds_total", "rebounds_offensive", "rebounds_defensive",
+    "assists", "steals", "blocks", "turnovers",
+]
+
 # NFL Team IDs (ESPN internal IDs) - slug to ID
 NFL_TEAM_IDS = {
     "falcons": 1,
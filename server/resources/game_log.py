@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from resources.repository import StatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class GameLogConsumer(ABC):
+    """A store folded from team_game_results rows handed over by a GameLog"""
+
+    @abstractmethod
+    def rebuild(self, rows: List[dict]) -> None:
+        """Replace everything with the state of these rows (the whole table)"""
+
+    @abstractmethod
+    def apply(self, rows: List[dict]) -> None:
+        """Fold rows changed since the previous refresh"""
+
+
+class GameLog:
+    """
+    Reader of the per-game log (team_game_results) shared by the stores folded from it.
+
+    One background loop reads only rows whose last_updated reached the
+    watermark and hands them to every consumer, so the table is read once
+    per refresh however many stores fold it. Every `full_refresh_every`
+    refreshes the whole table is read and each consumer rebuilt from it.
+    Consumers subscribe before start(); each reports its own `ready` once
+    its first rebuild lands.
+    """
+
+    def __init__(
+        self,
+        repo: StatsRepository,
+        refresh_interval: float = 30.0,
+        full_refresh_every: int = 120,
+    ):
+        self.repo = repo
+        self.refresh_interval = refresh_interval
+        self.full_refresh_every = full_refresh_every
+        self.watermark: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self.consumers: List[GameLogConsumer] = []
+        self._refreshes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed_at is not None
+
+    def subscribe(self, consumer: GameLogConsumer) -> None:
+        self.consumers.append(consumer)
+
+    async def refresh(self, full: bool = False) -> int:
+        """
+        Hand rows changed since the watermark to every consumer (or rebuild them all).
+
+        Returns:
+            Number of rows read
+        """
+        if full or not self.ready:
+            rows = await self.repo.get_team_games_updated_since(None)
+            for consumer in self.consumers:
+                consumer.rebuild(rows)
+            self.watermark = None
+        else:
+            rows = await self.repo.get_team_games_updated_since(self.watermark)
+            for consumer in self.consumers:
+                consumer.apply(rows)
+        self._advance_watermark(rows)
+        self.refreshed_at = time.time()
+        return len(rows)
+
+    def _advance_watermark(self, rows: List[dict]) -> None:
+        for row in rows:
+            stamp = row.get("last_updated")
+            if stamp is not None and (self.watermark is None or stamp > self.watermark):
+                self.watermark = stamp
+
+    def start(self) -> None:
+        """Load and then refresh periodically in the background (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresh task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            full = self.full_refresh_every > 0 and self._refreshes % self.full_refresh_every == 0
+            try:
+                await self.refresh(full=full)
+                self._refreshes += 1
+            except Exception as e:
+                logger.warning("Game log refresh failed; keeping previous state: %s", e)
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,62 @@
+import aiohttp
+from configparser import ConfigParser
+
+
+def create_polymarket_session(config: ConfigParser) -> aiohttp.ClientSession:
+    """
+    Build the long-lived aiohttp session used for every Gamma API call.
+
+    One session is created per worker in the app lifespan so connections to
+    gamma-api.polymarket.com are kept alive and reused instead of paying a DNS
+    lookup, TCP connect and TLS handshake on every request.
+
+    Args:
+        config: Parsed config.ini. Everything under [POLYMARKET] is optional.
+
+    Returns:
+        An open aiohttp.ClientSession. The caller owns it and must close it.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=config.getint("POLYMARKET", "connection_limit", fallback=100),
+        limit_per_host=config.getint("POLYMARKET", "connection_limit_per_host", fallback=20),
+        keepalive_timeout=config.getfloat("POLYMARKET", "keepalive_timeout", fallback=60),
+        ttl_dns_cache=config.getint("POLYMARKET", "dns_cache_ttl", fallback=300),
+        use_dns_cache=True,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config.getfloat("POLYMARKET", "request_timeout", fallback=15),
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+    )
+
+
+def create_espn_session(config: ConfigParser) -> aiohttp.ClientSession:
+    """
+    Build the pooled aiohttp session the ESPN ingestion shares across every request.
+
+    The connection limits sit above [INGESTION] concurrency so the pipeline's
+    own semaphore, not the pool, decides how many requests are in flight.
+
+    Args:
+        config: Parsed config.ini. Everything under [INGESTION] is optional.
+
+    Returns:
+        An open aiohttp.ClientSession. The caller owns it and must close it.
+    """
+    concurrency = config.getint("INGESTION", "concurrency", fallback=16)
+    connector = aiohttp.TCPConnector(
+        limit=config.getint("INGESTION", "connection_limit", fallback=concurrency * 2),
+        limit_per_host=config.getint("INGESTION", "connection_limit_per_host", fallback=concurrency),
+        keepalive_timeout=config.getfloat("INGESTION", "keepalive_timeout", fallback=60),
+        ttl_dns_cache=config.getint("INGESTION", "dns_cache_ttl", fallback=300),
+        use_dns_cache=True,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config.getfloat("INGESTION", "request_timeout", fallback=20),
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+    )
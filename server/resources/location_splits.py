@@ -0,0 +1,108 @@
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from resources.game_log import GameLogConsumer
+from resources.team_games import TEAM_GAME_STATS, TeamTotals
+
+# team_game_results columns the sums are taken from; kept per folded game so a correction can be taken back out
+FOLDED_FIELDS = ("season", "is_home", "result", "points_scored", "points_allowed", *TEAM_GAME_STATS)
+
+SplitKey = Tuple[int, str, str]   # (team_id, season, location)
+GameKey = Tuple[int, str]         # (team_id, game_id)
+
+
+def _location(is_home: Any) -> str:
+    return "home" if is_home else "away"
+
+
+class LocationSplitsAggregator(GameLogConsumer):
+    """
+    Home/away splits kept current from the per-game log, one game at a time.
+
+    Holds a TeamTotals of running sums per (team, season, location). Folding
+    a team_game_results row is O(1): its totals are added to one key, and
+    when the game was folded before (a stat correction, or the same row read
+    again) the previous version is subtracted first. The team_location_splits
+    fields (record, per-game averages, shooting percentages, ratings) are
+    derived from the sums when asked for, so a split reflects a game as soon
+    as its row is written rather than after a season is recomputed.
+
+    Rows come from a GameLog it subscribes to. Until the first rebuild
+    lands `ready` is False and callers read team_location_splits as before.
+    """
+
+    def __init__(self):
+        self.refreshed_at: Optional[float] = None
+        self._totals: Dict[SplitKey, TeamTotals] = {}
+        self._stamps: Dict[SplitKey, str] = {}
+        self._games: Dict[GameKey, dict] = {}
+        self._latest_season: Dict[int, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed_at is not None
+
+    def fold(self, row: Mapping[str, Any]) -> None:
+        """Add one team_game_results row to its split, replacing an earlier version of the same game"""
+        team_id = row["team_id"]
+        game = {field: row.get(field) for field in FOLDED_FIELDS}
+        previous = self._games.get((team_id, row["game_id"]))
+        if previous == game:
+            return
+        if previous is not None:
+            self._totals[(team_id, previous["season"], _location(previous["is_home"]))].remove(previous)
+        self._games[(team_id, row["game_id"])] = game
+
+        key = (team_id, game["season"], _location(game["is_home"]))
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = TeamTotals()
+        totals.add(game)
+        stamp = str(row.get("last_updated") or "")
+        if stamp > self._stamps.get(key, ""):
+            self._stamps[key] = stamp
+        if game["season"] > self._latest_season.get(team_id, ""):
+            self._latest_season[team_id] = game["season"]
+
+    def get(self, team_id: int, season: Optional[str] = None) -> List[dict]:
+        """
+        team_location_splits rows of a team's season, derived from the running sums.
+
+        Args:
+            team_id: Internal team id
+            season: Season string; None takes the team's latest season
+
+        Returns:
+            Home and/or away rows (without id), or [] when the team has no games that season
+        """
+        season = season or self._latest_season.get(team_id)
+        rows = []
+        for location in ("home", "away"):
+            key = (team_id, season, location)
+            totals = self._totals.get(key)
+            if totals is None or totals.games <= 0:
+                continue
+            rows.append({
+                "team_id": team_id,
+                "season": season,
+                "location": location,
+                **totals.location_split_fields(),
+                "last_updated": self._stamps.get(key) or None,
+            })
+        return rows
+
+    def apply(self, rows: List[dict]) -> None:
+        """Fold rows changed since the previous refresh"""
+        for row in rows:
+            self.fold(row)
+        self.refreshed_at = time.time()
+
+    def rebuild(self, rows: List[dict]) -> None:
+        """Rebuild every split from the whole game log"""
+        rebuilt = LocationSplitsAggregator()
+        for row in rows:
+            rebuilt.fold(row)
+        # Swap at once; readers never see half-summed splits
+        self._totals, self._stamps = rebuilt._totals, rebuilt._stamps
+        self._games, self._latest_season = rebuilt._games, rebuilt._latest_season
+        self.refreshed_at = time.time()
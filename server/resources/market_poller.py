@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from resources.constants import LEAGUE_TAG_IDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Immutable view of one league's active moneyline markets"""
+    league: str
+    version: int            # Bumped only when the market list actually changes
+    fetched_at: datetime    # When the upstream data was last confirmed (UTC)
+    markets: Tuple[dict, ...]
+
+
+class MarketPoller:
+    """
+    Background task that keeps an in-memory snapshot of active moneyline markets
+    for every league, so listing requests never wait on the Gamma API.
+    """
+
+    def __init__(
+        self,
+        league_controller,
+        interval: float = 15.0,
+        leagues: Iterable[str] = LEAGUE_TAG_IDS.keys(),
+    ):
+        self.league_controller = league_controller
+        self.interval = interval
+        self.leagues = tuple(leagues)
+        self._snapshots: Dict[str, MarketSnapshot] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get_snapshot(self, league: str) -> Optional[MarketSnapshot]:
+        """Return the latest snapshot for a league, or None before the first successful poll"""
+        return self._snapshots.get(league.lower())
+
+    async def refresh_league(self, league: str) -> MarketSnapshot:
+        """
+        Fetch one league from the Gamma API and publish a new snapshot.
+
+        Args:
+            league: League slug (e.g., "nba")
+
+        Returns:
+            The snapshot now being served for the league
+        """
+        tag_id = LEAGUE_TAG_IDS[league]
+        markets_cache = self.league_controller.markets_cache
+        # Every worker runs a poller; whichever polls first in an interval fetches for the whole host
+        shared = markets_cache.peek_shared(tag_id, max_age=self.interval)
+        if shared is not None:
+            markets = tuple(shared)
+        else:
+            markets = tuple(await self.league_controller.fetch_markets_by_tag(tag_id))
+            # Keep the request-path cache warm for callers that bypass the snapshot
+            markets_cache.set(tag_id, list(markets))
+
+        previous = self._snapshots.get(league)
+        if previous is None:
+            version = 1
+        elif previous.markets != markets:
+            version = previous.version + 1
+        else:
+            version = previous.version
+
+        snapshot = MarketSnapshot(
+            league=league,
+            version=version,
+            fetched_at=datetime.now(timezone.utc),
+            markets=markets,
+        )
+        # Single reference swap; readers always see a complete snapshot
+        self._snapshots[league] = snapshot
+        return snapshot
+
+    async def refresh_all(self) -> None:
+        """Refresh every league concurrently; a failing league keeps its previous snapshot"""
+        results = await asyncio.gather(
+            *(self.refresh_league(league) for league in self.leagues),
+            return_exceptions=True,
+        )
+        for league, result in zip(self.leagues, results):
+            if isinstance(result, Exception):
+                logger.warning("Market poll failed for %s: %s", league, result)
+
+    def start(self) -> None:
+        """Start polling in the background (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the polling task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(self.interval)
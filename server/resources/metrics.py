@@ -0,0 +1,182 @@
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.routing import BaseRoute, Match
+
+# Set by gunicorn.conf.py before workers fork; every worker then writes its samples there
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of API requests by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to Supabase (per table) and Polymarket (per endpoint)",
+    ["service", "target"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Calls to Supabase and Polymarket by outcome",
+    ["service", "target", "outcome"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter",
+    ["route"],
+)
+HEDGED_REQUESTS = Counter(
+    "upstream_hedged_requests_total",
+    "Second attempts sent because the first outlasted the target's p95",
+    ["service", "target"],
+)
+CIRCUIT_OPEN = Gauge(
+    "upstream_circuit_open",
+    "1 while an upstream's circuit breaker is open or half-open",
+    ["service"],
+    multiprocess_mode="livemax",
+)
+STALE_RESPONSES = Counter(
+    "upstream_stale_responses_total",
+    "Requests answered with a last good payload because the upstream was unavailable",
+    ["service"],
+)
+PRICE_STREAM_SUBSCRIBERS = Gauge(
+    "price_stream_subscribers",
+    "Clients connected to the market price stream",
+    multiprocess_mode="livesum",
+)
+PRICE_STREAM_MARKETS = Gauge(
+    "price_stream_markets",
+    "Markets with a price poll loop running for stream subscribers",
+    multiprocess_mode="livesum",
+)
+PRICE_STREAM_EVICTIONS = Counter(
+    "price_stream_evictions_total",
+    "Stream clients disconnected for falling too far behind",
+)
+
+# Label for requests that matched no route, so unknown paths cannot blow up label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_label(scope: dict, routes: Optional[Iterable[BaseRoute]] = None) -> str:
+    """
+    Route template (e.g. /api/v1/market/{market_id}) the router matched for this request.
+
+    Before routing has happened, pass `routes` to match them against the scope instead.
+    """
+    route = scope.get("route")
+    if route is None and routes is not None:
+        route = next((r for r in routes if r.matches(scope)[0] == Match.FULL), None)
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, status and in-flight requests.
+
+    Routes are labelled by template after the router has matched them, so
+    /api/v1/market/1 and /api/v1/market/2 share one series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            REQUEST_LATENCY.labels(method, route_label(scope), str(status)).observe(time.perf_counter() - start)
+
+
+class observe_upstream:
+    """
+    Time one upstream call and count its outcome.
+
+    Used as `with observe_upstream("supabase", "teams"): ...`. Labelled
+    children are looked up once per target and reused, keeping the cost per
+    call to a few microseconds.
+
+    Args:
+        service: 'supabase', 'polymarket' or 'espn'
+        target: Supabase table or Gamma endpoint template (e.g. '/markets/{id}')
+    """
+
+    _children: Dict[Tuple[str, str], tuple] = {}
+
+    __slots__ = ("_latency", "_ok", "_error", "_start")
+
+    def __init__(self, service: str, target: str):
+        children = self._children.get((service, target))
+        if children is None:
+            children = (
+                UPSTREAM_LATENCY.labels(service, target),
+                UPSTREAM_REQUESTS.labels(service, target, "ok"),
+                UPSTREAM_REQUESTS.labels(service, target, "error"),
+            )
+            self._children[(service, target)] = children
+        self._latency, self._ok, self._error = children
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._latency.observe(time.perf_counter() - self._start)
+        (self._ok if exc_type is None else self._error).inc()
+        return False
+
+
+def metrics_response() -> Response:
+    """
+    Render every metric in the Prometheus text format.
+
+    Under gunicorn the samples of all workers (live and dead) are merged from
+    the multiprocess directory; a single uvicorn process reports its own.
+    """
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
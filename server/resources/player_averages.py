@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from resources.constants import PLAYER_STATS_TO_AVERAGE
+from resources.repository import StatsRepository
+
+logger = logging.getLogger(__name__)
+
+Matchup = Tuple[int, int]  # (team_id, opponent_team_id)
+# One stored row: the averages' keys (shared by every row with the same columns) and their values
+Packed = Tuple[Tuple[str, ...], Tuple[Any, ...]]
+
+
+def compute_player_averages(fields: Mapping[str, Any], player_info: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Per-game averages of one player_vs_team_stats row.
+
+    Args:
+        fields: The row's columns (a row dict, or a PlayerVsTeamStats' __dict__)
+        player_info: first_name, last_name and photo_url of the player
+    """
+    games = fields.get("games") or 0
+
+    first_name = player_info.get("first_name", "")
+    last_name = player_info.get("last_name", "")
+    photo_url = player_info.get("photo_url", "")
+
+    if games == 0:
+        return {
+            "player_id": fields["player_id"],
+            "opponent_team_id": fields["opponent_team_id"],
+            "games": 0,
+            "first_name": first_name,
+            "last_name": last_name,
+            "photo_url": photo_url,
+        }
+
+    averages = {
+        "player_id": fields["player_id"],
+        "opponent_team_id": fields["opponent_team_id"],
+        "games": games,
+        "starts": fields.get("starts"),
+        "wins": fields.get("wins"),
+        "losses": fields.get("losses"),
+        "ties": fields.get("ties"),
+        "last_game_date": fields.get("last_game_date"),
+        "first_name": first_name,
+        "last_name": last_name,
+        "photo_url": photo_url,
+    }
+
+    for stat in PLAYER_STATS_TO_AVERAGE:
+        value = fields.get(stat)
+        if value is not None:
+            averages[f"{stat}_avg"] = round(value / games, 2)
+
+    return averages
+
+
+class PlayerAveragesStore:
+    """
+    Materialized per-game averages of every player_vs_team_stats row, by matchup.
+
+    The first refresh reads the whole table; later ones only read rows whose
+    last_updated reached the watermark and recompute those, so a refresh
+    costs as much as the rows that changed. Every `full_refresh_every`
+    refreshes the store is rebuilt from scratch to pick up deleted rows and
+    players who changed teams (neither bumps last_updated).
+
+    Rows are kept packed (one shared key tuple per column layout plus a
+    value tuple, repeated values stored once), which holds a full NFL + NBA
+    table in a fraction of the memory of one dict per row; dicts are built
+    per read.
+
+    Until the first refresh lands `ready` is False and callers read the
+    database as before.
+    """
+
+    def __init__(self, repo: StatsRepository, refresh_interval: float = 60.0, full_refresh_every: int = 60):
+        self.repo = repo
+        self.refresh_interval = refresh_interval
+        self.full_refresh_every = full_refresh_every
+        self.watermark: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self._players: Dict[Matchup, Dict[int, Packed]] = {}     # row id -> averages
+        self._ordered: Dict[Matchup, Tuple[Packed, ...]] = {}    # averages by row id, as served
+        self._last_updated: Dict[Matchup, str] = {}
+        self._row_matchup: Dict[int, Matchup] = {}
+        self._interned: Dict[Any, Any] = {}   # reset by every full rebuild
+        self._refreshes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed_at is not None
+
+    def get_players(self, team_id: int, opponent_id: int) -> List[dict]:
+        """Averages of a team's players against an opponent, in row order (empty when none)"""
+        return [dict(zip(keys, values)) for keys, values in self._ordered.get((team_id, opponent_id), ())]
+
+    def get_last_updated(self, team_id: int, opponent_id: int) -> Optional[str]:
+        """Newest last_updated behind get_players(), as stored in the database"""
+        return self._last_updated.get((team_id, opponent_id))
+
+    async def refresh(self, full: bool = False) -> int:
+        """
+        Apply rows changed since the watermark (or rebuild everything).
+
+        Returns:
+            Number of rows recomputed
+        """
+        if full or not self.ready:
+            rows = await self.repo.get_player_stats_updated_since(None)
+            self._rebuild(rows)
+        else:
+            rows = await self.repo.get_player_stats_updated_since(self.watermark)
+            self._apply(rows)
+        self.refreshed_at = time.time()
+        return len(rows)
+
+    def _rebuild(self, rows: List[dict]) -> None:
+        self._interned = {}
+        players: Dict[Matchup, Dict[int, Packed]] = {}
+        last_updated: Dict[Matchup, str] = {}
+        row_matchup: Dict[int, Matchup] = {}
+        watermark = None
+        for row in rows:
+            matchup = self._matchup(row)
+            players.setdefault(matchup, {})[row["id"]] = self._averages(row)
+            row_matchup[row["id"]] = matchup
+            stamp = row.get("last_updated")
+            if stamp is not None:
+                if stamp > last_updated.get(matchup, ""):
+                    last_updated[matchup] = stamp
+                watermark = stamp if watermark is None or stamp > watermark else watermark
+
+        ordered = {matchup: tuple(by_id[i] for i in sorted(by_id)) for matchup, by_id in players.items()}
+        # Swap every structure at once; readers never see a half-built store
+        self._players, self._ordered, self._last_updated, self._row_matchup = players, ordered, last_updated, row_matchup
+        self.watermark = watermark
+
+    def _apply(self, rows: List[dict]) -> None:
+        touched = set()
+        for row in rows:
+            matchup = self._matchup(row)
+            previous = self._row_matchup.get(row["id"])
+            if previous is not None and previous != matchup:
+                self._players.get(previous, {}).pop(row["id"], None)
+                touched.add(previous)
+            self._players.setdefault(matchup, {})[row["id"]] = self._averages(row)
+            self._row_matchup[row["id"]] = matchup
+            touched.add(matchup)
+            stamp = row.get("last_updated")
+            if stamp is not None:
+                if stamp > self._last_updated.get(matchup, ""):
+                    self._last_updated[matchup] = stamp
+                if self.watermark is None or stamp > self.watermark:
+                    self.watermark = stamp
+
+        for matchup in touched:
+            by_id = self._players.get(matchup, {})
+            self._ordered[matchup] = tuple(by_id[i] for i in sorted(by_id))
+
+    @staticmethod
+    def _matchup(row: dict) -> Matchup:
+        return row["players"]["team_id"], row["opponent_team_id"]
+
+    def _averages(self, row: dict) -> Packed:
+        averages = compute_player_averages(row, row["players"])
+        intern = self._interned.setdefault
+        keys = tuple(averages)
+        # Keys and values both repeat heavily across rows (names, dates, rounded averages).
+        # Values are interned per type so 1, 1.0 and True stay distinct.
+        return (
+            intern(keys, keys),
+            tuple(intern((type(value), value), value) for value in averages.values()),
+        )
+
+    def start(self) -> None:
+        """Load and then refresh periodically in the background (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresh task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            full = self.full_refresh_every > 0 and self._refreshes % self.full_refresh_every == 0
+            try:
+                await self.refresh(full=full)
+                self._refreshes += 1
+            except Exception as e:
+                logger.warning("Player averages refresh failed; keeping previous averages: %s", e)
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+from resources.metrics import PRICE_STREAM_EVICTIONS, PRICE_STREAM_MARKETS, PRICE_STREAM_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+Event = Tuple[str, dict]   # (SSE event name, data)
+
+
+def outcome_prices(market: dict) -> Dict[str, str]:
+    """
+    Outcome -> price of a Gamma market.
+
+    Gamma returns `outcomes` and `outcomePrices` as JSON-encoded strings
+    (e.g. '["Lakers", "Celtics"]'); plain lists are accepted too.
+    """
+    def decode(value) -> list:
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return []
+        return value if isinstance(value, list) else []
+
+    return dict(zip(map(str, decode(market.get("outcomes"))), map(str, decode(market.get("outcomePrices")))))
+
+
+def sse_event(name: str, data: dict) -> bytes:
+    """One Server-Sent Events message"""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class PriceSubscriber:
+    """
+    One stream client: the markets it follows and a bounded queue of events.
+
+    The hub never waits on a subscriber. When the queue is full the client
+    is evicted: its queue is replaced by a single 'evicted' event and the
+    stream ends after sending it.
+    """
+
+    def __init__(self, market_ids: Iterable[int], queue_size: int):
+        self.market_ids = frozenset(market_ids)
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+    def offer(self, event: Event) -> bool:
+        """Queue an event without blocking; False when the client has fallen too far behind"""
+        if self.evicted:
+            return True
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+
+class MarketFeed:
+    """The poll loop of one market and the subscribers it fans out to"""
+
+    def __init__(self, market_id: int):
+        self.market_id = market_id
+        self.subscribers: Set[PriceSubscriber] = set()
+        self.prices: Optional[Dict[str, str]] = None
+        self.updated_at: Optional[str] = None
+        self.failing = False
+        self.task: Optional[asyncio.Task] = None
+
+
+class PriceHub:
+    """
+    Fans Polymarket price changes out to stream clients.
+
+    Each market that at least one client follows has exactly one poll loop,
+    however many clients follow it, so upstream calls grow with the number
+    of markets watched, not with viewers. Polls go through the market cache:
+    a market another worker on the host fetched within the interval is read
+    from the shared tier, and every fetch also warms /market/{id}.
+
+    A poll publishes only the outcomes whose price changed. A new subscriber
+    first gets a 'snapshot' of every price already known.
+    """
+
+    def __init__(
+        self,
+        league_controller,
+        interval: float = 2.0,
+        queue_size: int = 64,
+        heartbeat: float = 15.0,
+    ):
+        self.league_controller = league_controller
+        self.interval = interval
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._feeds: Dict[int, MarketFeed] = {}
+        self._subscribers: Set[PriceSubscriber] = set()
+
+    def subscribe(self, market_ids: Iterable[int]) -> PriceSubscriber:
+        """Follow markets, starting a poll loop for any market nobody followed yet"""
+        subscriber = PriceSubscriber(market_ids, self.queue_size)
+        for market_id in subscriber.market_ids:
+            feed = self._feeds.get(market_id)
+            if feed is None:
+                feed = self._feeds[market_id] = MarketFeed(market_id)
+                feed.task = asyncio.create_task(self._poll(feed))
+                PRICE_STREAM_MARKETS.inc()
+            feed.subscribers.add(subscriber)
+            if feed.prices is not None:
+                subscriber.offer(("snapshot", self._data(feed, feed.prices)))
+        self._subscribers.add(subscriber)
+        PRICE_STREAM_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber: PriceSubscriber) -> None:
+        """Stop following; a market's poll loop ends with its last subscriber (idempotent)"""
+        if subscriber not in self._subscribers:
+            return
+        self._subscribers.discard(subscriber)
+        PRICE_STREAM_SUBSCRIBERS.dec()
+        for market_id in subscriber.market_ids:
+            feed = self._feeds.get(market_id)
+            if feed is None:
+                continue
+            feed.subscribers.discard(subscriber)
+            if not feed.subscribers:
+                del self._feeds[market_id]
+                feed.task.cancel()
+                PRICE_STREAM_MARKETS.dec()
+
+    async def stream(self, market_ids: Iterable[int]) -> AsyncIterator[bytes]:
+        """
+        Subscribe and encode the events as SSE until the client disconnects or is evicted.
+
+        Subscribing happens on the first iteration, so a response that is
+        never sent holds no subscription. A comment line goes out after
+        `heartbeat` seconds without events so proxies keep the connection
+        open and dead clients are noticed.
+        """
+        subscriber = self.subscribe(market_ids)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    name, data = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield sse_event(name, data)
+                if name == "evicted":
+                    return
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def stop(self) -> None:
+        """Cancel every poll loop (subscribers' streams end with the server)"""
+        feeds = list(self._feeds.values())
+        self._feeds.clear()
+        for feed in feeds:
+            feed.task.cancel()
+        await asyncio.gather(*(feed.task for feed in feeds), return_exceptions=True)
+        PRICE_STREAM_MARKETS.dec(len(feeds))
+
+    async def _poll(self, feed: MarketFeed) -> None:
+        market_cache = self.league_controller.market_cache
+        while True:
+            try:
+                market = market_cache.peek_shared(feed.market_id, max_age=self.interval)
+                if market is None:
+                    market = await self.league_controller.fetch_market_by_id(feed.market_id)
+                    market_cache.set(feed.market_id, market)
+                self._update(feed, outcome_prices(market))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Once per outage, not once per poll
+                if not feed.failing:
+                    logger.warning("Price poll failed for market %s: %s", feed.market_id, e)
+                    self._publish(feed, ("error", {"id": feed.market_id, "error": str(e)}))
+                feed.failing = True
+            await asyncio.sleep(self.interval)
+
+    def _update(self, feed: MarketFeed, prices: Dict[str, str]) -> None:
+        feed.failing = False
+        if feed.prices is None:
+            changed, name = prices, "snapshot"
+        else:
+            changed = {outcome: price for outcome, price in prices.items() if feed.prices.get(outcome) != price}
+            name = "price"
+        feed.prices = prices
+        if changed:
+            feed.updated_at = datetime.now(timezone.utc).isoformat()
+            self._publish(feed, (name, self._data(feed, changed)))
+
+    @staticmethod
+    def _data(feed: MarketFeed, prices: Dict[str, str]) -> dict:
+        return {"id": feed.market_id, "prices": prices, "updated_at": feed.updated_at}
+
+    def _publish(self, feed: MarketFeed, event: Event) -> None:
+        for subscriber in list(feed.subscribers):
+            if not subscriber.offer(event):
+                self._evict(subscriber)
+
+    def _evict(self, subscriber: PriceSubscriber) -> None:
+        self.unsubscribe(subscriber)
+        subscriber.evicted = True
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(("evicted", {"reason": "client is not keeping up; reconnect to resume"}))
+        PRICE_STREAM_EVICTIONS.inc()
@@ -0,0 +1,321 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from configparser import ConfigParser
+from typing import Callable, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from limits import parse_many
+from limits.storage import Storage
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from slowapi.wrappers import Limit
+
+# One slot: 64-bit key hash, window expiry (unix time), hit count
+SLOT = struct.Struct("<Qdq")
+DEFAULT_SLOTS = 65536
+DEFAULT_STRIPES = 256
+DEFAULT_RATE_LIMIT = "60/minute"
+
+
+def default_storage_path() -> str:
+    """/dev/shm when present (RAM-backed on Linux), the temp dir otherwise"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "shadowtrader-ratelimit")
+
+
+def _key_hash(key: str) -> int:
+    # Python's hash() is salted per process, so workers would disagree on slots; 0 marks an empty slot
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+
+class SharedMemoryStorage(Storage):
+    """
+    Fixed-window rate limit counters shared by every worker process on a host.
+
+    Counters live in an mmap'd file (under /dev/shm by default) laid out as
+    an open-addressing hash table of fixed-size slots. The table is split
+    into stripes; a key only ever lives in its own stripe, and each stripe
+    is guarded by an fcntl byte-range lock (across processes) plus a
+    threading lock (within one), so workers only contend when they touch
+    the same stripe. Expired slots are reused, and when a stripe is full
+    the slot whose window ends first is recycled.
+
+    Registered with `limits` as the ``shm`` scheme:
+    ``shm:///dev/shm/shadowtrader-ratelimit?slots=65536&stripes=256``.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        parsed = urlparse(uri or "shm://")
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        self.path = parsed.path or default_storage_path()
+        self.slots = int(options.get("slots", query.get("slots", DEFAULT_SLOTS)))
+        self.stripes = int(options.get("stripes", query.get("stripes", DEFAULT_STRIPES)))
+        if self.slots % self.stripes:
+            raise ValueError("slots must be a multiple of stripes")
+        self.stripe_slots = self.slots // self.stripes
+        size = self.slots * SLOT.size
+
+        # O_CREAT without truncation: the first worker sizes the file, the rest map the same pages
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def _locate(self, key: str) -> Tuple[int, int]:
+        key_hash = _key_hash(key)
+        return key_hash, key_hash % self.stripes
+
+    def _lock(self, stripe: int) -> "_StripeLock":
+        length = self.stripe_slots * SLOT.size
+        return _StripeLock(self._fd, self._thread_locks[stripe], stripe * length, length)
+
+    def _probe(self, key_hash: int, stripe: int):
+        """Byte offsets of the stripe's slots in probe order, starting at the key's home slot"""
+        base = stripe * self.stripe_slots
+        home = (key_hash // self.stripes) % self.stripe_slots
+        for i in range(self.stripe_slots):
+            yield (base + (home + i) % self.stripe_slots) * SLOT.size
+
+    def _find(self, key_hash: int, stripe: int) -> Optional[int]:
+        """
+        Byte offset of the key's slot, if present (caller holds the stripe lock).
+
+        Slot hashes only go back to 0 on reset(), so a key is always found
+        before the first never-used slot of its probe sequence.
+        """
+        for offset in self._probe(key_hash, stripe):
+            slot_hash = struct.unpack_from("<Q", self._map, offset)[0]
+            if slot_hash == key_hash:
+                return offset
+            if slot_hash == 0:
+                return None
+        return None
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        key_hash, stripe = self._locate(key)
+        now = time.time()
+        with self._lock(stripe):
+            # First expired slot on the way, else the live slot whose window ends first
+            reusable, reusable_expiry = None, None
+            for offset in self._probe(key_hash, stripe):
+                slot_hash, slot_expiry, count = SLOT.unpack_from(self._map, offset)
+                if slot_hash == key_hash:
+                    if slot_expiry <= now:
+                        count = 0
+                        slot_expiry = now + expiry
+                    SLOT.pack_into(self._map, offset, key_hash, slot_expiry, count + amount)
+                    return count + amount
+                if slot_hash == 0:
+                    if reusable is None or reusable_expiry > now:
+                        reusable = offset
+                    break
+                if reusable is None or (reusable_expiry > now and slot_expiry < reusable_expiry):
+                    reusable, reusable_expiry = offset, slot_expiry
+            SLOT.pack_into(self._map, reusable, key_hash, now + expiry, amount)
+            return amount
+
+    def get(self, key: str) -> int:
+        key_hash, stripe = self._locate(key)
+        with self._lock(stripe):
+            offset = self._find(key_hash, stripe)
+            if offset is None:
+                return 0
+            _, slot_expiry, count = SLOT.unpack_from(self._map, offset)
+        return count if slot_expiry > time.time() else 0
+
+    def get_expiry(self, key: str) -> float:
+        key_hash, stripe = self._locate(key)
+        with self._lock(stripe):
+            offset = self._find(key_hash, stripe)
+            if offset is None:
+                return time.time()
+            _, slot_expiry, _ = SLOT.unpack_from(self._map, offset)
+        return max(slot_expiry, time.time())
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def reset(self) -> Optional[int]:
+        cleared = 0
+        for stripe in range(self.stripes):
+            with self._lock(stripe):
+                offset = stripe * self.stripe_slots * SLOT.size
+                for _ in range(self.stripe_slots):
+                    if struct.unpack_from("<Q", self._map, offset)[0]:
+                        SLOT.pack_into(self._map, offset, 0, 0.0, 0)
+                        cleared += 1
+                    offset += SLOT.size
+        return cleared
+
+    def clear(self, key: str) -> None:
+        key_hash, stripe = self._locate(key)
+        with self._lock(stripe):
+            offset = self._find(key_hash, stripe)
+            if offset is not None:
+                # Keep the hash: zeroing it would cut the probe sequence of keys stored after this one
+                SLOT.pack_into(self._map, offset, key_hash, 0.0, 0)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class _StripeLock:
+    """Thread lock plus an exclusive fcntl lock on the stripe's byte range"""
+
+    __slots__ = ("fd", "thread_lock", "start", "length")
+
+    def __init__(self, fd: int, thread_lock: threading.Lock, start: int, length: int):
+        self.fd = fd
+        self.thread_lock = thread_lock
+        self.start = start
+        self.length = length
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.length, self.start)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.length, self.start)
+        finally:
+            self.thread_lock.release()
+
+
+def build_limiter(config: ConfigParser) -> Limiter:
+    """
+    slowapi limiter backed by host-wide shared memory.
+
+    It holds the storage and strategy that RateLimitMiddleware and
+    ApiKeyRateLimit hit, and still serves @limiter.limit decorators.
+    Everything under [RATE_LIMIT] is optional: enabled and storage_uri
+    (defaults to the shared-memory storage; memory:// restores
+    per-process counters).
+    """
+    return Limiter(
+        key_func=get_remote_address,
+        storage_uri=config.get("RATE_LIMIT", "storage_uri", fallback=f"shm://{default_storage_path()}"),
+        enabled=config.getboolean("RATE_LIMIT", "enabled", fallback=True),
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying per-IP limits across every request path.
+
+    Counters are keyed on the client address alone, so one budget covers
+    all of a client's requests: spreading them over distinct paths
+    (/market/1, /market/2, ...) neither escapes the limit nor fills the
+    storage with one-off keys. The limit strings are parsed once and no
+    Request object is built unless a request is rejected, so the cost per
+    request is the storage hit itself.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: Limiter,
+        limits: str = DEFAULT_RATE_LIMIT,
+        exempt_paths: Iterable[str] = (),
+        on_reject: Optional[Callable[[Request, RateLimitExceeded], Response]] = None,
+    ):
+        """
+        Args:
+            app: The wrapped ASGI app
+            limiter: Limiter whose storage holds the counters
+            limits: slowapi limit string, e.g. "60/minute;1000/hour"
+            exempt_paths: Exact paths never limited (health checks, /metrics)
+            on_reject: Builds the 429 response; defaults to slowapi's JSON body
+        """
+        self.app = app
+        self.limiter = limiter
+        self.limits = [
+            Limit(item, get_remote_address, None, False, None, None, None, 1, False)
+            for item in parse_many(limits)
+        ]
+        self.exempt_paths = frozenset(exempt_paths)
+        self.on_reject = on_reject or _default_rejection
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        address = client[0] if client else "127.0.0.1"
+        strategy = self.limiter.limiter
+        for limit in self.limits:
+            if not strategy.hit(limit.limit, "ip", address):
+                response = self.on_reject(Request(scope, receive), RateLimitExceeded(limit))
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def _default_rejection(request: Request, exc: RateLimitExceeded) -> Response:
+    return JSONResponse({"error": f"Rate limit exceeded: {exc.detail}"}, status_code=429)
+
+
+class ApiKeyRateLimit:
+    """
+    Limits per API key, on top of the per-IP limits of RateLimitMiddleware.
+
+    Hits go to the limiter's own storage, so they are shared across workers too.
+    Rejections raise slowapi's RateLimitExceeded and get the same 429 handling.
+    """
+
+    def __init__(self, limiter: Limiter, limits: str = ""):
+        """
+        Args:
+            limiter: The app's limiter, whose storage the per-key counters share
+            limits: slowapi limit string, e.g. "600/minute;10000/hour"; empty disables per-key limits
+        """
+        self.limiter = limiter
+        self.limits = [
+            Limit(item, self._key, "api_key", False, None, None, None, 1, False)
+            for item in (parse_many(limits) if limits else [])
+        ]
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        return request.headers.get("x-api-key", "")
+
+    def hit(self, api_key: str) -> None:
+        """
+        Count one request against every per-key limit.
+
+        Raises:
+            RateLimitExceeded: If any per-key limit is exhausted
+        """
+        if not self.limits or not self.limiter.enabled:
+            return
+        # Hash so the raw key is never kept in limiter storage
+        key = hashlib.sha256(api_key.encode()).hexdigest()[:32]
+        for limit in self.limits:
+            if not self.limiter.limiter.hit(limit.limit, "api_key", key):
+                raise RateLimitExceeded(limit)
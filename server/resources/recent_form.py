@@ -0,0 +1,137 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+from resources.game_log import GameLogConsumer
+from resources.team_games import TEAM_GAME_STATS, recent_form_fields
+
+# team_game_results columns kept per game, in slot order
+GAME_FIELDS = (
+    "game_date", "game_id", "opponent_team_id", "is_home", "result",
+    "points_scored", "points_allowed", *TEAM_GAME_STATS, "last_updated",
+)
+_DATE, _GAME_ID = 0, 1
+
+TeamSeason = Tuple[int, str]   # (team_id, season)
+Game = Tuple[Any, ...]
+
+
+def _pack(row: Mapping[str, Any]) -> Game:
+    game = tuple(row.get(field) for field in GAME_FIELDS)
+    # Dates compare as ISO strings whether they came from JSON or the replica
+    return (str(game[_DATE]),) + game[1:]
+
+
+def _sort_key(game: Game) -> Tuple[str, str]:
+    return game[_DATE], str(game[_GAME_ID])
+
+
+class RecentFormEngine(GameLogConsumer):
+    """
+    Recent form for any window size, computed on demand from a per-game log.
+
+    Keeps a ring buffer of each team's last `capacity` games per season
+    (team_game_results rows, packed into tuples). Appending a game is O(1):
+    it goes on the newest end and the oldest falls off. Any games_back up to
+    the capacity is answered by folding the newest games_back entries into
+    the team_recent_form fields, so no window size needs a stored row.
+
+    Rows come from a GameLog it subscribes to. Until the first rebuild
+    lands `ready` is False and callers read team_recent_form as before.
+    """
+
+    def __init__(self, capacity: int = 20):
+        self.capacity = capacity
+        self.refreshed_at: Optional[float] = None
+        self._buffers: Dict[TeamSeason, Deque[Game]] = {}
+        self._latest_season: Dict[int, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed_at is not None
+
+    def latest_season(self, team_id: int) -> Optional[str]:
+        return self._latest_season.get(team_id)
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """
+        Fold one team_game_results row into its team's buffer.
+
+        A game newer than everything buffered is appended in O(1). An
+        update of a buffered game replaces it; a late, older game is put in
+        date order (bounded by the capacity), or dropped when it is older
+        than a full buffer's oldest game.
+        """
+        key = (row["team_id"], row["season"])
+        game = _pack(row)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = deque(maxlen=self.capacity)
+        if row["season"] > self._latest_season.get(row["team_id"], ""):
+            self._latest_season[row["team_id"]] = row["season"]
+
+        if not buffer or _sort_key(game) > _sort_key(buffer[-1]):
+            buffer.append(game)
+            return
+        for i, buffered in enumerate(buffer):
+            if buffered[_GAME_ID] == game[_GAME_ID]:
+                buffer[i] = game
+                return
+        if len(buffer) == self.capacity and _sort_key(game) < _sort_key(buffer[0]):
+            return
+        games = sorted([*buffer, game], key=_sort_key)
+        buffer.clear()
+        buffer.extend(games)
+
+    def games(self, team_id: int, season: Optional[str] = None, games_back: int = 10) -> List[dict]:
+        """A team's last games_back games of a season (default: its latest), newest first"""
+        season = season or self._latest_season.get(team_id)
+        buffer = self._buffers.get((team_id, season), ())
+        window = min(games_back, len(buffer))
+        return [dict(zip(GAME_FIELDS, buffer[-1 - i])) for i in range(window)]
+
+    def get(self, team_id: int, season: Optional[str] = None, games_back: int = 10) -> Optional[dict]:
+        """
+        team_recent_form row of a team's last games_back games, computed from the buffer.
+
+        Args:
+            team_id: Internal team id
+            season: Season string; None takes the team's latest season
+            games_back: Window size, capped at the capacity
+
+        Returns:
+            The row (without id), or None when the team has no games that season
+        """
+        season = season or self._latest_season.get(team_id)
+        games = self.games(team_id, season, games_back)
+        if not games:
+            return None
+        return {
+            "team_id": team_id,
+            "season": season,
+            "games_back": games_back,
+            **recent_form_fields(games),
+            "last_updated": max(str(game["last_updated"] or "") for game in games) or None,
+        }
+
+    def apply(self, rows: List[dict]) -> None:
+        """Append rows changed since the previous refresh, oldest game first"""
+        for row in sorted(rows, key=lambda r: (str(r["game_date"]), str(r["game_id"]))):
+            self.append(row)
+        self.refreshed_at = time.time()
+
+    def rebuild(self, rows: List[dict]) -> None:
+        """Rebuild every buffer from the whole game log"""
+        by_team_season: Dict[TeamSeason, List[Game]] = {}
+        latest_season: Dict[int, str] = {}
+        for row in rows:
+            by_team_season.setdefault((row["team_id"], row["season"]), []).append(_pack(row))
+            if row["season"] > latest_season.get(row["team_id"], ""):
+                latest_season[row["team_id"]] = row["season"]
+        buffers = {
+            key: deque(sorted(games, key=_sort_key)[-self.capacity:], maxlen=self.capacity)
+            for key, games in by_team_season.items()
+        }
+        # Swap at once; readers never see a half-built engine
+        self._buffers, self._latest_season = buffers, latest_season
+        self.refreshed_at = time.time()
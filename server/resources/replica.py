@@ -0,0 +1,444 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, List, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from resources.metrics import observe_upstream
+from resources.repository import PAGE_SIZE, StatsRepository
+from schemas import Players, PlayerVsTeamStats, TeamLocationSplits, TeamRecentForm, Teams
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReplicatedTable:
+    name: str
+    model: Type[BaseModel]
+    # Column used to pull only rows changed since the last sync
+    watermark_column: str
+    # Tables without a last_updated column only see inserts incrementally, so they are also fully resynced
+    needs_full_resync: bool = False
+
+
+REPLICATED_TABLES = (
+    ReplicatedTable("teams", Teams, "created_at", needs_full_resync=True),
+    ReplicatedTable("players", Players, "created_at", needs_full_resync=True),
+    ReplicatedTable("player_vs_team_stats", PlayerVsTeamStats, "last_updated"),
+    ReplicatedTable("team_location_splits", TeamLocationSplits, "last_updated"),
+    ReplicatedTable("team_recent_form", TeamRecentForm, "last_updated"),
+)
+
+TEAM_ROW_TABLES = {"team_location_splits", "team_recent_form"}
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_players_team ON players (team_id)",
+    "CREATE INDEX IF NOT EXISTS idx_pvts_opponent_player ON player_vs_team_stats (opponent_team_id, player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_splits_team_season ON team_location_splits (team_id, season)",
+    "CREATE INDEX IF NOT EXISTS idx_form_team_games_season ON team_recent_form (team_id, games_back, season)",
+)
+
+
+def _sqlite_type(annotation) -> str:
+    """Map a schema field annotation to a SQLite column type"""
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if annotation in (int, bool):
+        return "INTEGER"
+    if annotation is float:
+        return "REAL"
+    return "TEXT"
+
+
+def _create_table_sql(table: ReplicatedTable) -> str:
+    """
+    DDL for a replicated table, derived from its Pydantic schema.
+
+    Every schema field becomes a column for filtering and sorting; `_row`
+    keeps the full PostgREST row as JSON so reads return exactly what
+    Supabase would have.
+    """
+    columns = [
+        f"{name} {_sqlite_type(field.annotation)}{' PRIMARY KEY' if name == 'id' else ''}"
+        for name, field in table.model.model_fields.items()
+    ]
+    return f"CREATE TABLE IF NOT EXISTS {table.name} ({', '.join(columns)}, _row TEXT NOT NULL)"
+
+
+class ReplicaStore:
+    """
+    SQLite file holding a local copy of the stats tables.
+
+    Reads run on the event loop thread (they are sub-millisecond index
+    lookups); writes happen on a worker thread through a separate
+    connection. WAL mode lets the two proceed concurrently.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+
+    def open(self) -> None:
+        self._writer = self._connect()
+        with self._writer:
+            for table in REPLICATED_TABLES:
+                self._writer.execute(_create_table_sql(table))
+            for statement in INDEXES:
+                self._writer.execute(statement)
+            self._writer.execute(
+                "CREATE TABLE IF NOT EXISTS _sync_state (table_name TEXT PRIMARY KEY, watermark TEXT, synced_at TEXT)"
+            )
+        self._reader = self._connect()
+
+    def close(self) -> None:
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                conn.close()
+        self._reader = self._writer = None
+
+    @property
+    def ready(self) -> bool:
+        """True once every table has completed at least one sync"""
+        if self._reader is None:
+            return False
+        synced = self._reader.execute("SELECT COUNT(*) FROM _sync_state WHERE synced_at IS NOT NULL").fetchone()[0]
+        return synced >= len(REPLICATED_TABLES)
+
+    def query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        return self._reader.execute(sql, tuple(params)).fetchall()
+
+    def get_watermark(self, table: str) -> Optional[str]:
+        row = self._reader.execute("SELECT watermark FROM _sync_state WHERE table_name = ?", (table,)).fetchone()
+        return row["watermark"] if row else None
+
+    def upsert(self, table: ReplicatedTable, rows: List[dict]) -> None:
+        """Insert or replace rows (called from a worker thread)"""
+        if not rows:
+            return
+        columns = list(table.model.model_fields)
+        sql = (
+            f"INSERT OR REPLACE INTO {table.name} ({', '.join(columns)}, _row) "
+            f"VALUES ({', '.join('?' for _ in columns)}, ?)"
+        )
+        values = [
+            [row.get(column) for column in columns] + [json.dumps(row, default=str)]
+            for row in rows
+        ]
+        with self._write_lock, self._writer:
+            self._writer.executemany(sql, values)
+
+    def delete_missing(self, table: ReplicatedTable, keep_ids: Iterable[int]) -> None:
+        """Drop rows that no longer exist upstream (after a full resync)"""
+        with self._write_lock, self._writer:
+            self._writer.execute("CREATE TEMP TABLE IF NOT EXISTS _keep (id INTEGER PRIMARY KEY)")
+            self._writer.execute("DELETE FROM _keep")
+            self._writer.executemany("INSERT OR IGNORE INTO _keep (id) VALUES (?)", ((i,) for i in keep_ids))
+            self._writer.execute(f"DELETE FROM {table.name} WHERE id NOT IN (SELECT id FROM _keep)")
+
+    def set_watermark(self, table: str, watermark: Optional[str]) -> None:
+        with self._write_lock, self._writer:
+            self._writer.execute(
+                "INSERT OR REPLACE INTO _sync_state (table_name, watermark, synced_at) "
+                "VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))",
+                (table, watermark),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+
+class ReplicaSync:
+    """
+    Keeps a ReplicaStore in step with Supabase.
+
+    Each cycle pulls only rows whose watermark column (last_updated, or
+    created_at for teams and players) is at or after the newest value
+    already replicated, and upserts them. Tables that cannot see updates
+    that way are fully resynced every `full_sync_every` cycles, which also
+    drops rows deleted upstream.
+
+    Every worker on a host runs one, but only the worker holding an
+    exclusive lock on `<path>.lock` writes; the others just read the file
+    it keeps current. The lock goes with the process that held it, so
+    another worker takes over the writing within an interval.
+    """
+
+    def __init__(
+        self,
+        db: "AsyncClient",
+        store: ReplicaStore,
+        interval: float = 300.0,
+        full_sync_every: int = 12,
+    ):
+        self.db = db
+        self.store = store
+        self.interval = interval
+        self.full_sync_every = full_sync_every
+        self._cycles = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock_fd: Optional[int] = None
+
+    @property
+    def is_writer(self) -> bool:
+        return self._lock_fd is not None
+
+    def _claim_writer(self) -> bool:
+        """Take the host's writer lock if no other worker holds it (non-blocking)"""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(f"{self.store.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        logger.info("Replica sync: this worker (pid %s) writes %s", os.getpid(), self.store.path)
+        self._lock_fd = fd
+        return True
+
+    def _release_writer(self) -> None:
+        if self._lock_fd is not None:
+            # Closing the descriptor drops the flock
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def sync_all(self) -> None:
+        """Sync every table once; a failing table keeps its previous contents"""
+        full = self._cycles % self.full_sync_every == 0
+        self._cycles += 1
+        for table in REPLICATED_TABLES:
+            try:
+                await self.sync_table(table, full=full and table.needs_full_resync)
+            except Exception as e:
+                logger.warning("Replica sync failed for %s: %s", table.name, e)
+
+    async def sync_table(self, table: ReplicatedTable, full: bool = False) -> int:
+        """
+        Pull changed rows for one table.
+
+        Args:
+            table: Table to sync
+            full: Ignore the watermark, re-read everything and drop rows missing upstream
+
+        Returns:
+            Number of rows written
+        """
+        watermark = None if full else self.store.get_watermark(table.name)
+        newest = watermark
+        seen_ids = []
+        written = 0
+        start = 0
+        while True:
+            query = self.db.table(table.name).select("*")
+            if watermark:
+                # gte, not gt: rows sharing the watermark timestamp may not all have been seen
+                query = query.gte(table.watermark_column, watermark)
+            with observe_upstream("supabase", table.name):
+                response = await (
+                    query
+                    .order(table.watermark_column)
+                    .order("id")
+                    .range(start, start + PAGE_SIZE - 1)
+                    .execute()
+                )
+            page = response.data or []
+            await asyncio.to_thread(self.store.upsert, table, page)
+            written += len(page)
+            seen_ids.extend(row["id"] for row in page)
+            for row in page:
+                value = row.get(table.watermark_column)
+                if value and (newest is None or value > newest):
+                    newest = value
+            if len(page) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+
+        if full:
+            await asyncio.to_thread(self.store.delete_missing, table, seen_ids)
+        await asyncio.to_thread(self.store.set_watermark, table.name, newest)
+        return written
+
+    def start(self) -> None:
+        """Sync now and then every `interval` seconds in the background, when this worker is the writer (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._release_writer()
+
+    async def _run(self) -> None:
+        while True:
+            # Workers that are not the writer check again each interval, in case the writer went away
+            if self._claim_writer():
+                await self.sync_all()
+            await asyncio.sleep(self.interval)
+
+
+class ReplicaRepository(StatsRepository):
+    """
+    Serves reads from the local replica, falling back to `remote` until the
+    first sync of every table has completed.
+    """
+
+    def __init__(self, store: ReplicaStore, remote: StatsRepository):
+        self.store = store
+        self.remote = remote
+        self._ready = False
+
+    def _use_replica(self) -> bool:
+        # Once ready the replica stays ready; avoid re-checking _sync_state on every read
+        if not self._ready:
+            self._ready = self.store.ready
+        return self._ready
+
+    async def get_teams(self) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_teams()
+        return [json.loads(r["_row"]) for r in self.store.query("SELECT _row FROM teams ORDER BY id")]
+
+    async def get_roster(self, team_id: int) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_roster(team_id)
+        rows = self.store.query(
+            "SELECT p._row AS player, t._row AS team FROM players p "
+            "JOIN teams t ON t.id = p.team_id WHERE p.team_id = ? ORDER BY p.id",
+            (team_id,),
+        )
+        return [{**json.loads(r["player"]), "teams": json.loads(r["team"])} for r in rows]
+
+    async def get_player_stats_vs(self, team_id: int, opponent_id: int) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_player_stats_vs(team_id, opponent_id)
+        rows = self.store.query(
+            "SELECT s._row, p.first_name, p.last_name, p.photo_url FROM player_vs_team_stats s "
+            "JOIN players p ON p.id = s.player_id "
+            "WHERE p.team_id = ? AND s.opponent_team_id = ? ORDER BY s.id",
+            (team_id, opponent_id),
+        )
+        return [
+            {
+                **json.loads(r["_row"]),
+                "players": {"first_name": r["first_name"], "last_name": r["last_name"], "photo_url": r["photo_url"]},
+            }
+            for r in rows
+        ]
+
+    async def get_player_stats_vs_versions(self, team_id: int, opponent_id: int) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_player_stats_vs_versions(team_id, opponent_id)
+        rows = self.store.query(
+            "SELECT s.last_updated, p.first_name, p.last_name FROM player_vs_team_stats s "
+            "JOIN players p ON p.id = s.player_id WHERE p.team_id = ? AND s.opponent_team_id = ? ORDER BY s.id",
+            (team_id, opponent_id),
+        )
+        return [
+            {"last_updated": r["last_updated"], "players": {"first_name": r["first_name"], "last_name": r["last_name"]}}
+            for r in rows
+        ]
+
+    async def get_league_player_stats(self, league_id: int) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_league_player_stats(league_id)
+        rows = self.store.query(
+            "SELECT s._row, p.team_id, p.first_name, p.last_name FROM player_vs_team_stats s "
+            "JOIN players p ON p.id = s.player_id JOIN teams t ON t.id = p.team_id "
+            "WHERE t.league_id = ? ORDER BY s.id",
+            (league_id,),
+        )
+        return [
+            {
+                **json.loads(r["_row"]),
+                "players": {"team_id": r["team_id"], "first_name": r["first_name"], "last_name": r["last_name"]},
+            }
+            for r in rows
+        ]
+
+    async def get_player_stats_updated_since(self, since: Optional[str] = None) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_player_stats_updated_since(since)
+        where, params = ("WHERE s.last_updated >= ?", (since,)) if since is not None else ("", ())
+        rows = self.store.query(
+            "SELECT s._row, p.team_id, p.first_name, p.last_name, p.photo_url FROM player_vs_team_stats s "
+            f"JOIN players p ON p.id = s.player_id {where} ORDER BY s.last_updated, s.id",
+            params,
+        )
+        return [
+            {
+                **json.loads(r["_row"]),
+                "players": {
+                    "team_id": r["team_id"],
+                    "first_name": r["first_name"],
+                    "last_name": r["last_name"],
+                    "photo_url": r["photo_url"],
+                },
+            }
+            for r in rows
+        ]
+
+    async def get_team_games_updated_since(self, since: Optional[str] = None) -> List[dict]:
+        # Not replicated: its only reader (GameLog) feeds stores that keep their own copy in memory
+        return await self.remote.get_team_games_updated_since(since)
+
+    async def get_team_rows(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None,
+    ) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_team_rows(table, team_ids, season, games_back)
+        where, params = self._team_filter(table, team_ids, season, games_back)
+        rows = self.store.query(f"SELECT _row FROM {table} WHERE {where} ORDER BY season DESC, id", params)
+        return [json.loads(r["_row"]) for r in rows]
+
+    async def get_team_row_versions(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None,
+    ) -> List[dict]:
+        if not self._use_replica():
+            return await self.remote.get_team_row_versions(table, team_ids, season, games_back)
+        where, params = self._team_filter(table, team_ids, season, games_back)
+        rows = self.store.query(f"SELECT last_updated FROM {table} WHERE {where} ORDER BY id", params)
+        return [{"last_updated": r["last_updated"]} for r in rows]
+
+    @staticmethod
+    def _team_filter(table: str, team_ids: Iterable[int], season: Optional[str], games_back: Optional[int]):
+        if table not in TEAM_ROW_TABLES:
+            raise ValueError(f"Unknown team table: {table}")
+        team_ids = list(team_ids)
+        clauses = [f"team_id IN ({', '.join('?' for _ in team_ids)})"]
+        params: list = list(team_ids)
+        if season:
+            clauses.append("season = ?")
+            params.append(season)
+        if games_back is not None:
+            clauses.append("games_back = ?")
+            params.append(games_back)
+        return " AND ".join(clauses), params
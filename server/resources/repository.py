@@ -0,0 +1,236 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from resources.constants import PLAYER_STATS_TO_AVERAGE
+from resources.metrics import observe_upstream
+
+if TYPE_CHECKING:
+    # Imported lazily (see resources.supabase_client); AsyncClient and LazySupabaseClient both work
+    from supabase import AsyncClient
+
+# PostgREST caps responses at 1000 rows by default, so large reads are paged
+PAGE_SIZE = 1000
+
+TEAM_COLUMNS = "id, team_name, abbreviation, league_id, venue_id, logo_url"
+
+LEAGUE_STATS_COLUMNS = (
+    "id, player_id, opponent_team_id, games, "
+    + ", ".join(PLAYER_STATS_TO_AVERAGE)
+    + ", last_updated"
+)
+
+
+class StatsRepository(ABC):
+    """
+    Read access to the stats tables used by the controllers.
+
+    Every method returns plain row dicts shaped like PostgREST responses
+    (embedded resources included) so controllers do not care whether rows
+    come from Supabase or from the local replica.
+    """
+
+    @abstractmethod
+    async def get_teams(self) -> List[dict]:
+        """Every team (TEAM_COLUMNS)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_roster(self, team_id: int) -> List[dict]:
+        """Players on a team, each with its team embedded under 'teams'"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_player_stats_vs(self, team_id: int, opponent_id: int) -> List[dict]:
+        """player_vs_team_stats rows for a team's players vs an opponent, with 'players' (names, photo) embedded"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_player_stats_vs_versions(self, team_id: int, opponent_id: int) -> List[dict]:
+        """last_updated of every get_player_stats_vs row, with 'players' (names) embedded"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_league_player_stats(self, league_id: int) -> List[dict]:
+        """Every player_vs_team_stats row in a league, with 'players' (team_id, names) embedded"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_player_stats_updated_since(self, since: Optional[str] = None) -> List[dict]:
+        """
+        player_vs_team_stats rows with last_updated >= since (every row when None),
+        oldest first, with 'players' (team_id, names, photo) embedded
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_team_games_updated_since(self, since: Optional[str] = None) -> List[dict]:
+        """team_game_results rows with last_updated >= since (every row when None), oldest first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_team_rows(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None,
+    ) -> List[dict]:
+        """team_location_splits / team_recent_form rows for teams, latest season first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_team_row_versions(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None,
+    ) -> List[dict]:
+        """last_updated of every get_team_rows row"""
+        raise NotImplementedError
+
+
+class SupabaseRepository(StatsRepository):
+    """Reads straight from Supabase over PostgREST"""
+
+    def __init__(self, db: "AsyncClient"):
+        self.db = db
+
+    @staticmethod
+    async def _execute(table: str, query):
+        """Run a PostgREST query, timed and counted per table"""
+        with observe_upstream("supabase", table):
+            return await query.execute()
+
+    async def get_teams(self) -> List[dict]:
+        response = await self._execute("teams", self.db.table("teams").select(TEAM_COLUMNS))
+        return response.data or []
+
+    async def get_roster(self, team_id: int) -> List[dict]:
+        response = await self._execute(
+            "players",
+            (
+                self.db
+                .table("players")
+                .select("*, teams!inner(*)")
+                .eq("team_id", team_id)
+            ),
+        )
+        return response.data or []
+
+    async def get_player_stats_vs(self, team_id: int, opponent_id: int) -> List[dict]:
+        # One query: every stats row vs opponent_id for players on team_id, with the player embedded
+        response = await self._execute(
+            "player_vs_team_stats",
+            (
+                self.db
+                .table("player_vs_team_stats")
+                .select("*, players!inner(first_name, last_name, photo_url)")
+                .eq("players.team_id", team_id)
+                .eq("opponent_team_id", opponent_id)
+            ),
+        )
+        return response.data or []
+
+    async def get_player_stats_vs_versions(self, team_id: int, opponent_id: int) -> List[dict]:
+        response = await self._execute(
+            "player_vs_team_stats",
+            (
+                self.db
+                .table("player_vs_team_stats")
+                .select("last_updated, players!inner(first_name, last_name)")
+                .eq("players.team_id", team_id)
+                .eq("opponent_team_id", opponent_id)
+                .order("id")
+            ),
+        )
+        return response.data or []
+
+    async def get_league_player_stats(self, league_id: int) -> List[dict]:
+        rows: List[dict] = []
+        start = 0
+        while True:
+            response = await self._execute(
+                "player_vs_team_stats",
+                (
+                    self.db
+                    .table("player_vs_team_stats")
+                    .select(LEAGUE_STATS_COLUMNS + ", players!inner(team_id, first_name, last_name, teams!inner(league_id))")
+                    .eq("players.teams.league_id", league_id)
+                    .order("id")
+                    .range(start, start + PAGE_SIZE - 1)
+                ),
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    async def get_player_stats_updated_since(self, since: Optional[str] = None) -> List[dict]:
+        rows: List[dict] = []
+        start = 0
+        while True:
+            query = (
+                self.db
+                .table("player_vs_team_stats")
+                .select("*, players!inner(team_id, first_name, last_name, photo_url)")
+            )
+            if since is not None:
+                query = query.gte("last_updated", since)
+            response = await self._execute(
+                "player_vs_team_stats",
+                query.order("last_updated").order("id").range(start, start + PAGE_SIZE - 1),
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    async def get_team_games_updated_since(self, since: Optional[str] = None) -> List[dict]:
+        rows: List[dict] = []
+        start = 0
+        while True:
+            query = self.db.table("team_game_results").select("*")
+            if since is not None:
+                query = query.gte("last_updated", since)
+            response = await self._execute(
+                "team_game_results",
+                query.order("last_updated").order("id").range(start, start + PAGE_SIZE - 1),
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    async def get_team_rows(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None,
+    ) -> List[dict]:
+        query = self.db.table(table).select("*").in_("team_id", list(team_ids))
+        if games_back is not None:
+            query = query.eq("games_back", games_back)
+        if season:
+            query = query.eq("season", season)
+        response = await self._execute(table, query.order("season", desc=True))
+        return response.data or []
+
+    async def get_team_row_versions(
+        self,
+        table: str,
+        team_ids: Iterable[int],
+        season: Optional[str] = None,
+        games_back: Optional[int] = None,
+    ) -> List[dict]:
+        query = self.db.table(table).select("last_updated").in_("team_id", list(team_ids))
+        if season:
+            query = query.eq("season", season)
+        if games_back is not None:
+            query = query.eq("games_back", games_back)
+        response = await self._execute(table, query.order("id"))
+        return response.data or []
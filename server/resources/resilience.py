@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import aiohttp
+from starlette.datastructures import MutableHeaders
+
+from resources.metrics import CIRCUIT_OPEN, HEDGED_REQUESTS, STALE_RESPONSES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class UpstreamStatusError(ValueError):
+    """An upstream answered with a non-200 status; 5xx and 429 count against its circuit"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class UpstreamUnavailable(Exception):
+    """
+    An upstream could not answer: it timed out, refused the connection,
+    returned 5xx/429, or its circuit is open. Routes answer 503.
+    """
+
+    def __init__(self, service: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.service = service
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised without calling the upstream while its circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Closed: calls go through; `failure_threshold` failures in a row open it.
+    Open: calls fail at once for `reset_timeout` seconds.
+    Half-open: after that, one probe call goes through at a time; its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, service: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through (0 when not open)"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def before_call(self) -> bool:
+        """
+        Admit a call or raise CircuitOpenError.
+
+        Returns:
+            True when the call is the half-open probe (see release_probe)
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        raise CircuitOpenError(
+            self.service,
+            f"{self.service} is unavailable (circuit open after {self.failures} consecutive failures)",
+            retry_after=self.retry_after() or self.reset_timeout,
+        )
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("%s circuit closed", self.service)
+            CIRCUIT_OPEN.labels(self.service).set(0)
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                logger.warning("%s circuit opened after %d consecutive failures", self.service, self.failures)
+            self.opened_at = time.monotonic()
+            CIRCUIT_OPEN.labels(self.service).set(1)
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through when this one ended without an outcome (e.g. cancelled)"""
+        self._probing = False
+
+
+class LatencyWindow:
+    """The last `size` successful call durations of one target, with a cached quantile"""
+
+    def __init__(self, size: int = 200, recompute_every: int = 20):
+        self.samples: deque = deque(maxlen=size)
+        self.recompute_every = recompute_every
+        self._added = 0
+        self._quantiles: Dict[float, float] = {}
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self._added += 1
+        if self._added % self.recompute_every == 0:
+            self._quantiles.clear()
+
+    def quantile(self, q: float) -> float:
+        value = self._quantiles.get(q)
+        if value is None:
+            ordered = sorted(self.samples)
+            value = self._quantiles[q] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return value
+
+
+class UpstreamGuard:
+    """
+    Wraps every call to one upstream service with a circuit breaker, a hard
+    time budget and hedged requests.
+
+    - Timeouts, connection errors and 5xx/429 answers count as failures and
+      surface as UpstreamUnavailable; other answers (e.g. a 404) prove the
+      upstream is up and count as successes.
+    - After `failure_threshold` consecutive failures calls fail fast with
+      CircuitOpenError until a probe succeeds.
+    - Once a target has `min_samples` successful calls, an attempt still
+      running after the target's `hedge_quantile` latency gets a second,
+      identical attempt; whichever answers first wins and the other is
+      cancelled. Hedges are budgeted to `hedge_budget` of calls, so a slow
+      upstream never sees its load doubled.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        timeout: float = 5.0,
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.05,
+        hedge_budget: float = 0.1,
+        min_samples: int = 20,
+    ):
+        self.service = service
+        self.breaker = CircuitBreaker(service, failure_threshold, reset_timeout)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget
+        self.min_samples = min_samples
+        self._windows: Dict[str, LatencyWindow] = {}
+        # Token bucket: every call earns hedge_budget of a hedge, up to a burst of 10
+        self._hedge_tokens = 0.0
+
+    async def call(self, target: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `attempt` (an idempotent upstream call) under the guard.
+
+        Args:
+            target: Endpoint template the latency window is kept for (e.g. '/markets/{id}')
+            attempt: Zero-argument coroutine factory; may be called twice when hedging
+
+        Raises:
+            CircuitOpenError: Without calling the upstream, while the circuit is open
+            UpstreamUnavailable: When the call timed out or failed at the transport or with 5xx/429
+            Whatever else `attempt` raises (e.g. UpstreamStatusError for a 404)
+        """
+        probe = self.breaker.before_call()
+        try:
+            result = await asyncio.wait_for(self._hedged(target, attempt, hedge=not probe), self.timeout)
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.release_probe()
+            raise
+        except Exception as e:
+            if not self._is_failure(e):
+                self.breaker.record_success()
+                raise
+            self.breaker.record_failure()
+            message = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            raise UpstreamUnavailable(
+                self.service,
+                f"{self.service} {target} failed: {message}",
+                retry_after=self.breaker.retry_after() or None,
+            ) from e
+        self.breaker.record_success()
+        return result
+
+    @staticmethod
+    def _is_failure(error: BaseException) -> bool:
+        if isinstance(error, UpstreamStatusError):
+            return error.status >= 500 or error.status == 429
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500 or error.status == 429
+        return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError))
+
+    def _hedge_delay(self, window: LatencyWindow) -> Optional[float]:
+        if not self.hedge or len(window.samples) < self.min_samples:
+            return None
+        self._hedge_tokens = min(10.0, self._hedge_tokens + self.hedge_budget)
+        if self._hedge_tokens < 1.0:
+            return None
+        return max(self.hedge_min_delay, window.quantile(self.hedge_quantile))
+
+    async def _hedged(self, target: str, attempt: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        window = self._windows.get(target)
+        if window is None:
+            window = self._windows[target] = LatencyWindow()
+        delay = self._hedge_delay(window) if hedge else None
+
+        started = {}
+
+        def launch() -> asyncio.Task:
+            task = asyncio.ensure_future(attempt())
+            started[task] = time.perf_counter()
+            return task
+
+        pending = {launch()}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    self._hedge_tokens -= 1.0
+                    HEDGED_REQUESTS.labels(self.service, target).inc()
+                    pending.add(launch())
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        window.add(time.perf_counter() - started[task])
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                # The losing attempt's outcome is not needed
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+# Services whose payload a request was answered with past its freshness, set per request by StaleResponseMiddleware
+_stale_sources: ContextVar[Optional[Dict[str, float]]] = ContextVar("stale_sources", default=None)
+
+
+def mark_stale(service: str, age: float) -> None:
+    """Record that the current request is being answered with a `service` payload `age` seconds old"""
+    STALE_RESPONSES.labels(service).inc()
+    sources = _stale_sources.get()
+    if sources is not None:
+        sources[service] = max(age, sources.get(service, 0.0))
+
+
+class StaleResponseMiddleware:
+    """
+    Pure ASGI middleware flagging responses built from stale fallbacks.
+
+    Controllers call mark_stale() when they serve a last good payload
+    because the upstream is unavailable; the response then carries
+    `Warning: 110 - "Response is Stale"` and `X-Stale: <service>;age=<s>`.
+    The per-request dict is shared by reference, so marks made in tasks
+    spawned by asyncio.gather still reach it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sources: Dict[str, float] = {}
+        token = _stale_sources.set(sources)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and sources:
+                headers = MutableHeaders(scope=message)
+                headers.append("Warning", '110 - "Response is Stale"')
+                headers["X-Stale"] = ", ".join(f"{service};age={round(age)}" for service, age in sources.items())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _stale_sources.reset(token)
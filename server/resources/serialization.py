@@ -0,0 +1,46 @@
+from configparser import ConfigParser
+from decimal import Decimal
+from typing import Any, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# int keys (player_names in the averages matrix) and NumPy values are serialized instead of rejected
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not handle itself"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson; date/datetime become ISO 8601 like jsonable_encoder does"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by orjson.
+
+    Takes the payload as-is: dates, datetimes, UUIDs, dataclasses and NumPy
+    values are encoded natively, so the jsonable_encoder pass that plain
+    JSONResponse needs beforehand can be skipped.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response_class(config: ConfigParser) -> Type[JSONResponse]:
+    """FastJSONResponse when [SERIALIZATION] fast_json is on, plain JSONResponse otherwise"""
+    if config.getboolean("SERIALIZATION", "fast_json", fallback=False):
+        return FastJSONResponse
+    return JSONResponse
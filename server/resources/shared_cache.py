@@ -0,0 +1,259 @@
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from configparser import ConfigParser
+from dataclasses import dataclass
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 300.0
+DEFAULT_SWEEP_EVERY = 64
+# Share of max_bytes kept when the cache is over it
+EVICT_TO = 0.9
+# Sets never wait for another worker's write lock; invalidations wait up to this long
+DELETE_BUSY_TIMEOUT_MS = 1000
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+    "stored_at REAL NOT NULL, expires_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries (expires_at)",
+)
+
+# Keeps the entries that expire last, up to max_bytes, and drops everything older
+EVICT_SQL = (
+    "DELETE FROM entries WHERE key IN ("
+    "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY expires_at DESC, key) AS kept FROM entries) "
+    "WHERE kept > ?)"
+)
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Another connection holds the lock (SQLITE_BUSY / SQLITE_LOCKED, extended codes included)"""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is None:
+        return "locked" in str(error)
+    return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def default_cache_path() -> str:
+    """/dev/shm when present (RAM-backed on Linux), the temp dir otherwise"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "shadowtrader-cache.sqlite3")
+
+
+@dataclass(frozen=True)
+class SharedEntry:
+    value: Any
+    age: float      # Seconds since the entry was stored, by whichever worker stored it
+
+
+class SharedCache:
+    """
+    Key/value cache shared by every worker process on a host.
+
+    Entries are pickled into one SQLite file (under /dev/shm by default) in
+    WAL mode, so any worker reads what another one fetched and a deploy
+    warms the cache once per host instead of once per worker. Every entry
+    has a TTL; once the stored bytes pass `max_bytes` the entries closest
+    to expiring are evicted first.
+
+    Calls run on the event loop thread like ReplicaStore reads: they are
+    index lookups on a RAM-backed file, and only deletes wait for a lock.
+    WAL readers are not blocked by a writer; a set that finds another
+    worker writing is dropped and counted as `busy`, since the next set of
+    that key will store it. Each worker keeps a
+    running count of the bytes it added, and expired entries are swept and
+    the real size read back only every `sweep_every` sets or once that
+    count passes `max_bytes`, so a set is one INSERT, not a table scan. Any
+    SQLite error is logged and treated as a miss, so the cache can never
+    fail a request.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+        sweep_every: int = DEFAULT_SWEEP_EVERY,
+    ):
+        """
+        Args:
+            path: SQLite file every worker opens
+            max_bytes: Size the pickled values are evicted back under (checked at each sweep)
+            ttl: Lifetime of entries stored without an explicit one
+            sweep_every: Sets between sweeps of expired entries and size checks
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_every = max(sweep_every, 1)
+        self._conn: Optional[sqlite3.Connection] = None
+        # Connections must not cross a fork; gunicorn workers each open their own
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        # Bytes in the file as of the last sweep plus what this worker has set since
+        self._approx_bytes = 0
+        self._sets_since_sweep = 0
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "busy": 0, "errors": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # A RAM-backed cache has nothing to lose on power failure
+            conn.execute("PRAGMA synchronous=OFF")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            os.chmod(self.path, 0o600)
+            self._conn, self._pid = conn, os.getpid()
+            # Forces a sweep on the first set, which reads the real size
+            self._approx_bytes, self._sets_since_sweep = 0, self.sweep_every
+        return self._conn
+
+    def get(self, key: str) -> Optional[SharedEntry]:
+        """Return the live entry for `key`, or None when missing, expired or unreadable"""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value, stored_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            value = pickle.loads(row[0])
+        except (sqlite3.Error, OSError, pickle.UnpicklingError):
+            self._counters["errors"] += 1
+            logger.warning("Shared cache read failed for %s", key, exc_info=True)
+            return None
+        self._counters["hits"] += 1
+        return SharedEntry(value=value, age=max(now - row[1], 0.0))
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store `value` under `key` for `ttl` seconds (the cache's default when None).
+
+        Values larger than the whole cache are skipped rather than evicting everything.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            logger.warning("Shared cache cannot store %s: value is not picklable", key, exc_info=True)
+            return
+        if ttl <= 0 or len(blob) > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, now + ttl),
+                )
+                # A replaced entry is counted twice until the next sweep; that only sweeps sooner
+                self._approx_bytes += len(blob)
+                self._sets_since_sweep += 1
+                if self._sets_since_sweep >= self.sweep_every or self._approx_bytes > self.max_bytes:
+                    try:
+                        self._sweep(conn, now)
+                    except sqlite3.OperationalError as e:
+                        # Another worker is writing; the next set sweeps instead
+                        if not _is_busy(e):
+                            raise
+        except (sqlite3.Error, OSError) as e:
+            if isinstance(e, sqlite3.OperationalError) and _is_busy(e):
+                self._counters["busy"] += 1
+                return
+            self._counters["errors"] += 1
+            logger.warning("Shared cache write failed for %s", key, exc_info=True)
+            return
+        self._counters["writes"] += 1
+
+    def _sweep(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, evict down to max_bytes and resync the running size (caller holds _lock)"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            evicted = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            total = conn.execute("SELECT total(size) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                # Down to the low-water mark, so a full cache is not swept again on the very next set
+                evicted += conn.execute(EVICT_SQL, (int(self.max_bytes * EVICT_TO),)).rowcount
+                total = conn.execute("SELECT total(size) FROM entries").fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._approx_bytes, self._sets_since_sweep = int(total), 0
+        self._counters["evictions"] += evicted
+
+    def delete(self, key: str) -> None:
+        """Drop one key for every worker"""
+        self._delete("DELETE FROM entries WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Drop every key starting with `prefix` for every worker"""
+        # GLOB instead of LIKE: no escaping of the '_' and '%' that keys may contain
+        pattern = prefix.replace("[", "[[]").replace("*", "[*]").replace("?", "[?]") + "*"
+        self._delete("DELETE FROM entries WHERE key GLOB ?", (pattern,))
+
+    def clear(self) -> None:
+        """Drop every entry for every worker"""
+        self._delete("DELETE FROM entries", ())
+
+    def _delete(self, sql: str, params: tuple) -> None:
+        # Unlike a skipped set, a skipped invalidation would serve stale data, so deletes wait for the lock
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(f"PRAGMA busy_timeout = {DELETE_BUSY_TIMEOUT_MS}")
+                try:
+                    conn.execute(sql, params)
+                finally:
+                    conn.execute("PRAGMA busy_timeout = 0")
+        except (sqlite3.Error, OSError):
+            self._counters["errors"] += 1
+            logger.warning("Shared cache delete failed", exc_info=True)
+
+    def stats(self) -> dict:
+        """This worker's counters plus the host-wide size of the cache"""
+        try:
+            with self._lock:
+                entries, size = self._connection().execute(
+                    "SELECT COUNT(*), total(size) FROM entries WHERE expires_at > ?", (time.time(),)
+                ).fetchone()
+        except (sqlite3.Error, OSError):
+            entries, size = None, None
+        return {**self._counters, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = self._pid = None
+
+
+def build_shared_cache(config: ConfigParser) -> Optional[SharedCache]:
+    """
+    Host-wide cache from [SHARED_CACHE], or None when disabled.
+
+    Every key is optional: enabled, path (defaults under /dev/shm),
+    max_bytes, ttl (for entries stored without their own TTL) and
+    sweep_every (sets between sweeps of expired entries).
+    """
+    if not config.getboolean("SHARED_CACHE", "enabled", fallback=True):
+        return None
+    return SharedCache(
+        config.get("SHARED_CACHE", "path", fallback=default_cache_path()),
+        max_bytes=config.getint("SHARED_CACHE", "max_bytes", fallback=DEFAULT_MAX_BYTES),
+        ttl=config.getfloat("SHARED_CACHE", "ttl", fallback=DEFAULT_TTL),
+        sweep_every=config.getint("SHARED_CACHE", "sweep_every", fallback=DEFAULT_SWEEP_EVERY),
+    )
@@ -1,26 +1,167 @@
 from controllers.league_controller import LeagueController
+from controllers.market_page_controller import MarketPageController
 from controllers.player_controller import PlayerController
+from controllers.slate_controller import SlateController
 from controllers.team_controller import TeamController
-from supabase import create_client, Client
-from supabase.lib.client_options import ClientOptions
-from configparser import ConfigParser
-import httpx
+from resources.averages_matrix import AveragesMatrix
+from resources.conditional import CacheControlPolicy
+from resources.game_log import GameLog
+from resources.location_splits import LocationSplitsAggregator
+from resources.constants import POLYMARKET_GAMMA_URL
+from resources.market_poller import MarketPoller
+from resources.price_hub import PriceHub
+from resources.player_averages import PlayerAveragesStore
+from resources.rate_limit import ApiKeyRateLimit, build_limiter
+from resources.recent_form import RecentFormEngine
+from resources.replica import ReplicaRepository, ReplicaStore, ReplicaSync
+from resources.resilience import UpstreamGuard
+from resources.repository import StatsRepository, SupabaseRepository
+from resources.serialization import json_response_class
+from resources.shared_cache import build_shared_cache
+from resources.team_index import TeamIndex
+from resources.ttl_cache import TTLCache
+from resources.config import get_config
+from resources.supabase_client import LazySupabaseClient, build_supabase_client
 
 
-_config = ConfigParser()
-_config.read("config.ini")
+config = get_config()
 
-# # Configure Supabase client with increased timeout
-# options = ClientOptions(
-#     postgrest_client_timeout=30,  # 30 seconds timeout for database operations
-# )
+# Built on the first query, not at import; the lifespan closes it
+supabase: LazySupabaseClient = build_supabase_client(config)
 
-supabase: Client = create_client(
-    _config.get("SERVER", "supabase_url"),
-    _config.get("SERVER", "supabase_key"),
-    # options=options
+# Controllers read through a repository: Supabase directly, or a local SQLite replica synced from it
+remote_repository = SupabaseRepository(supabase)
+replica_enabled = config.getboolean("REPLICA", "enabled", fallback=False)
+replica_store = ReplicaStore(config.get("REPLICA", "path", fallback="replica.sqlite3"))
+replica_sync = ReplicaSync(
+    supabase,
+    replica_store,
+    interval=config.getfloat("REPLICA", "sync_interval", fallback=300),
+    full_sync_every=config.getint("REPLICA", "full_sync_every", fallback=12),
+)
+repository: StatsRepository = (
+    ReplicaRepository(replica_store, remote_repository) if replica_enabled else remote_repository
+)
+
+cache_control = CacheControlPolicy(config)
+
+# Opt-in fast paths under [SERIALIZATION]: orjson responses, and stats rows trusted without validation
+json_response = json_response_class(config)
+trusted_rows = config.getboolean("SERIALIZATION", "trusted_rows", fallback=False)
+
+# Rate limit counters live in shared memory, so every gunicorn worker on the host enforces the same budget
+limiter = build_limiter(config)
+api_key_rate_limit = ApiKeyRateLimit(limiter, config.get("RATE_LIMIT", "per_api_key", fallback=""))
+
+# Second tier behind the in-process caches, shared by every gunicorn worker on the host (None when disabled)
+shared_cache = build_shared_cache(config)
+
+markets_cache = TTLCache(
+    ttl=config.getfloat("CACHE", "markets_ttl", fallback=30),
+    stale_ttl=config.getfloat("CACHE", "markets_stale_ttl", fallback=120),
+    shared=shared_cache,
+    namespace="markets",
+)
+market_cache = TTLCache(
+    ttl=config.getfloat("CACHE", "market_ttl", fallback=10),
+    stale_ttl=config.getfloat("CACHE", "market_stale_ttl", fallback=20),
+    shared=shared_cache,
+    namespace="market",
+)
+
+team_index = TeamIndex(
+    repository,
+    refresh_interval=config.getfloat("TEAM_INDEX", "refresh_interval", fallback=3600),
+)
+
+# Fail fast while Polymarket is down, hedge its slow tail; routes serve the last good payload meanwhile
+polymarket_guard = UpstreamGuard(
+    "polymarket",
+    failure_threshold=config.getint("POLYMARKET", "failure_threshold", fallback=5),
+    reset_timeout=config.getfloat("POLYMARKET", "reset_timeout", fallback=30),
+    timeout=config.getfloat("POLYMARKET", "call_timeout", fallback=5),
+    hedge=config.getboolean("POLYMARKET", "hedge", fallback=True),
+    hedge_quantile=config.getfloat("POLYMARKET", "hedge_quantile", fallback=0.95),
+    hedge_min_delay=config.getfloat("POLYMARKET", "hedge_min_delay", fallback=0.05),
+    hedge_budget=config.getfloat("POLYMARKET", "hedge_budget", fallback=0.1),
+)
+
+league_controller = LeagueController(
+    repository,
+    team_index,
+    gamma_url=config.get("POLYMARKET", "gamma_url", fallback=POLYMARKET_GAMMA_URL),
+    markets_cache=markets_cache,
+    market_cache=market_cache,
+    page_size=config.getint("POLYMARKET", "page_size", fallback=100),
+    page_concurrency=config.getint("POLYMARKET", "page_concurrency", fallback=4),
+    ids_per_query=config.getint("POLYMARKET", "ids_per_query", fallback=50),
+    guard=polymarket_guard,
+)
+market_batch_max_ids = config.getint("POLYMARKET", "max_batch_ids", fallback=100)
+averages_matrix = AveragesMatrix(
+    repository,
+    ttl=config.getfloat("CACHE", "averages_matrix_ttl", fallback=300),
+    shared=shared_cache,
+)
+
+# Materialized per-game averages behind the stats-vs route, refreshed from rows whose last_updated moved.
+# Opt-in: each worker holds the whole player_vs_team_stats table in memory.
+player_averages_enabled = config.getboolean("PLAYER_AVERAGES", "enabled", fallback=False)
+player_averages_store = PlayerAveragesStore(
+    repository,
+    refresh_interval=config.getfloat("PLAYER_AVERAGES", "refresh_interval", fallback=60),
+    full_refresh_every=config.getint("PLAYER_AVERAGES", "full_refresh_every", fallback=60),
+)
+
+player_controller = PlayerController(
+    repository,
+    team_index,
+    averages_matrix,
+    trusted_rows=trusted_rows,
+    averages_store=player_averages_store if player_averages_enabled else None,
+)
+# Recent form for any games_back from a ring buffer of each team's last games (team_game_results).
+# Opt-in: needs team_game_results, which only the ingestion pipeline fills.
+recent_form_enabled = config.getboolean("RECENT_FORM", "enabled", fallback=False)
+recent_form_engine = RecentFormEngine(capacity=config.getint("RECENT_FORM", "capacity", fallback=20))
+
+# Home/away splits from running sums per (team, season, location), folded one game at a time. Opt-in as above.
+location_splits_enabled = config.getboolean("LOCATION_SPLITS", "enabled", fallback=False)
+location_splits_aggregator = LocationSplitsAggregator()
+
+# One reader of team_game_results feeding whichever of the two is enabled
+game_log = GameLog(
+    repository,
+    refresh_interval=config.getfloat("GAME_LOG", "refresh_interval", fallback=30),
+    full_refresh_every=config.getint("GAME_LOG", "full_refresh_every", fallback=120),
+)
+if recent_form_enabled:
+    game_log.subscribe(recent_form_engine)
+if location_splits_enabled:
+    game_log.subscribe(location_splits_aggregator)
+
+team_controller = TeamController(
+    repository,
+    team_index,
+    batch_size=config.getint("BATCH", "team_batch_size", fallback=30),
+    max_concurrency=config.getint("BATCH", "max_concurrency", fallback=4),
+    recent_form=recent_form_engine if recent_form_enabled else None,
+    location_splits=location_splits_aggregator if location_splits_enabled else None,
 )
 
-league_controller = LeagueController(supabase)
-player_controller = PlayerController(supabase)
-team_controller = TeamController(supabase)
+market_poller = MarketPoller(
+    league_controller,
+    interval=config.getfloat("POLLER", "interval", fallback=15),
+)
+
+slate_controller = SlateController(league_controller, team_controller, market_poller)
+market_page_controller = MarketPageController(league_controller, player_controller, team_controller)
+
+# One poll loop per streamed market, fanned out to every /market/stream client following it
+price_hub = PriceHub(
+    league_controller,
+    interval=config.getfloat("PRICE_STREAM", "interval", fallback=2),
+    queue_size=config.getint("PRICE_STREAM", "queue_size", fallback=64),
+    heartbeat=config.getfloat("PRICE_STREAM", "heartbeat", fallback=15),
+)
+price_stream_max_markets = config.getint("PRICE_STREAM", "max_markets", fallback=50)
@@ -0,0 +1,42 @@
+import json
+from typing import AsyncIterable, AsyncIterator, FrozenSet, Iterable, Optional, Union
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a `fields=` query parameter ("id,question,outcomePrices") into a set of keys.
+
+    Returns:
+        The requested top-level keys, or None to keep every field
+    """
+    if not fields:
+        return None
+    keys = frozenset(key.strip() for key in fields.split(",") if key.strip())
+    return keys or None
+
+
+def project(item: dict, fields: Optional[FrozenSet[str]]) -> dict:
+    """Keep only `fields` of a JSON object (all of them when fields is None)"""
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
+
+
+async def ndjson_lines(
+    items: Union[Iterable[dict], AsyncIterable[dict]],
+    fields: Optional[FrozenSet[str]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Encode items as newline-delimited JSON, one object per chunk.
+
+    Each object is projected and serialized on its own as it arrives, so the
+    full response body is never held in memory.
+    """
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield json.dumps(project(item, fields), default=str).encode() + b"\n"
+    else:
+        for item in items:
+            yield json.dumps(project(item, fields), default=str).encode() + b"\n"
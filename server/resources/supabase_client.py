@@ -0,0 +1,49 @@
+from configparser import ConfigParser
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+
+class LazySupabaseClient:
+    """
+    The Supabase AsyncClient, built on first use.
+
+    Importing `supabase` (auth, storage, realtime, functions) and building
+    the client cost about a third of the app's import time, and nothing
+    needs them until the first query. Repositories and the replica sync
+    only call table(), so they take this in place of the client.
+    """
+
+    def __init__(self, url: str, key: str):
+        self.url = url
+        self.key = key
+        self._client: Optional["AsyncClient"] = None
+
+    @property
+    def client(self) -> "AsyncClient":
+        if self._client is None:
+            from supabase import AsyncClient
+
+            # Async client so controllers await PostgREST instead of tying up threadpool workers
+            self._client = AsyncClient(self.url, self.key)
+        return self._client
+
+    @property
+    def created(self) -> bool:
+        return self._client is not None
+
+    def table(self, name: str):
+        """Start a PostgREST query on `name` (AsyncClient.table)"""
+        return self.client.table(name)
+
+    async def aclose(self) -> None:
+        """Close the PostgREST connection pool, if the client was ever built"""
+        if self._client is not None:
+            await self._client.postgrest.aclose()
+            self._client = None
+
+
+def build_supabase_client(config: ConfigParser) -> LazySupabaseClient:
+    """Lazy client for [SERVER] supabase_url and supabase_key"""
+    return LazySupabaseClient(config.get("SERVER", "supabase_url"), config.get("SERVER", "supabase_key"))
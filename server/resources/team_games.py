@@ -0,0 +1,166 @@
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+# Box score totals kept per team_game_results row (zero where the sport has no such stat)
+TEAM_GAME_STATS = (
+    "field_goals_made", "field_goal_attempts",
+    "three_pt_made", "three_pt_attempts",
+    "free_throws_made", "free_throw_attempts",
+    "rebounds_total", "rebounds_offensive",
+    "assists", "steals", "blocks", "turnovers",
+)
+
+# Per-game averages in team_location_splits / team_recent_form, and the total each is taken from
+PER_GAME_FIELDS = {
+    "rebounds_per_game": "rebounds_total",
+    "assists_per_game": "assists",
+    "steals_per_game": "steals",
+    "blocks_per_game": "blocks",
+    "turnovers_per_game": "turnovers",
+}
+
+
+def _ratio(numerator: float, denominator: float, digits: int) -> float:
+    return round(numerator / denominator, digits) if denominator else 0.0
+
+
+def estimate_possessions(row: Mapping[str, Any]) -> float:
+    """Basketball possessions estimate of one team in one game: FGA - OREB + TOV + 0.44 * FTA"""
+    return (
+        (row.get("field_goal_attempts") or 0)
+        - (row.get("rebounds_offensive") or 0)
+        + (row.get("turnovers") or 0)
+        + 0.44 * (row.get("free_throw_attempts") or 0)
+    )
+
+
+class TeamTotals:
+    """
+    Running sums over a set of team_game_results rows.
+
+    add() folds one game in with constant work; the team_location_splits and
+    team_recent_form fields are derived from the sums, so a set of games
+    never has to be re-read to refresh them.
+    """
+
+    __slots__ = ("games", "wins", "losses", "ties", "points_scored", "points_allowed", "possessions", "stats")
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.points_scored = 0
+        self.points_allowed = 0
+        self.possessions = 0.0
+        self.stats = dict.fromkeys(TEAM_GAME_STATS, 0)
+
+    @classmethod
+    def of(cls, rows: Iterable[Mapping[str, Any]]) -> "TeamTotals":
+        totals = cls()
+        for row in rows:
+            totals.add(row)
+        return totals
+
+    def add(self, row: Mapping[str, Any]) -> None:
+        """Fold one team_game_results row into the sums"""
+        self.games += 1
+        result = row.get("result")
+        if result == "W":
+            self.wins += 1
+        elif result == "L":
+            self.losses += 1
+        else:
+            self.ties += 1
+        self.points_scored += row.get("points_scored") or 0
+        self.points_allowed += row.get("points_allowed") or 0
+        self.possessions += estimate_possessions(row)
+        stats = self.stats
+        for stat in TEAM_GAME_STATS:
+            stats[stat] += row.get(stat) or 0
+
+    def remove(self, row: Mapping[str, Any]) -> None:
+        """Take a previously added row back out of the sums (a corrected game is removed, then re-added)"""
+        self.games -= 1
+        result = row.get("result")
+        if result == "W":
+            self.wins -= 1
+        elif result == "L":
+            self.losses -= 1
+        else:
+            self.ties -= 1
+        self.points_scored -= row.get("points_scored") or 0
+        self.points_allowed -= row.get("points_allowed") or 0
+        self.possessions -= estimate_possessions(row)
+        stats = self.stats
+        for stat in TEAM_GAME_STATS:
+            stats[stat] -= row.get(stat) or 0
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_pct": _ratio(self.wins, self.games, 3),
+        }
+
+    def per_game(self) -> Dict[str, Any]:
+        """Scoring and per-game averages plus shooting percentages, shared by splits and recent form"""
+        stats = self.stats
+        fields = {
+            "points_per_game": _ratio(self.points_scored, self.games, 1),
+            "points_against_per_game": _ratio(self.points_allowed, self.games, 1),
+            "field_goal_pct": _ratio(stats["field_goals_made"], stats["field_goal_attempts"], 3),
+            "three_pt_pct": _ratio(stats["three_pt_made"], stats["three_pt_attempts"], 3),
+            "free_throw_pct": _ratio(stats["free_throws_made"], stats["free_throw_attempts"], 3),
+        }
+        for field, stat in PER_GAME_FIELDS.items():
+            fields[field] = _ratio(stats[stat], self.games, 1)
+        return fields
+
+    def ratings(self) -> Dict[str, Optional[float]]:
+        """Points scored/allowed per 100 possessions; None without box score possessions (e.g. NFL)"""
+        if self.possessions <= 0:
+            return {"offensive_rating": None, "defensive_rating": None, "net_rating": None}
+        offensive = round(100 * self.points_scored / self.possessions, 1)
+        defensive = round(100 * self.points_allowed / self.possessions, 1)
+        return {
+            "offensive_rating": offensive,
+            "defensive_rating": defensive,
+            "net_rating": round(offensive - defensive, 1),
+        }
+
+    def location_split_fields(self) -> Dict[str, Any]:
+        """team_location_splits fields other than the key columns and last_updated"""
+        fields = {**self.record(), **self.per_game(), **self.ratings()}
+        fields["plus_minus"] = round(fields["points_per_game"] - fields["points_against_per_game"], 1)
+        return fields
+
+
+def recent_form_fields(games: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    team_recent_form fields of a window of games.
+
+    Args:
+        games: team_game_results rows, newest first
+
+    Returns:
+        Record, streak, scoring, shooting, per-game and date range fields
+        (everything but the key columns and last_updated), or {} for no games
+    """
+    if not games:
+        return {}
+    totals = TeamTotals.of(games)
+    fields = {**totals.record(), **totals.per_game()}
+    fields["point_differential"] = round(fields["points_per_game"] - fields["points_against_per_game"], 1)
+
+    streak_type = games[0]["result"]
+    streak_count = 0
+    for game in games:
+        if game["result"] != streak_type:
+            break
+        streak_count += 1
+    fields["streak_type"] = streak_type
+    fields["streak_count"] = streak_count
+    fields["first_game_date"] = games[-1]["game_date"]
+    fields["last_game_date"] = games[0]["game_date"]
+    return fields
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID, NBA_TEAM_IDS, NFL_TEAM_IDS
+from resources.repository import StatsRepository
+
+logger = logging.getLogger(__name__)
+
+# Known team slugs per league, used as extra aliases ("lakers", "49ers", ...)
+LEAGUE_TEAM_SLUGS = {
+    "nfl": NFL_TEAM_IDS.keys(),
+    "nba": NBA_TEAM_IDS.keys(),
+}
+
+
+def normalize_team_key(value: Union[str, int]) -> str:
+    """Lowercase, turn dashes/underscores into spaces and collapse whitespace"""
+    return re.sub(r"[\s_\-]+", " ", str(value)).strip().lower()
+
+
+class TeamIndex:
+    """
+    In-memory index of the `teams` table.
+
+    Resolves a slug ("lakers"), abbreviation ("LAL"), full name
+    ("Los Angeles Lakers"), a fragment of the name, or an internal id to a
+    team record without a database round trip. Built at startup and
+    refreshed periodically from the app lifespan.
+    """
+
+    def __init__(self, repo: StatsRepository, refresh_interval: float = 3600.0):
+        self.repo = repo
+        self.refresh_interval = refresh_interval
+        self.loaded_at: Optional[float] = None
+        self._by_id: Dict[int, dict] = {}
+        self._by_alias: Dict[Tuple[int, str], List[dict]] = {}
+        self._by_league: Dict[int, List[dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, teams: List[dict]) -> None:
+        """
+        Rebuild the index from `teams` rows and swap it in atomically.
+
+        Args:
+            teams: Rows with at least id, team_name, abbreviation and league_id
+        """
+        league_slugs = {
+            LEAGUE_NAME_TO_LEAGUE_ID[league]: [normalize_team_key(slug) for slug in slugs]
+            for league, slugs in LEAGUE_TEAM_SLUGS.items()
+        }
+
+        by_id: Dict[int, dict] = {}
+        by_alias: Dict[Tuple[int, str], List[dict]] = {}
+        by_league: Dict[int, List[dict]] = {}
+
+        for team in sorted(teams, key=lambda t: t["id"]):
+            league_id = team.get("league_id")
+            by_id[team["id"]] = team
+            by_league.setdefault(league_id, []).append(team)
+
+            name = normalize_team_key(team.get("team_name") or "")
+            aliases = {name, str(team["id"])}
+            if team.get("abbreviation"):
+                aliases.add(normalize_team_key(team["abbreviation"]))
+            for slug in league_slugs.get(league_id, []):
+                if re.search(rf"\b{re.escape(slug)}$", name):
+                    aliases.add(slug)
+
+            for alias in aliases:
+                by_alias.setdefault((league_id, alias), []).append(team)
+
+        self._by_id, self._by_alias, self._by_league = by_id, by_alias, by_league
+        self.loaded_at = time.time()
+
+    async def refresh(self) -> None:
+        """Reload every team from the repository"""
+        self.load(await self.repo.get_teams())
+
+    async def ensure_loaded(self) -> None:
+        """Load the index on first use if the lifespan has not done so yet"""
+        if not self.loaded:
+            await self.refresh()
+
+    def get(self, team_id: int) -> Optional[dict]:
+        """Look up a team by internal id (call ensure_loaded() first)"""
+        return self._by_id.get(team_id)
+
+    def resolve(self, league: str, query: Union[str, int]) -> Optional[dict]:
+        """
+        Resolve a team within a league (call ensure_loaded() first).
+
+        Exact slug/abbreviation/full-name/id matches win. Otherwise the query is
+        matched as a fragment of the team name; when several teams match, the one
+        where the fragment ends the name wins, then the shortest name, then the
+        lowest id, so the same query always resolves to the same team.
+
+        Args:
+            league: League slug (e.g., 'nba')
+            query: Team slug, abbreviation, name, name fragment or internal id
+
+        Returns:
+            The team record, or None if nothing matches
+
+        Raises:
+            ValueError: If the league is unknown
+        """
+        league_id = LEAGUE_NAME_TO_LEAGUE_ID.get(league.lower())
+        if league_id is None:
+            raise ValueError(f"Unknown league: {league}")
+
+        key = normalize_team_key(query)
+
+        exact = self._by_alias.get((league_id, key))
+        if exact:
+            return exact[0]
+
+        candidates = [
+            team for team in self._by_league.get(league_id, [])
+            if key and key in normalize_team_key(team.get("team_name") or "")
+        ]
+        if not candidates:
+            return None
+
+        return min(
+            candidates,
+            key=lambda t: (
+                not normalize_team_key(t["team_name"]).endswith(key),
+                len(t["team_name"]),
+                t["id"],
+            ),
+        )
+
+    def require(self, league: str, query: Union[str, int]) -> dict:
+        """Like resolve(), but raises ValueError when no team matches"""
+        team = self.resolve(league, query)
+        if team is None:
+            raise ValueError(f"Team '{query}' not found in {league.upper()}")
+        return team
+
+    def start(self) -> None:
+        """Refresh periodically in the background (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresh task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Team index refresh failed; keeping previous index: %s", e)
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from resources.shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-process async cache with a TTL, stale-while-revalidate and single-flight fetches.
+
+    - Entries younger than `ttl` are served as-is.
+    - Entries older than `ttl` but younger than `ttl + stale_ttl` are served
+      immediately while one background refresh replaces them.
+    - Concurrent misses for the same key share one in-flight fetch instead of
+      each going upstream.
+    - get_or_fetch_many() looks many keys up at once and fetches every miss
+      in one batch call.
+    - With a `shared` cache, local misses are looked up there before going
+      upstream and fetched values are written through, so other workers on
+      the host reuse them.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_entries: int = 1024,
+        shared: Optional[SharedCache] = None,
+        namespace: str = "",
+    ):
+        """
+        Args:
+            ttl: Seconds an entry is served as fresh
+            stale_ttl: Further seconds it is served while being refreshed
+            max_entries: Local entries kept, least recently used dropped first
+            shared: Host-wide second tier, if any
+            namespace: Prefix keeping this cache's keys apart from others in `shared`
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.namespace = namespace
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "shared_hits": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+        }
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, calling `fetch` only when needed.
+
+        Args:
+            key: Cache key (e.g. a league tag id)
+            fetch: Zero-argument coroutine factory producing a fresh value
+
+        Returns:
+            The cached or freshly fetched value
+
+        Raises:
+            Whatever `fetch` raises when there is no usable cached value
+        """
+        entry = self._entry(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self._counters["hits"] += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._counters["refreshes"] += 1
+                    self._start_fetch(key, fetch)
+                return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counters["coalesced"] += 1
+        else:
+            self._counters["misses"] += 1
+            task = self._start_fetch(key, fetch)
+
+        # Shield so one cancelled waiter does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    async def get_or_fetch_many(
+        self,
+        keys: Iterable[Hashable],
+        fetch_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+    ) -> Dict[Hashable, Any]:
+        """
+        Batch form of get_or_fetch: one `fetch_many` call for every key that needs fetching.
+
+        Fresh and stale entries are served as get_or_fetch serves them, keys
+        already being fetched join that fetch, and the rest (plus stale keys
+        due a refresh) go to one `fetch_many` call. Each key of the batch
+        is registered as in flight, so concurrent get_or_fetch calls for it
+        share the batch too.
+
+        Args:
+            keys: Cache keys
+            fetch_many: Coroutine function taking the keys to fetch and
+                returning {key: value}; keys it leaves out count as not found
+
+        Returns:
+            Dict of key -> value, or the exception its fetch raised
+            (KeyError when fetch_many left it out)
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Task] = {}
+        misses: List[Hashable] = []
+        refreshes: List[Hashable] = []
+        for key in dict.fromkeys(keys):
+            entry = self._entry(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = time.monotonic() - stored_at
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    results[key] = value
+                    if age < self.ttl:
+                        self._counters["hits"] += 1
+                    else:
+                        self._counters["stale_hits"] += 1
+                        if key not in self._inflight:
+                            self._counters["refreshes"] += 1
+                            refreshes.append(key)
+                    continue
+
+            task = self._inflight.get(key)
+            if task is not None:
+                self._counters["coalesced"] += 1
+                waiting[key] = task
+            else:
+                self._counters["misses"] += 1
+                misses.append(key)
+
+        if misses or refreshes:
+            tasks = self._start_batch_fetch(misses + refreshes, fetch_many)
+            waiting.update((key, tasks[key]) for key in misses)
+        if waiting:
+            # Shield so one cancelled caller does not cancel the fetch for everyone else
+            fetched = await asyncio.gather(*(asyncio.shield(task) for task in waiting.values()), return_exceptions=True)
+            results.update(zip(waiting, fetched))
+        return results
+
+    def peek(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the stored value for `key`, or None; any age unless `max_age` is given"""
+        entry = self._entries.get(key)
+        if entry is None or (max_age is not None and time.monotonic() - entry[1] >= max_age):
+            return None
+        return entry[0]
+
+    def last_good(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        The last value fetched for `key` in this worker, however old, with its age in seconds.
+
+        For fallbacks while the upstream is unavailable; None once it was never
+        fetched or has been evicted.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[0], time.monotonic() - entry[1]
+
+    def peek_shared(self, key: Hashable, max_age: float) -> Optional[Any]:
+        """
+        Return the host-wide value for `key` if some worker stored it less than `max_age` seconds ago.
+
+        The local tier is refreshed with it, so later lookups in this worker hit locally.
+        """
+        if self.shared is None:
+            return None
+        shared_entry = self.shared.get(self._shared_key(key))
+        if shared_entry is None or shared_entry.age >= max_age:
+            return None
+        self._counters["shared_hits"] += 1
+        self._store_local(key, shared_entry.value, time.monotonic() - shared_entry.age)
+        return shared_entry.value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key` as freshly fetched, in both tiers"""
+        self._store_local(key, value, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), value, self.ttl + self.stale_ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or every key when `key` is None, in both tiers"""
+        if key is None:
+            self._entries.clear()
+            if self.shared is not None:
+                self.shared.delete_prefix(f"{self.namespace}:")
+        else:
+            self._entries.pop(key, None)
+            if self.shared is not None:
+                self.shared.delete(self._shared_key(key))
+
+    def stats(self) -> dict:
+        """Counters plus current sizing, for tuning the TTL"""
+        lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"] + self._counters["coalesced"]
+        served_from_cache = self._counters["hits"] + self._counters["stale_hits"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hit_ratio": round(served_from_cache / lookups, 4) if lookups else None,
+        }
+
+    def _entry(self, key: Hashable) -> Optional[tuple]:
+        """The local (value, stored_at) of `key`, filled from the shared tier when missing or expired"""
+        entry = self._entries.get(key)
+        if self.shared is not None and key not in self._inflight and (
+            entry is None or time.monotonic() - entry[1] >= self.ttl + self.stale_ttl
+        ):
+            # Another worker may have fetched it already
+            shared_entry = self.shared.get(self._shared_key(key))
+            if shared_entry is not None:
+                self._counters["shared_hits"] += 1
+                self._store_local(key, shared_entry.value, time.monotonic() - shared_entry.age)
+                entry = self._entries.get(key)
+        return entry
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _store_local(self, key: Hashable, value: Any, stored_at: float) -> None:
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._run_fetch(key, fetch))
+        # Mark the exception as retrieved for background refreshes nobody awaits
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    def _start_batch_fetch(
+        self,
+        keys: List[Hashable],
+        fetch_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+    ) -> Dict[Hashable, asyncio.Task]:
+        """One fetch_many call for `keys`, with a per-key in-flight task picking each value out of it"""
+        batch = asyncio.ensure_future(fetch_many(list(keys)))
+        batch.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        def pick(key: Hashable) -> Callable[[], Awaitable[Any]]:
+            async def fetch() -> Any:
+                values = await asyncio.shield(batch)
+                if key not in values:
+                    raise KeyError(key)
+                return values[key]
+            return fetch
+
+        return {key: self._start_fetch(key, pick(key)) for key in keys}
+
+    async def _run_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            # A sibling worker may have refreshed it while this one served stale
+            shared_value = self.peek_shared(key, self.ttl)
+            if shared_value is not None:
+                return shared_value
+            value = await fetch()
+        except BaseException:
+            self._counters["errors"] += 1
+            # A failed background refresh keeps serving the stale value
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl + self.stale_ttl:
+                logger.warning("Cache refresh failed for %r; keeping stale value", key, exc_info=True)
+            raise
+        else:
+            self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends
-from resources.singletons import league_controller
-from resources.singletons import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from resources.singletons import league_controller, market_poller, slate_controller
+from resources.streaming import NDJSON_MEDIA_TYPE, ndjson_lines, parse_fields, project
 from auth import verify_token
 
 league_router = APIRouter(
@@ -9,15 +11,95 @@ league_router = APIRouter(
     dependencies=[Depends(verify_token)]
 )
 
+@league_router.get(
+    "/cache/stats",
+    name="Gets hit/miss counters for the league market listings cache"
+)
+async def get_markets_cache_stats():
+    """Gets hit/miss/coalesced counters for the league market listings cache"""
+    return league_controller.markets_cache.stats()
+
+
 @league_router.get(
     "/{league}",
     name="Gets all markets associated with a league"
 )
 async def get_league_markets(
-    league: str
+    league: str,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated market fields to keep (e.g. 'id,question,outcomePrices'). Defaults to all.")
+):
+    """
+    Gets all markets associated with a league.
+
+    Served from the background poller's snapshot when one exists; the
+    X-Snapshot-Version and X-Snapshot-Timestamp headers say how fresh it is.
+    """
+    keep = parse_fields(fields)
+    snapshot = market_poller.get_snapshot(league)
+    if snapshot is None:
+        markets = await league_controller.get_markets_by_league(league)
+        return [project(market, keep) for market in markets] if keep else markets
+
+    response.headers["X-Snapshot-Version"] = str(snapshot.version)
+    response.headers["X-Snapshot-Timestamp"] = snapshot.fetched_at.isoformat()
+    return [project(market, keep) for market in snapshot.markets] if keep else snapshot.markets
+
+
+@league_router.get(
+    "/{league}/stream",
+    name="Streams all markets associated with a league as NDJSON"
+)
+async def stream_league_markets(
+    league: str,
+    fields: Optional[str] = Query(None, description="Comma-separated market fields to keep (e.g. 'id,question,outcomePrices'). Defaults to all.")
+):
+    """
+    Streams all markets associated with a league, one JSON object per line.
+
+    Markets are written as they come: from the poller's snapshot or the cache
+    when warm, otherwise page by page as the Gamma API returns them.
+    """
+    try:
+        league_controller.get_tag_id(league)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    headers = {}
+    snapshot = market_poller.get_snapshot(league)
+    if snapshot is not None:
+        markets = snapshot.markets
+        headers["X-Snapshot-Version"] = str(snapshot.version)
+        headers["X-Snapshot-Timestamp"] = snapshot.fetched_at.isoformat()
+    else:
+        markets = league_controller.iter_markets_by_league(league)
+
+    return StreamingResponse(
+        ndjson_lines(markets, parse_fields(fields)),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+@league_router.get(
+    "/{league}/slate",
+    name="Gets matchup context and momentum for every active market in a league"
+)
+async def get_league_slate(
+    league: str,
+    season: Optional[str] = Query(None, description="Season (e.g., '2024-25'). Defaults to each team's latest."),
+    games_back: int = Query(10, description="Number of recent games to consider", ge=1, le=20)
 ):
-    """Gets all markets associated with a league"""
-    return await league_controller.get_markets_by_league(league)
+    """
+    Gets the full slate for a league in one payload.
+
+    For every active moneyline market, returns the home/away teams with the
+    same location context and momentum as the /team/matchup/* routes.
+    """
+    try:
+        return await slate_controller.get_slate(league, season, games_back)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 @league_router.get(
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, Depends
-from resources.singletons import league_controller
-from resources.singletons import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from resources.price_hub import SSE_MEDIA_TYPE
+from resources.singletons import (
+    league_controller,
+    market_batch_max_ids,
+    market_page_controller,
+    price_hub,
+    price_stream_max_markets,
+)
 from auth import verify_token
 
 market_router = APIRouter(
@@ -9,6 +17,63 @@ market_router = APIRouter(
     dependencies=[Depends(verify_token)]
 )
 
+def parse_market_ids(ids: str, limit: int) -> list:
+    """Parse an `ids=` parameter ("12345,67890"), raising 422 for bad, empty or too long lists"""
+    try:
+        market_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if not market_ids:
+        raise HTTPException(status_code=422, detail="ids must name at least one market")
+    if len(market_ids) > limit:
+        raise HTTPException(status_code=422, detail=f"At most {limit} market ids per request")
+    return market_ids
+
+
+@market_router.get(
+    "",
+    name="Gets many polymarket markets by id"
+)
+async def get_markets_by_ids(
+    ids: str = Query(..., description="Comma-separated market ids (e.g. '12345,67890')"),
+):
+    """
+    Gets many markets in one request, keyed by id.
+
+    Cached markets are served from the per-market cache; the rest are
+    fetched together. Ids that could not be resolved are listed under
+    `errors` with their own status, so one bad id does not fail the batch.
+    While Polymarket is unavailable, previously fetched markets are served
+    and their ids listed under `stale`.
+    """
+    return await league_controller.get_markets_by_ids(parse_market_ids(ids, market_batch_max_ids))
+
+
+# Declared before /{market_id} so "stream" is not taken for an id
+@market_router.get(
+    "/stream",
+    name="Streams live outcome price changes of markets as Server-Sent Events"
+)
+async def stream_market_prices(
+    ids: str = Query(..., description="Comma-separated market ids (e.g. '12345,67890')"),
+):
+    """
+    Streams price changes of the given markets as Server-Sent Events.
+
+    Sends a 'snapshot' event per market with every outcome price, then a
+    'price' event with only the outcomes whose price moved. One poll loop
+    per market serves every connected client. A client that stops reading
+    gets an 'evicted' event and the stream ends; reconnect to resume.
+    """
+    market_ids = parse_market_ids(ids, price_stream_max_markets)
+    return StreamingResponse(
+        price_hub.stream(market_ids),
+        media_type=SSE_MEDIA_TYPE,
+        # Flush each event through proxies (nginx buffers otherwise)
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @market_router.get(
     "/{market_id}",
     name="Gets a polymarket market based on the id"
@@ -16,5 +81,30 @@ market_router = APIRouter(
 async def get_market_by_id(
     market_id:int,
 ):
-    """Gets a polymarket market based on the id"""
-    return await league_controller.get_market_by_id(market_id)
\ No newline at end of file
+    """
+    Gets a polymarket market based on the id.
+
+    While Polymarket is unavailable the last good market is served with
+    `Warning` and `X-Stale` headers, or a 503 with Retry-After if there is none.
+    """
+    return await league_controller.get_market_by_id(market_id)
+
+
+@market_router.get(
+    "/{market_id}/page",
+    name="Gets everything the market page needs in one document"
+)
+async def get_market_page(
+    market_id: int,
+    season: Optional[str] = Query(None, description="Season (e.g., '2024-25'). Defaults to each team's latest."),
+    games_back: int = Query(10, description="Number of recent games to consider", ge=1, le=20)
+):
+    """
+    Gets a market plus both rosters, players' stats vs the opponent, location
+    splits, matchup context, recent form and momentum, fetched concurrently.
+    Each section carries its own error so partial failures still render.
+    """
+    try:
+        return await market_page_controller.get_market_page(market_id, season, games_back)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
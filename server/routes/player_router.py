@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends
-from resources.singletons import player_controller
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from resources.conditional import conditional_get
+from resources.singletons import cache_control, json_response, shared_cache, player_controller
 from auth import verify_token
 
 
@@ -13,14 +14,47 @@ player_router = APIRouter(
     "/{league}/{team_name}/stats-vs/{opponent}",
     name="Gets all players stat averages on a team against a teams"
 )
-def get_players_stats_vs_team(
+async def get_players_stats_vs_team(
+    request: Request,
     league: str,
     team_name: str,
     opponent: str
 ):  
-    """Gets all players stat averages on a team against a teams"""
+    """
+    Gets all players stat averages on a team against a teams.
+    Supports If-None-Match / If-Modified-Since, validated against the player_vs_team_stats rows and the names they show.
+    """
     if league == "nba":
-        return player_controller.get_full_team_players_averages(league,team_name,opponent)
+        validator = await player_controller.get_stats_vs_validator(league, team_name, opponent)
+        return await conditional_get(
+            request,
+            cache_control.for_route("player.stats_vs"),
+            validator,
+            lambda: player_controller.get_full_team_players_averages(league,team_name,opponent),
+            shared=shared_cache,
+            response_class=json_response,
+        )
 
     else:
-        return "League not supported"
\ No newline at end of file
+        return "League not supported"
+
+
+@player_router.get(
+    "/{league}/averages-matrix",
+    name="Gets every team (or player) per-game average against every opponent in a league"
+)
+async def get_league_averages_matrix(
+    league: str,
+    by: str = Query("team", pattern="^(team|player)$", description="'team' for team x opponent, 'player' for player x opponent")
+):
+    """
+    Gets the full league averages matrix in one request.
+
+    Rows are columnar: 'columns' names each position of every row.
+    Team rows sum the per-game averages of the roster against that opponent.
+    """
+    try:
+        # Plain lists and numbers only, so no jsonable_encoder pass is needed
+        return json_response(content=await player_controller.get_league_averages_matrix(league, by))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
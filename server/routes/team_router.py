@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from typing import Optional
-from resources.singletons import team_controller
+from resources.conditional import conditional_get
+from resources.singletons import cache_control, json_response, shared_cache, team_controller
 from auth import verify_token
 
 team_router = APIRouter(
@@ -14,7 +15,8 @@ team_router = APIRouter(
     "/{league}/{team_name}/location-splits",
     name="Get team home/away splits"
 )
-def get_team_location_splits(
+async def get_team_location_splits(
+    request: Request,
     league: str,
     team_name: str,
     season: Optional[str] = Query(None, description="Season (e.g., '2024-25'). Defaults to latest.")
@@ -23,10 +25,20 @@ def get_team_location_splits(
     Get home/away performance splits for a team.
 
     Returns win/loss records, scoring averages, and shooting percentages
-    for both home and away games.
+    for both home and away games. Answers If-None-Match / If-Modified-Since
+    with 304 when team_location_splits has not changed.
     """
     try:
-        return team_controller.get_team_location_splits_by_name(league, team_name, season)
+        team = await team_controller.resolve_team(league, team_name)
+        validator = await team_controller.get_validator("team_location_splits", [team["id"]], season)
+        return await conditional_get(
+            request,
+            cache_control.for_route("team.location_splits"),
+            validator,
+            lambda: team_controller.get_team_location_splits(team["id"], season),
+            shared=shared_cache,
+            response_class=json_response,
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -35,7 +47,8 @@ def get_team_location_splits(
     "/matchup/location-context",
     name="Get location context for a matchup"
 )
-def get_matchup_location_context(
+async def get_matchup_location_context(
+    request: Request,
     home_team_id: int = Query(..., description="Internal team ID of home team"),
     away_team_id: int = Query(..., description="Internal team ID of away team"),
     season: Optional[str] = Query(None, description="Season (e.g., '2024-25')")
@@ -47,7 +60,17 @@ def get_matchup_location_context(
     which is the most relevant comparison for predicting the matchup outcome.
     """
     try:
-        return team_controller.get_matchup_location_context(home_team_id, away_team_id, season)
+        validator = await team_controller.get_validator(
+            "team_location_splits", [home_team_id, away_team_id], season
+        )
+        return await conditional_get(
+            request,
+            cache_control.for_route("team.matchup_location_context"),
+            validator,
+            lambda: team_controller.get_matchup_location_context(home_team_id, away_team_id, season),
+            shared=shared_cache,
+            response_class=json_response,
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -56,7 +79,8 @@ def get_matchup_location_context(
     "/{league}/{team_name}/recent-form",
     name="Get team recent form"
 )
-def get_team_recent_form(
+async def get_team_recent_form(
+    request: Request,
     league: str,
     team_name: str,
     season: Optional[str] = Query(None, description="Season (e.g., '2024-25'). Defaults to latest."),
@@ -66,10 +90,22 @@ def get_team_recent_form(
     Get recent form (last N games) for a team.
 
     Returns win/loss record, current streak, scoring averages, and shooting
-    percentages over the specified number of recent games.
+    percentages over the specified number of recent games. Answers
+    If-None-Match / If-Modified-Since with 304 when team_recent_form has not changed.
     """
     try:
-        return team_controller.get_team_recent_form_by_name(league, team_name, season, games_back)
+        team = await team_controller.resolve_team(league, team_name)
+        validator = await team_controller.get_validator(
+            "team_recent_form", [team["id"]], season, games_back
+        )
+        return await conditional_get(
+            request,
+            cache_control.for_route("team.recent_form"),
+            validator,
+            lambda: team_controller.get_team_recent_form(team["id"], season, games_back),
+            shared=shared_cache,
+            response_class=json_response,
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -78,7 +114,8 @@ def get_team_recent_form(
     "/matchup/momentum",
     name="Get momentum comparison for a matchup"
 )
-def get_matchup_momentum(
+async def get_matchup_momentum(
+    request: Request,
     team1_id: int = Query(..., description="Internal team ID of first team"),
     team2_id: int = Query(..., description="Internal team ID of second team"),
     season: Optional[str] = Query(None, description="Season (e.g., '2024-25')"),
@@ -91,6 +128,16 @@ def get_matchup_momentum(
     scoring trends, and shooting efficiency over the last N games.
     """
     try:
-        return team_controller.get_matchup_momentum(team1_id, team2_id, season, games_back)
+        validator = await team_controller.get_validator(
+            "team_recent_form", [team1_id, team2_id], season, games_back
+        )
+        return await conditional_get(
+            request,
+            cache_control.for_route("team.matchup_momentum"),
+            validator,
+            lambda: team_controller.get_matchup_momentum(team1_id, team2_id, season, games_back),
+            shared=shared_cache,
+            response_class=json_response,
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -5,6 +5,7 @@ from schemas.venues import Venues
 from schemas.leagues import Leagues
 from schemas.team_location_splits import TeamLocationSplits, TeamLocationSplitsResponse
 from schemas.team_recent_form import TeamRecentForm, TeamRecentFormResponse, RecentGame
+from schemas.team_game_results import TeamGameResults
 
 __all__ = [
     "PlayerVsTeamStats",
@@ -17,4 +18,5 @@ __all__ = [
     "TeamRecentForm",
     "TeamRecentFormResponse",
     "RecentGame",
+    "TeamGameResults",
 ]
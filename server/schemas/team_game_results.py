@@ -0,0 +1,40 @@
+from datetime import datetime, date
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class TeamGameResults(BaseModel):
+    """
+    Pydantic model representing the team_game_results table.
+    One row per team per completed game: the per-game log that location
+    splits and recent form are derived from.
+    """
+    id: int = Field(..., description="Auto-incrementing primary key")
+    team_id: int = Field(..., description="Foreign key to teams.id")
+    opponent_team_id: int = Field(..., description="Foreign key to teams.id of the opponent")
+    game_id: str = Field(..., description="ESPN event id")
+    season: str = Field(..., description="Season string e.g. '2024-25'")
+    game_date: date = Field(..., description="Date the game was played")
+    is_home: bool = Field(..., description="True if the team was the home side")
+    result: str = Field(..., description="'W', 'L' or 'T'")
+
+    # Scoring
+    points_scored: int = Field(..., description="Points scored by the team")
+    points_allowed: int = Field(..., description="Points scored by the opponent")
+
+    # Box score totals (zero where the sport has no such stat)
+    field_goals_made: int = Field(0, description="Field goals made")
+    field_goal_attempts: int = Field(0, description="Field goal attempts")
+    three_pt_made: int = Field(0, description="Three-pointers made")
+    three_pt_attempts: int = Field(0, description="Three-point attempts")
+    free_throws_made: int = Field(0, description="Free throws made")
+    free_throw_attempts: int = Field(0, description="Free throw attempts")
+    rebounds_total: int = Field(0, description="Total rebounds")
+    rebounds_offensive: int = Field(0, description="Offensive rebounds")
+    assists: int = Field(0, description="Assists")
+    steals: int = Field(0, description="Steals")
+    blocks: int = Field(0, description="Blocks")
+    turnovers: int = Field(0, description="Turnovers")
+
+    # Metadata
+    last_updated: Optional[datetime] = Field(None, description="When this record was last updated")
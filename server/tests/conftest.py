@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app's packages the way the server does, from the server directory
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+
+@pytest.fixture
+def anyio_backend():
+    """Async tests (pytest.mark.anyio) run on asyncio only"""
+    return "asyncio"
@@ -0,0 +1,32 @@
+"""Stand-ins shared by the tests"""
+from typing import Dict, List, Tuple
+
+
+class CountingQuery:
+    """PostgREST query builder stand-in recording every filter call"""
+
+    def __init__(self, client: "CountingClient", table: str):
+        self.client = client
+        self.table = table
+        self.calls: List[Tuple[str, tuple]] = []
+
+    def __getattr__(self, method: str):
+        def record(*args, **kwargs):
+            self.calls.append((method, args))
+            return self
+        return record
+
+    async def execute(self):
+        self.client.queries.append((self.table, self.calls))
+        return type("Response", (), {"data": [dict(row) for row in self.client.tables.get(self.table, [])]})()
+
+
+class CountingClient:
+    """Supabase client stand-in: canned rows per table, one entry in `queries` per execute()"""
+
+    def __init__(self, tables: Dict[str, List[dict]]):
+        self.tables = tables
+        self.queries: List[Tuple[str, list]] = []
+
+    def table(self, name: str) -> CountingQuery:
+        return CountingQuery(self, name)
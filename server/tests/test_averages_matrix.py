@@ -0,0 +1,78 @@
+"""Single-flight and stale-while-refresh loads of AveragesMatrix"""
+import asyncio
+
+import pytest
+
+from resources.averages_matrix import AveragesMatrix
+from resources.constants import PLAYER_STATS_TO_AVERAGE
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowRepository:
+    """get_league_player_stats stand-in that counts reads and can be held open"""
+
+    def __init__(self):
+        self.reads = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self.points = 10
+
+    async def get_league_player_stats(self, league_id: int):
+        self.reads += 1
+        await self.release.wait()
+        return [{
+            "player_id": 1,
+            "opponent_team_id": 2,
+            "games": 2,
+            "points": self.points,
+            "players": {"team_id": 3, "first_name": "A", "last_name": "B"},
+        }]
+
+
+async def test_concurrent_cold_loads_share_one_read():
+    repo = SlowRepository()
+    repo.release.clear()
+    matrix = AveragesMatrix(repo, ttl=60)
+
+    loads = [asyncio.create_task(matrix.load("nba")) for _ in range(10)]
+    await asyncio.sleep(0)
+    repo.release.set()
+    frames = await asyncio.gather(*loads)
+
+    assert repo.reads == 1
+    assert all(frame is frames[0] for frame in frames)
+
+
+async def test_expired_frame_is_served_while_one_refresh_runs():
+    repo = SlowRepository()
+    matrix = AveragesMatrix(repo, ttl=60)
+    stale = await matrix.load("nba")
+    matrix._frames["nba"] = type(stale)(**{**stale.__dict__, "loaded_at": stale.loaded_at - 120})
+    expired = matrix._frames["nba"]
+
+    repo.release.clear()
+    repo.points = 20
+    served = [await matrix.load("nba") for _ in range(5)]
+
+    assert all(frame is expired for frame in served)
+    await asyncio.sleep(0)
+    assert repo.reads == 2
+    repo.release.set()
+    await matrix._inflight["nba"]
+    fresh = await matrix.load("nba")
+    assert fresh is not expired and fresh.totals[0][PLAYER_STATS_TO_AVERAGE.index("points")] == 20
+
+
+async def test_failed_refresh_keeps_the_stale_frame():
+    repo = SlowRepository()
+    matrix = AveragesMatrix(repo, ttl=0)
+    frame = await matrix.load("nba")
+
+    async def fail(league_id):
+        raise RuntimeError("database down")
+
+    repo.get_league_player_stats = fail
+    assert await matrix.load("nba") is frame
+    await asyncio.sleep(0)
+    assert await matrix.load("nba") is frame
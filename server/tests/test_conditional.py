@@ -0,0 +1,79 @@
+"""ETag validators of the conditional team and player routes (resources.conditional)"""
+import pytest
+from starlette.requests import Request
+
+from controllers.team_controller import TeamController
+from resources.conditional import Validator, conditional_get, make_etag
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID
+from resources.repository import SupabaseRepository
+from resources.team_index import TeamIndex
+from stubs import CountingClient
+
+pytestmark = pytest.mark.anyio
+
+NBA = LEAGUE_NAME_TO_LEAGUE_ID["nba"]
+
+TEAMS = [
+    {"id": 1, "team_name": "Boston Celtics", "abbreviation": "BOS", "league_id": NBA},
+    {"id": 2, "team_name": "Los Angeles Lakers", "abbreviation": "LAL", "league_id": NBA},
+]
+
+SPLITS = [
+    {"team_id": 1, "season": "2025-26", "location": "home", "last_updated": "2026-01-15T00:00:00+00:00"},
+    {"team_id": 1, "season": "2025-26", "location": "away", "last_updated": "2026-01-10T00:00:00+00:00"},
+]
+
+
+def make_request(headers=None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/team/matchup/location-context",
+        "query_string": b"home_team_id=1&away_team_id=2",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def test_etag_changes_when_a_row_is_deleted():
+    stamps = [row["last_updated"] for row in SPLITS]
+    before = Validator.of(stamps, ["Boston Celtics"])
+    # Deleting the older row leaves the newest last_updated where it was
+    after = Validator.of(stamps[:1], ["Boston Celtics"])
+
+    assert before.last_modified == after.last_modified
+    assert make_etag(make_request(), before) != make_etag(make_request(), after)
+
+
+def test_etag_changes_when_a_team_is_renamed():
+    stamps = [row["last_updated"] for row in SPLITS]
+    before = Validator.of(stamps, ["Boston Celtics"])
+    after = Validator.of(stamps, ["Boston Green"])
+
+    assert make_etag(make_request(), before) != make_etag(make_request(), after)
+
+
+async def test_matching_etag_answers_304():
+    validator = Validator.of([row["last_updated"] for row in SPLITS], ["Boston Celtics"])
+    etag = make_etag(make_request(), validator)
+
+    async def build():
+        raise AssertionError("a 304 must not build the body")
+
+    response = await conditional_get(make_request({"If-None-Match": etag}), "private", validator, build)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+async def test_unknown_team_fails_before_the_validator_is_compared():
+    client = CountingClient({"teams": TEAMS, "team_location_splits": SPLITS})
+    repo = SupabaseRepository(client)
+    controller = TeamController(repo, TeamIndex(repo))
+
+    with pytest.raises(ValueError):
+        await controller.get_validator("team_location_splits", [1, 999])
+    assert [table for table, _ in client.queries] == ["teams"]
+
+    validator = await controller.get_validator("team_location_splits", [1, 2])
+    assert validator.rows == len(SPLITS)
+    assert validator.names == ("Boston Celtics", "Los Angeles Lakers")
@@ -0,0 +1,61 @@
+"""One team_game_results reader feeding recent form and home/away splits (resources.game_log)"""
+import pytest
+
+from resources.game_log import GameLog
+from resources.location_splits import LocationSplitsAggregator
+from resources.recent_form import RecentFormEngine
+from resources.repository import SupabaseRepository
+from stubs import CountingClient
+
+pytestmark = pytest.mark.anyio
+
+
+def game(game_id: str, day: int, result: str, points: int, is_home: bool = True, updated_day: int = 0) -> dict:
+    return {
+        "team_id": 1,
+        "season": "2025-26",
+        "game_id": game_id,
+        "game_date": f"2026-01-{day:02d}",
+        "opponent_team_id": 2,
+        "is_home": is_home,
+        "result": result,
+        "points_scored": points,
+        "points_allowed": 100,
+        "last_updated": f"2026-01-{updated_day or day:02d}T12:00:00+00:00",
+    }
+
+
+def build_log(rows):
+    client = CountingClient({"team_game_results": rows})
+    log = GameLog(SupabaseRepository(client))
+    engine, splits = RecentFormEngine(capacity=5), LocationSplitsAggregator()
+    log.subscribe(engine)
+    log.subscribe(splits)
+    return client, log, engine, splits
+
+
+async def test_one_read_feeds_every_consumer():
+    client, log, engine, splits = build_log([game("g1", 1, "W", 110), game("g2", 2, "L", 90, is_home=False)])
+
+    await log.refresh()
+
+    assert len(client.queries) == 1
+    assert engine.ready and splits.ready
+    assert engine.get(1, games_back=5)["games"] == 2
+    assert {row["location"] for row in splits.get(1)} == {"home", "away"}
+
+
+async def test_incremental_refresh_applies_changed_rows_to_every_consumer():
+    client, log, engine, splits = build_log([game("g1", 1, "W", 110)])
+    await log.refresh()
+
+    # A new game plus a stat correction of g1, both past the watermark
+    client.tables["team_game_results"] = [game("g1", 1, "W", 120, updated_day=3), game("g2", 2, "W", 105)]
+    await log.refresh()
+
+    assert log.watermark == "2026-01-03T12:00:00+00:00"
+    form = engine.get(1, games_back=5)
+    assert form["games"] == 2 and form["wins"] == 2
+    home = splits.get(1)[0]
+    assert home["games"] == 2
+    assert home["points_per_game"] == 112.5
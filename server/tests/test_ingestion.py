@@ -0,0 +1,191 @@
+"""ESPN ingestion (ingestion.pipeline) against the benchmarks.fakes ESPN and PostgREST stand-ins"""
+import json
+import os
+import socket
+import time
+from datetime import date, timedelta
+
+import aiohttp
+import pytest
+
+from benchmarks.ingestion import clear_game_log, pipeline_for, set_clock, snapshot, upstream_calls
+from benchmarks.run import start_upstream
+from ingestion.checkpoint import Checkpoint
+from ingestion.espn import EspnClient, EspnError
+from ingestion.seasons import season_for
+
+pytestmark = pytest.mark.anyio
+
+LEAGUE = "nba"
+# A week into the stand-in's NBA season keeps a backfill to a few dozen games
+TODAY = date(2025, 10, 28)
+LATER = TODAY + timedelta(days=3)
+SEASON = season_for(LEAGUE, TODAY)
+
+
+@pytest.fixture
+def stand_ins():
+    """Starts fresh ESPN/PostgREST stand-ins (one process each) and returns their base URL"""
+    processes = []
+
+    def start() -> str:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        processes.append(start_upstream(port, 0, 0, seed=1))
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+    for process in processes:
+        process.terminate()
+        process.join()
+
+
+@pytest.fixture
+async def session():
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+async def prepare(session: aiohttp.ClientSession, upstream: str, today: date) -> None:
+    await clear_game_log(session, upstream)
+    await set_clock(session, upstream, today)
+
+
+async def fail_espn(session: aiohttp.ClientSession, upstream: str, count: int, status: int, retry_after=None) -> None:
+    params = {"fail": count, "status": status}
+    if retry_after is not None:
+        params["retry_after"] = retry_after
+    async with session.post(f"{upstream}/__bench/espn", params=params) as response:
+        response.raise_for_status()
+
+
+async def clean_backfill(session, upstream: str, workdir: str) -> dict:
+    await prepare(session, upstream, LATER)
+    await pipeline_for(upstream, session, workdir, 16).backfill(LEAGUE, [SEASON], LATER)
+    return await snapshot(session, upstream, LEAGUE)
+
+
+async def test_backfill_then_incremental_matches_a_clean_backfill(stand_ins, session, tmp_path):
+    upstream = stand_ins()
+    pipeline = pipeline_for(upstream, session, str(tmp_path / "run"), 16)
+    await prepare(session, upstream, TODAY)
+    await pipeline.backfill(LEAGUE, [SEASON], TODAY)
+    await set_clock(session, upstream, LATER)
+    report = await pipeline.incremental(LEAGUE, LATER)
+
+    expected = await clean_backfill(session, stand_ins(), str(tmp_path / "clean"))
+
+    assert report.games > 0
+    assert await snapshot(session, upstream, LEAGUE) == expected
+
+
+async def test_rerunning_an_incremental_does_not_double_count(stand_ins, session, tmp_path):
+    upstream = stand_ins()
+    pipeline = pipeline_for(upstream, session, str(tmp_path), 16)
+    await prepare(session, upstream, TODAY)
+    await pipeline.backfill(LEAGUE, [SEASON], TODAY)
+    await set_clock(session, upstream, LATER)
+    await pipeline.incremental(LEAGUE, LATER)
+    before = await snapshot(session, upstream, LEAGUE)
+
+    # Same day again: the overlap days are rescanned, but every event on them is already written
+    report = await pipeline.incremental(LEAGUE, LATER)
+
+    assert report.games == 0
+    assert await snapshot(session, upstream, LEAGUE) == before
+
+
+async def test_incremental_that_failed_partway_is_rerun_without_double_counting(stand_ins, session, tmp_path):
+    upstream = stand_ins()
+    pipeline = pipeline_for(upstream, session, str(tmp_path / "run"), 16)
+    await prepare(session, upstream, TODAY)
+    await pipeline.backfill(LEAGUE, [SEASON], TODAY)
+    await set_clock(session, upstream, LATER)
+
+    # Totals and game rows are written, then the splits upsert fails and the run never records its events
+    upsert = pipeline.writer.upsert
+    failures = []
+
+    async def failing_upsert(table, rows, on_conflict, returning=False):
+        if table == "team_location_splits" and not failures:
+            failures.append(table)
+            raise RuntimeError("splits upsert failed")
+        return await upsert(table, rows, on_conflict, returning)
+
+    pipeline.writer.upsert = failing_upsert
+    with pytest.raises(RuntimeError):
+        await pipeline.incremental(LEAGUE, LATER)
+    report = await pipeline.incremental(LEAGUE, LATER)
+
+    expected = await clean_backfill(session, stand_ins(), str(tmp_path / "clean"))
+    assert failures and report.games > 0
+    assert await snapshot(session, upstream, LEAGUE) == expected
+
+
+async def test_rate_limited_calls_wait_for_retry_after(stand_ins, session):
+    upstream = stand_ins()
+    # A base backoff this long would stand out if Retry-After were ignored
+    espn = EspnClient(session, base_url=f"{upstream}/apis/site/v2/sports", retries=3, backoff=5.0)
+    delays = []
+    delay = espn._delay
+
+    def recorded_delay(attempt, retry_after):
+        delays.append(delay(attempt, retry_after))
+        return delays[-1]
+
+    espn._delay = recorded_delay
+    await fail_espn(session, upstream, 2, 429, retry_after="0.2")
+    await upstream_calls(session, upstream, reset=True)
+
+    started = time.perf_counter()
+    teams = await espn.get_teams(LEAGUE)
+
+    assert teams
+    assert delays == [0.2, 0.2]
+    assert time.perf_counter() - started >= 0.4
+    assert (await upstream_calls(session, upstream))["espn:/teams"] == 3
+
+
+async def test_server_errors_are_retried_until_out_of_attempts(stand_ins, session):
+    upstream = stand_ins()
+    espn = EspnClient(session, base_url=f"{upstream}/apis/site/v2/sports", retries=2, backoff=0.01)
+    await fail_espn(session, upstream, 2, 503)
+    assert await espn.get_teams(LEAGUE)
+
+    await fail_espn(session, upstream, 3, 502)
+    with pytest.raises(EspnError):
+        await espn.get_teams(LEAGUE)
+
+    # Not worth retrying: fails on the first answer
+    await fail_espn(session, upstream, 1, 404)
+    await upstream_calls(session, upstream, reset=True)
+    with pytest.raises(EspnError):
+        await espn.get_teams(LEAGUE)
+    assert (await upstream_calls(session, upstream))["espn:/teams"] == 1
+
+
+async def test_torn_spool_line_is_ignored_on_resume(stand_ins, session, tmp_path):
+    upstream = stand_ins()
+    workdir = str(tmp_path / "run")
+    pipeline = pipeline_for(upstream, session, workdir, 16)
+    await prepare(session, upstream, LATER)
+
+    # An interrupted backfill: one game day spooled and marked done, the next torn mid-write
+    game_days = [day for day in (TODAY - timedelta(days=i) for i in range(7, 0, -1)) if await pipeline.fetch_day(LEAGUE, day)]
+    first, second = game_days[:2]
+    first_games = await pipeline.fetch_day(LEAGUE, first)
+    pipeline.checkpoint.record_days(LEAGUE, SEASON, {first.strftime("%Y%m%d"): first_games})
+    torn = (await pipeline.fetch_day(LEAGUE, second))[0]
+    with open(os.path.join(workdir, f"{LEAGUE}-{SEASON}.jsonl"), "a") as spool:
+        spool.write(json.dumps(torn.to_dict())[:40])
+
+    resumed = Checkpoint(workdir)
+    assert len(resumed.load_games(LEAGUE, SEASON)) == len(first_games)
+    assert resumed.done_days(LEAGUE, SEASON) == {first.strftime("%Y%m%d")}
+
+    pipeline.checkpoint = resumed
+    await pipeline.backfill(LEAGUE, [SEASON], LATER)
+
+    expected = await clean_backfill(session, stand_ins(), str(tmp_path / "clean"))
+    assert await snapshot(session, upstream, LEAGUE) == expected
@@ -0,0 +1,93 @@
+"""Streamed league listings (LeagueController.iter_markets_by_league) against the benchmarks.fakes Gamma stand-in"""
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+
+from benchmarks.run import start_upstream
+from controllers.league_controller import LeagueController
+from resources.repository import SupabaseRepository
+from resources.resilience import UpstreamUnavailable
+from resources.team_index import TeamIndex
+from resources.ttl_cache import TTLCache
+from stubs import CountingClient
+
+pytestmark = pytest.mark.anyio
+
+LEAGUE = "nba"
+PAGE_SIZE = 4
+PAGE_CONCURRENCY = 4
+
+
+@pytest.fixture(scope="module")
+def upstream():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = start_upstream(port, 0, 0, seed=1)
+    yield f"http://127.0.0.1:{port}"
+    process.terminate()
+    process.join()
+
+
+@pytest.fixture
+async def session(upstream):
+    async with aiohttp.ClientSession() as session:
+        yield session
+        await degrade_gamma(session, upstream, 0.0)
+
+
+@pytest.fixture
+def controller(upstream, session):
+    repo = SupabaseRepository(CountingClient({}))
+    return LeagueController(
+        repo,
+        TeamIndex(repo),
+        session=session,
+        gamma_url=upstream,
+        markets_cache=TTLCache(ttl=0.05, stale_ttl=0.05),
+        page_size=PAGE_SIZE,
+        page_concurrency=PAGE_CONCURRENCY,
+    )
+
+
+async def degrade_gamma(session: aiohttp.ClientSession, upstream: str, error_rate: float) -> None:
+    async with session.post(f"{upstream}/__bench/gamma", json={"error_rate": error_rate}) as response:
+        response.raise_for_status()
+
+
+async def listing_calls(session: aiohttp.ClientSession, upstream: str, reset: bool = False) -> int:
+    async with session.request("POST" if reset else "GET", f"{upstream}/__bench/stats") as response:
+        return (await response.json()).get("gamma:/markets", 0)
+
+
+async def stream(controller: LeagueController) -> list:
+    return [market["id"] async for market in controller.iter_markets_by_league(LEAGUE)]
+
+
+async def test_concurrent_cold_streams_share_one_walk(controller, upstream, session):
+    expected = [market["id"] for market in await controller.fetch_markets_by_tag(controller.get_tag_id(LEAGUE))]
+    assert len(expected) > PAGE_SIZE
+
+    await listing_calls(session, upstream, reset=True)
+    listings = await asyncio.gather(*(stream(controller) for _ in range(5)))
+
+    assert listings == [expected] * 5
+    # One walk: the first page, then at most one wave of pages
+    assert await listing_calls(session, upstream) <= 1 + PAGE_CONCURRENCY
+
+
+async def test_cold_stream_falls_back_to_the_last_good_listing(controller, upstream, session):
+    expected = await stream(controller)
+    await asyncio.sleep(0.15)
+    await degrade_gamma(session, upstream, 1.0)
+
+    assert await stream(controller) == expected
+
+
+async def test_cold_stream_without_a_last_good_listing_fails(controller, upstream, session):
+    await degrade_gamma(session, upstream, 1.0)
+
+    with pytest.raises(UpstreamUnavailable):
+        await stream(controller)
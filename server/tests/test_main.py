@@ -0,0 +1,75 @@
+"""Startup and shutdown of a worker (main.lifespan)"""
+import importlib
+import os
+from configparser import ConfigParser
+
+import pytest
+
+from benchmarks.run import write_config
+from resources.config import CONFIG_PATH_ENV
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="module")
+def main(tmp_path_factory):
+    """The app module, configured against a port nothing listens on"""
+    directory = str(tmp_path_factory.mktemp("main"))
+    previous = os.environ.get(CONFIG_PATH_ENV)
+    os.environ[CONFIG_PATH_ENV] = write_config(directory, 9, ["STARTUP.warm_up_timeout=1"])
+    try:
+        yield importlib.import_module("main")
+    finally:
+        if previous is None:
+            os.environ.pop(CONFIG_PATH_ENV, None)
+        else:
+            os.environ[CONFIG_PATH_ENV] = previous
+
+
+async def test_failed_warm_up_starts_cold(main, monkeypatch):
+    async def warm_up(wait_for_stores, poll_markets=True):
+        raise RuntimeError("upstream exploded")
+
+    monkeypatch.setattr(main, "warm_up", warm_up)
+
+    async with main.lifespan(main.app):
+        assert main.team_index._task is not None
+        assert main.league_controller.session is not None
+    assert main.team_index._task is None
+    assert main.league_controller.session is None
+
+
+async def test_failure_partway_through_startup_still_shuts_down(main, monkeypatch):
+    async def warm_up(wait_for_stores, poll_markets=True):
+        pass
+
+    def start():
+        raise RuntimeError("cannot start")
+
+    monkeypatch.setattr(main, "warm_up", warm_up)
+    monkeypatch.setattr(main.team_index, "start", start)
+
+    with pytest.raises(RuntimeError):
+        async with main.lifespan(main.app):
+            pass
+    assert main.league_controller.session is None
+
+
+async def test_warm_up_without_the_poller_publishes_no_snapshot(main, monkeypatch):
+    config = ConfigParser()
+    config.read_dict(main.config)
+    config.read_dict({"POLLER": {"enabled": "false"}})
+    listing = [{"id": "1", "question": "Lakers vs. Celtics"}]
+
+    async def fetch_markets_by_tag(tag_id):
+        return listing
+
+    monkeypatch.setattr(main, "config", config)
+    monkeypatch.setattr(main.league_controller, "fetch_markets_by_tag", fetch_markets_by_tag)
+
+    async with main.lifespan(main.app):
+        assert main.market_poller._task is None
+        assert main.market_poller.get_snapshot("nba") is None
+        # Requests still skip the upstream call: the listing is in the markets cache
+        tag_id = main.league_controller.get_tag_id("nba")
+        assert main.league_controller.markets_cache.peek(tag_id, max_age=60) == listing
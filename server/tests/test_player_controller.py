@@ -0,0 +1,71 @@
+"""Query count of the team-vs-opponent stats route (PlayerController.get_full_team_players_averages)"""
+import pytest
+
+from controllers.player_controller import PlayerController
+from resources.averages_matrix import AveragesMatrix
+from resources.constants import LEAGUE_NAME_TO_LEAGUE_ID
+from resources.repository import SupabaseRepository
+from resources.team_index import TeamIndex
+from stubs import CountingClient
+
+pytestmark = pytest.mark.anyio
+
+NBA = LEAGUE_NAME_TO_LEAGUE_ID["nba"]
+
+TEAMS = [
+    {"id": 1, "team_name": "Boston Celtics", "abbreviation": "BOS", "league_id": NBA},
+    {"id": 2, "team_name": "Los Angeles Lakers", "abbreviation": "LAL", "league_id": NBA},
+]
+
+STATS = [
+    {
+        "id": 10,
+        "player_id": 100,
+        "opponent_team_id": 2,
+        "games": 4,
+        "points": 100,
+        "last_updated": "2026-01-15T00:00:00+00:00",
+        "players": {"first_name": "Jay", "last_name": "Tee", "photo_url": None},
+    },
+]
+
+
+def build_controller(client: CountingClient) -> PlayerController:
+    repo = SupabaseRepository(client)
+    return PlayerController(repo, TeamIndex(repo), AveragesMatrix(repo))
+
+
+async def test_team_vs_opponent_makes_two_queries():
+    client = CountingClient({"teams": TEAMS, "player_vs_team_stats": STATS})
+    controller = build_controller(client)
+
+    result = await controller.get_full_team_players_averages("nba", "celtics", "lakers")
+
+    assert [table for table, _ in client.queries] == ["teams", "player_vs_team_stats"]
+    assert result["team_id"] == 1 and result["opponent_id"] == 2
+    assert len(result["all_players"]) == 1
+
+
+async def test_team_vs_opponent_reuses_the_team_index():
+    client = CountingClient({"teams": TEAMS, "player_vs_team_stats": STATS})
+    controller = build_controller(client)
+
+    await controller.get_full_team_players_averages("nba", "celtics", "lakers")
+    client.queries.clear()
+    await controller.get_full_team_players_averages("nba", "lakers", "celtics")
+
+    assert [table for table, _ in client.queries] == ["player_vs_team_stats"]
+
+
+async def test_team_names_never_reach_postgrest_filters():
+    client = CountingClient({"teams": TEAMS, "player_vs_team_stats": STATS})
+    controller = build_controller(client)
+    hostile = "celtics,id.gt.0)"
+
+    assert await controller.get_full_team_players_averages("nba", hostile, "lakers") == []
+
+    assert [table for table, _ in client.queries] == ["teams"]
+    for _, calls in client.queries:
+        for method, args in calls:
+            assert method != "or_"
+            assert not any(hostile in str(arg) for arg in args)
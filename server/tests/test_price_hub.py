@@ -0,0 +1,172 @@
+"""Price stream fan-out (resources.price_hub) against the benchmarks.fakes Gamma price feed"""
+import asyncio
+import socket
+import time
+
+import aiohttp
+import pytest
+
+from benchmarks.fixtures import build_fixtures
+from benchmarks.run import start_upstream
+from controllers.league_controller import LeagueController
+from resources.price_hub import PriceHub
+from resources.repository import SupabaseRepository
+from resources.team_index import TeamIndex
+from stubs import CountingClient
+
+pytestmark = pytest.mark.anyio
+
+SEED = 1
+INTERVAL = 0.05
+MARKET_IDS = [int(market_id) for market_id in list(build_fixtures(SEED).markets_by_id())[:2]]
+
+
+@pytest.fixture(scope="module")
+def upstream():
+    """One Gamma stand-in for the module; tests move prices of their own and reset its call counts"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = start_upstream(port, 0, 0, seed=SEED)
+    yield f"http://127.0.0.1:{port}"
+    process.terminate()
+    process.join()
+
+
+@pytest.fixture
+async def session():
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+@pytest.fixture
+async def hub(upstream, session):
+    repo = SupabaseRepository(CountingClient({}))
+    controller = LeagueController(repo, TeamIndex(repo), session=session, gamma_url=upstream)
+    hub = PriceHub(controller, interval=INTERVAL, queue_size=4, heartbeat=60)
+    yield hub
+    await hub.stop()
+
+
+async def move(session: aiohttp.ClientSession, upstream: str, market_id: int, prices) -> None:
+    async with session.post(f"{upstream}/__bench/prices", json={str(market_id): prices}) as response:
+        response.raise_for_status()
+
+
+async def gamma_calls(session: aiohttp.ClientSession, upstream: str, reset: bool = False) -> int:
+    async with session.request("POST" if reset else "GET", f"{upstream}/__bench/stats") as response:
+        return (await response.json()).get("gamma:/markets/{id}", 0)
+
+
+async def next_event(subscriber, timeout: float = 2.0):
+    return await asyncio.wait_for(subscriber.queue.get(), timeout)
+
+
+async def until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(INTERVAL / 5)
+
+
+async def test_one_poll_loop_per_market_however_many_subscribers(hub, upstream, session):
+    first, second = MARKET_IDS
+    subscribers = [hub.subscribe([first]) for _ in range(20)] + [hub.subscribe([first, second]) for _ in range(5)]
+    for subscriber in subscribers:
+        for _ in subscriber.market_ids:
+            assert (await next_event(subscriber))[0] == "snapshot"
+
+    assert set(hub._feeds) == {first, second}
+    assert len(hub._feeds[first].subscribers) == 25
+    assert len(hub._feeds[second].subscribers) == 5
+
+    await gamma_calls(session, upstream, reset=True)
+    started = time.monotonic()
+    await asyncio.sleep(INTERVAL * 10)
+    elapsed = time.monotonic() - started
+
+    # One call per market per interval (plus one in flight), not one per subscriber
+    assert await gamma_calls(session, upstream) <= 2 * (elapsed / INTERVAL + 2)
+
+
+async def test_only_changed_outcomes_are_published(hub, upstream, session):
+    market_id = MARKET_IDS[0]
+    await move(session, upstream, market_id, [0.4, 0.6])
+    subscriber = hub.subscribe([market_id])
+    name, data = await next_event(subscriber)
+    assert name == "snapshot"
+    outcomes = list(data["prices"])
+    assert list(data["prices"].values()) == ["0.4", "0.6"]
+
+    # Polls that see the same prices publish nothing
+    await asyncio.sleep(INTERVAL * 4)
+    assert subscriber.queue.empty()
+
+    await move(session, upstream, market_id, [0.4, 0.55])
+    name, data = await next_event(subscriber)
+
+    assert name == "price"
+    assert data["prices"] == {outcomes[1]: "0.55"}
+
+
+async def test_full_queue_evicts_the_client(hub, upstream, session):
+    market_id = MARKET_IDS[1]
+    await move(session, upstream, market_id, 0.3)
+    slow = hub.subscribe([market_id])
+    fast = hub.subscribe([market_id])
+    received = []
+
+    async def read():
+        while True:
+            received.append(await fast.queue.get())
+
+    reader = asyncio.create_task(read())
+    await until(lambda: hub._feeds[market_id].prices is not None)
+    try:
+        # The slow client never reads: the snapshot and queue_size moves overflow its queue
+        for step in range(hub.queue_size + 1):
+            price = round(0.31 + step / 100, 3)
+            await move(session, upstream, market_id, price)
+            await until(lambda: list(hub._feeds[market_id].prices.values())[0] == str(price))
+    finally:
+        reader.cancel()
+
+    assert slow.evicted
+    assert slow.queue.qsize() == 1
+    assert slow.queue.get_nowait()[0] == "evicted"
+    assert slow not in hub._feeds[market_id].subscribers
+    assert not fast.evicted
+    assert [name for name, _ in received] == ["snapshot"] + ["price"] * (hub.queue_size + 1)
+
+
+async def test_evicted_stream_ends_after_the_evicted_event(hub):
+    stream = hub.stream([MARKET_IDS[0]])
+    assert await stream.__anext__() == b"retry: 3000\n\n"
+    (subscriber,) = hub._feeds[MARKET_IDS[0]].subscribers
+    hub._evict(subscriber)
+
+    assert (await stream.__anext__()).startswith(b"event: evicted\n")
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert MARKET_IDS[0] not in hub._feeds
+
+
+async def test_poll_loop_is_cancelled_when_the_last_subscriber_leaves(hub, upstream, session):
+    market_id = MARKET_IDS[0]
+    first = hub.subscribe([market_id])
+    second = hub.subscribe([market_id])
+    await next_event(first)
+    task = hub._feeds[market_id].task
+
+    hub.unsubscribe(first)
+    await asyncio.sleep(INTERVAL * 2)
+    assert not task.done()
+
+    hub.unsubscribe(second)
+    assert market_id not in hub._feeds
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await gamma_calls(session, upstream, reset=True)
+    await asyncio.sleep(INTERVAL * 4)
+    assert await gamma_calls(session, upstream) == 0
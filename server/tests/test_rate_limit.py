@@ -0,0 +1,52 @@
+"""Per-IP limits of resources.rate_limit.RateLimitMiddleware"""
+import httpx
+import pytest
+from fastapi import FastAPI
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from resources.rate_limit import RateLimitMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+def make_app(limits: str, exempt_paths=()) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/market/{market_id}")
+    async def market(market_id: int):
+        return {"id": market_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    limiter = Limiter(key_func=get_remote_address, storage_uri="memory://")
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, limits=limits, exempt_paths=exempt_paths)
+    return app
+
+
+def client(app: FastAPI, address: str = "10.0.0.1") -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(address, 50000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def test_distinct_paths_share_one_budget_per_address():
+    app = make_app("3/minute")
+    async with client(app) as spreading:
+        statuses = [(await spreading.get(f"/api/v1/market/{i}")).status_code for i in range(1, 6)]
+    async with client(app, "10.0.0.2") as other:
+        other_status = (await other.get("/api/v1/market/1")).status_code
+
+    assert statuses == [200, 200, 200, 429, 429]
+    assert other_status == 200
+
+
+async def test_exempt_paths_are_never_limited():
+    app = make_app("1/minute", exempt_paths=["/health"])
+    async with client(app) as checker:
+        statuses = [(await checker.get("/health")).status_code for _ in range(3)]
+        market_status = (await checker.get("/api/v1/market/1")).status_code
+
+    assert statuses == [200, 200, 200]
+    assert market_status == 200
@@ -0,0 +1,88 @@
+"""Local SQLite replica (resources.replica) synced from a PostgREST stand-in"""
+import asyncio
+
+import pytest
+
+from resources.replica import REPLICATED_TABLES, ReplicaRepository, ReplicaStore, ReplicaSync
+from stubs import CountingClient, CountingQuery
+
+pytestmark = pytest.mark.anyio
+
+MODELS = {table.name: table.model for table in REPLICATED_TABLES}
+CREATED = "2025-10-01T00:00:00+00:00"
+
+TABLES = {
+    "teams": [
+        {"id": 1, "league_id": 1, "team_name": "Boston Celtics", "abbreviation": "BOS", "created_at": CREATED},
+        {"id": 2, "league_id": 1, "team_name": "Los Angeles Lakers", "abbreviation": "LAL", "created_at": CREATED},
+    ],
+    "players": [{"id": 10, "team_id": 1, "first_name": "Jayson", "last_name": "Tatum", "created_at": CREATED}],
+    "player_vs_team_stats": [],
+    "team_location_splits": [],
+    "team_recent_form": [],
+}
+
+
+class SchemaQuery(CountingQuery):
+    """Rejects filters and orderings on columns the table does not have, as PostgREST does"""
+
+    async def execute(self):
+        for method, args in self.calls:
+            if method in ("eq", "gte", "order") and args[0] not in MODELS[self.table].model_fields:
+                raise ValueError(f"column {self.table}.{args[0]} does not exist")
+        return await super().execute()
+
+
+class SchemaClient(CountingClient):
+    def table(self, name: str) -> SchemaQuery:
+        return SchemaQuery(self, name)
+
+
+@pytest.fixture
+def open_store(tmp_path):
+    stores = []
+
+    def open_store() -> ReplicaStore:
+        store = ReplicaStore(str(tmp_path / "replica.sqlite3"))
+        store.open()
+        stores.append(store)
+        return store
+
+    yield open_store
+    for store in stores:
+        store.close()
+
+
+async def test_a_sync_makes_the_store_ready(open_store):
+    client = SchemaClient(TABLES)
+    store = open_store()
+    repo = ReplicaRepository(store, remote=None)
+
+    await ReplicaSync(client, store).sync_all()
+
+    assert store.ready
+    assert [team["team_name"] for team in await repo.get_teams()] == ["Boston Celtics", "Los Angeles Lakers"]
+    assert (await repo.get_roster(1))[0]["teams"]["abbreviation"] == "BOS"
+
+
+async def test_one_worker_per_host_writes_the_replica(open_store):
+    clients = [SchemaClient(TABLES), SchemaClient(TABLES)]
+    syncs = [ReplicaSync(client, open_store(), interval=0.02) for client in clients]
+    for sync in syncs:
+        sync.start()
+    try:
+        await asyncio.sleep(0.2)
+        writers = [sync for sync in syncs if sync.is_writer]
+        assert len(writers) == 1
+        assert all(sync.store.ready for sync in syncs)
+        reader = next(sync for sync in syncs if not sync.is_writer)
+        assert not clients[syncs.index(reader)].queries
+
+        # The lock goes with its holder: the other worker takes over the writing
+        await writers[0].stop()
+        await asyncio.sleep(0.1)
+        assert reader.is_writer
+        assert clients[syncs.index(reader)].queries
+    finally:
+        for sync in syncs:
+            await sync.stop()
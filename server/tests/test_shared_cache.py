@@ -0,0 +1,57 @@
+"""Write path of the host-wide cache (resources.shared_cache)"""
+import sqlite3
+import time
+
+import pytest
+
+from resources.shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"), max_bytes=10_000, sweep_every=4)
+    yield cache
+    cache.close()
+
+
+def test_sets_sweep_every_n_writes(cache, monkeypatch):
+    sweeps = []
+    sweep = cache._sweep
+    monkeypatch.setattr(cache, "_sweep", lambda conn, now: (sweeps.append(now), sweep(conn, now)))
+
+    for i in range(9):
+        cache.set(f"k{i}", "v")
+
+    # The first set reads the real size; after that one sweep per sweep_every sets
+    assert len(sweeps) == 3
+    assert cache.stats()["writes"] == 9
+
+
+def test_running_size_evicts_before_the_next_sweep(cache):
+    for i in range(6):
+        cache.set(f"k{i}", b"x" * 3_000, ttl=60 + i)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes
+    assert stats["evictions"] > 0
+    # The entries expiring last are the ones kept
+    assert cache.get("k5") is not None
+
+
+def test_set_skips_instead_of_waiting_for_another_writer(cache):
+    cache.set("warm", 1)
+    other = sqlite3.connect(cache.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        cache.set("k", "v")
+        assert time.perf_counter() - started < 0.1
+        assert cache.stats()["busy"] == 1
+        # WAL readers are not blocked by the writer
+        assert cache.get("warm").value == 1
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    cache.set("k", "v")
+    assert cache.get("k").value == "v"